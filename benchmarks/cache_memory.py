@@ -0,0 +1,45 @@
+"""
+Measures the memory used by cached pattern configurations for a large synthetic catalog using tracemalloc.
+Reports the memory of the configuration objects alone and of the cache as a whole (which includes each entry's key and event).
+
+Usage: python benchmarks/cache_memory.py [number of patterns] (with the package installed, e.g. pip install -e .)
+"""
+import sys
+import random
+import tracemalloc
+from jellyfishlightspy.cache import DataCache
+from jellyfishlightspy.model import PatternConfig, RunConfig
+
+def synthetic_config(rand: random.Random) -> PatternConfig:
+    num_colors = rand.randint(1, 8)
+    return PatternConfig(
+        type=rand.choice(["Color", "Chase", "Paint", "Stacker", "Sequence", "Multi-Paint"]),
+        colors=[rand.randint(0, 255) for _ in range(num_colors * 3)],
+        runData=RunConfig(rand.randint(0, 20), rand.randint(1, 100), "No Effect", 0, [100, 100, 100]),
+        colorPos=[rand.randint(-1, 300) for _ in range(rand.randint(1, 60))],
+    )
+
+def measure(num_patterns: int, compact: bool):
+    """Returns the number of bytes allocated for the configurations, and for the configurations once cached"""
+    rand = random.Random(0)
+    tracemalloc.start()
+    configs = {f"Folder {i // 100}/Pattern {i}": synthetic_config(rand) for i in range(num_patterns)}
+    if compact:
+        for config in configs.values():
+            config.compact()
+    configs_size, _ = tracemalloc.get_traced_memory()
+    cache: DataCache[PatternConfig] = DataCache()
+    cache.update_entries(configs)
+    cache_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return configs_size, cache_size
+
+if __name__ == "__main__":
+    num_patterns = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for compact in [False, True]:
+        configs_size, cache_size = measure(num_patterns, compact)
+        print(
+            f"{num_patterns} patterns{' (compact)' if compact else ''}: "
+            f"configs {configs_size / 1024 / 1024:.2f} MiB ({configs_size / num_patterns:.0f} bytes per pattern), "
+            f"cached {cache_size / 1024 / 1024:.2f} MiB ({cache_size / num_patterns:.0f} bytes per pattern)"
+        )
@@ -0,0 +1,27 @@
+"""
+Measures generating frames of client-side effects for a long light string, one frame at a time and precomputed in bulk.
+
+Usage: python benchmarks/effects.py (with the package installed, e.g. pip install -e .[numpy])
+"""
+import timeit
+from jellyfishlightspy.effects import Rainbow, Comet, Breathing, Twinkle, Gradient
+
+NUM_PIXELS = 2000
+FRAMES = 100
+EFFECTS = [
+    Rainbow(NUM_PIXELS),
+    Comet(NUM_PIXELS, (255, 120, 0), tail=40, bounce=True),
+    Breathing(NUM_PIXELS, (0, 80, 255)),
+    Twinkle(NUM_PIXELS, (255, 255, 200), seed=1),
+    Gradient(NUM_PIXELS, [(255, 0, 0), (0, 255, 0), (0, 0, 255)]),
+]
+TIMES = [i / 20 for i in range(FRAMES)]
+
+if __name__ == "__main__":
+    for effect in EFFECTS:
+        for name, case in {
+            f"{type(effect).__name__} frame ({NUM_PIXELS} pixels)": lambda: effect(1.5),
+            f"{type(effect).__name__} {FRAMES} frames precomputed": lambda: effect.frames(TIMES),
+        }.items():
+            number, total = timeit.Timer(case).autorange()
+            print(f"{name:<50}{total / number * 1e6:>10.1f} us")
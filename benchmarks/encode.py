@@ -0,0 +1,30 @@
+"""
+Measures the time taken to encode common requests with to_json, compared to encoding them with json.dumps and _default
+(the previous implementation of to_json).
+
+Usage: python benchmarks/encode.py (with the package installed, e.g. pip install -e .)
+"""
+import json
+import timeit
+from jellyfishlightspy.helpers import to_json, _default
+from jellyfishlightspy.model import PatternConfig, RunConfig, ZoneConfig, PortMapping
+from jellyfishlightspy.requests import SetZoneStateRequest, SetPatternConfigRequest, SetZoneConfigRequest
+from jellyfishlightspy.model import Pattern
+
+def json_dumps(obj) -> str:
+    return json.dumps(obj, default=_default, separators=(',', ':'))
+
+CONFIG = PatternConfig("Chase", [255, 0, 0, 0, 255, 0, 0, 0, 255], RunConfig(5, 80, "Twinkle", 0, [100, 100, 100]), colorPos=list(range(60)))
+REQUESTS = {
+    "SetZoneStateRequest": SetZoneStateRequest(1, ["Front", "Back"], data=CONFIG),
+    "SetPatternConfigRequest": SetPatternConfigRequest(Pattern("Special Effects", "Waves"), CONFIG),
+    "SetZoneConfigRequest": SetZoneConfigRequest({f"Zone {i}": ZoneConfig([PortMapping(i % 4 + 1, 0, 99, 0, "jf.local")]) for i in range(8)}),
+}
+
+if __name__ == "__main__":
+    for name, request in REQUESTS.items():
+        assert to_json(request) == json_dumps(request)
+        number = 20000
+        new = min(timeit.repeat(lambda: to_json(request), number=number, repeat=5)) / number * 1e6
+        old = min(timeit.repeat(lambda: json_dumps(request), number=number, repeat=5)) / number * 1e6
+        print(f"{name}: to_json {new:.1f} us, json.dumps with _default {old:.1f} us ({old / new:.1f}x)")
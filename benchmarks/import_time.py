@@ -0,0 +1,32 @@
+"""
+Measures the time taken to import the package (and a few common entry points) using `python -X importtime`.
+
+Usage: python benchmarks/import_time.py
+"""
+import sys
+import subprocess
+
+STATEMENTS = [
+    "import jellyfishlightspy",
+    "from jellyfishlightspy import PatternConfig, to_json",
+    "import jellyfishlightspy.cli",
+    "from jellyfishlightspy import JellyFishController",
+]
+
+def import_time_us(statement: str) -> int:
+    """Returns the cumulative import time (in microseconds) of the package modules imported by the statement"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package" (nested imports are indented)
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if name.startswith(" jellyfishlightspy"):
+            total += int(cumulative_us)
+    return total
+
+if __name__ == "__main__":
+    for statement in STATEMENTS:
+        runs = sorted(import_time_us(statement) for _ in range(5))
+        print(f"{statement:55} {runs[len(runs) // 2] / 1000:8.2f} ms (median of {len(runs)})")
@@ -0,0 +1,34 @@
+"""
+Compares the size of apply_light_string messages using the pixel and palette light string encodings for realistic frames.
+
+Usage: python benchmarks/light_string_payload.py (with the package installed, e.g. pip install -e .)
+"""
+import colorsys
+from jellyfishlightspy.helpers import to_json
+from jellyfishlightspy.lightstring import encode_light_string, PIXEL_ENCODING, PALETTE_ENCODING, AUTO_ENCODING
+from jellyfishlightspy.requests import SetZoneStateRequest
+
+NUM_PIXELS = 300
+RED, GREEN, WHITE, BLACK = (255, 0, 0), (0, 255, 0), (255, 255, 255), (0, 0, 0)
+
+def rainbow(num_pixels: int):
+    return [tuple(round(c * 255) for c in colorsys.hsv_to_rgb(i / num_pixels, 1, 1)) for i in range(num_pixels)]
+
+FRAMES = {
+    "solid white": [WHITE] * NUM_PIXELS,
+    "red/green holiday": [RED if (i // 3) % 2 else GREEN for i in range(NUM_PIXELS)],
+    "chase (every 10th lit)": [WHITE if i % 10 == 0 else BLACK for i in range(NUM_PIXELS)],
+    "8 color theme": [[RED, GREEN, WHITE, (0, 0, 255), (255, 128, 0), (128, 0, 255), (255, 255, 0), (0, 255, 255)][i % 8] for i in range(NUM_PIXELS)],
+    "rainbow gradient": rainbow(NUM_PIXELS),
+}
+
+def message_size(frame, encoding: str) -> int:
+    """Returns the number of bytes of the message sent to the controller"""
+    config = encode_light_string(frame, 100, encoding)
+    return len(to_json(SetZoneStateRequest(state=3, zoneName=["Front"], data=config)).encode("utf-8"))
+
+if __name__ == "__main__":
+    print(f"{'frame':<25}{'pixel':>10}{'palette':>10}{'auto':>10}")
+    for name, frame in FRAMES.items():
+        sizes = [message_size(frame, encoding) for encoding in [PIXEL_ENCODING, PALETTE_ENCODING, AUTO_ENCODING]]
+        print(f"{name:<25}" + "".join(f"{size:>10}" for size in sizes))
@@ -0,0 +1,38 @@
+"""
+Measures rendering previews of a catalog of patterns, and looking them up again in a PatternRenderer's cache.
+
+Usage: python benchmarks/render.py (with the package installed, e.g. pip install -e .[numpy])
+"""
+import timeit
+from jellyfishlightspy.const import VALID_TYPES, VALID_DIRECTIONS, VALID_EFFECTS_BETWEEN_PIXELS
+from jellyfishlightspy.model import PatternConfig, RunConfig
+from jellyfishlightspy.render import PatternRenderer, render_pattern
+
+NUM_PIXELS = 300
+FRAMES = 30
+CATALOG = [
+    PatternConfig(
+        type=VALID_TYPES[i % len(VALID_TYPES)],
+        colors=[(i * 37 + c * 11) % 256 for c in range(3 * (2 + i % 5))],
+        runData=RunConfig(brightness=50 + i % 51),
+        direction=VALID_DIRECTIONS[i % len(VALID_DIRECTIONS)],
+        spaceBetweenPixels=1 + i % 4,
+        numOfLeds=1 + i % 3,
+        skip=i % 3,
+        effectBetweenPixels=VALID_EFFECTS_BETWEEN_PIXELS[i % len(VALID_EFFECTS_BETWEEN_PIXELS)],
+    )
+    for i in range(200)
+]
+RENDERER = PatternRenderer()
+for config in CATALOG:
+    RENDERER.render(config, NUM_PIXELS, FRAMES)
+
+CASES = {
+    f"render {len(CATALOG)} patterns ({NUM_PIXELS} pixels, {FRAMES} frames)": lambda: [render_pattern(config, NUM_PIXELS, FRAMES) for config in CATALOG],
+    f"cached previews of {len(CATALOG)} patterns": lambda: [RENDERER.render(config, NUM_PIXELS, FRAMES) for config in CATALOG],
+}
+
+if __name__ == "__main__":
+    for name, case in CASES.items():
+        number, total = timeit.Timer(case).autorange()
+        print(f"{name:<60}{total / number * 1e3:>10.2f} ms")
@@ -0,0 +1,41 @@
+"""
+Measures expanding a year of daily and calendar schedules into a timeline and looking up the active pattern of a zone.
+
+Usage: python benchmarks/schedule_timeline.py (with the package installed, e.g. pip install -e .)
+"""
+import timeit
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from jellyfishlightspy.model import ScheduleEvent, ScheduleEventAction
+from jellyfishlightspy.timeline import ScheduleTimeline, expand_schedules, sun_times
+
+TZ = ZoneInfo("America/Denver")
+ZONES = [f"Zone {i}" for i in range(10)]
+DAILY = [
+    ScheduleEvent(label=zone, days=["M", "T", "W", "TH", "F", "SA", "S"], actions=[
+        ScheduleEventAction("RUN", "sunset", 0, 15, "Colors/Warm", [zone]),
+        ScheduleEventAction("STOP", "time", 23, 0, "", [zone]),
+    ])
+    for zone in ZONES
+]
+CALENDAR = [
+    ScheduleEvent(label=f"Holiday {i}", days=[(date(2024, 1, 1) + timedelta(days=i)).strftime("%Y%m%d")], actions=[
+        ScheduleEventAction("RUN", "sunset", 0, -30, "Holidays/Lights", ZONES),
+        ScheduleEventAction("STOP", "sunrise", 0, 0, "", ZONES),
+    ])
+    for i in range(0, 366, 5)
+]
+DAYS = [date(2024, 1, 1) + timedelta(days=i) for i in range(366)]
+TIMELINE = ScheduleTimeline(expand_schedules(DAILY, CALENDAR, DAYS[0], DAYS[-1], 39.74, -104.99, TZ))
+WHEN = datetime(2024, 7, 4, 21, 0, tzinfo=TZ)
+
+CASES = {
+    "sun times (366 days)": lambda: sun_times(39.74, -104.99, DAYS, TZ),
+    f"expand schedules (366 days, {len(DAILY) + len(CALENDAR)} events)": lambda: expand_schedules(DAILY, CALENDAR, DAYS[0], DAYS[-1], 39.74, -104.99, TZ),
+    f"active pattern lookup ({len(TIMELINE.actions)} actions)": lambda: TIMELINE.active_pattern("Zone 3", WHEN),
+}
+
+if __name__ == "__main__":
+    for name, case in CASES.items():
+        number, total = timeit.Timer(case).autorange()
+        print(f"{name:<50}{total / number * 1e6:>10.1f} us")
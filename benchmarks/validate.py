@@ -0,0 +1,50 @@
+"""
+Measures validation of large Soffit pattern configurations, light strings, and year-long calendar schedules
+(including revalidating an unchanged schedule with a ValidationMemo).
+
+Usage: python benchmarks/validate.py (with the package installed, e.g. pip install -e .)
+"""
+import timeit
+from datetime import date, timedelta
+from jellyfishlightspy.model import PatternConfig, ScheduleEvent, ScheduleEventAction
+from jellyfishlightspy.validators import validate_pattern_config, validate_light_string, validate_schedule, ValidationMemo
+
+NUM_PIXELS = 3000
+CONFIG = PatternConfig(type="Soffit", colors=[(i * 7) % 256 for i in range(NUM_PIXELS * 3)], colorPos=list(range(-1, NUM_PIXELS)))
+LIGHT_STRING = [((i * 3) % 256, (i * 5) % 256, (i * 7) % 256) for i in range(NUM_PIXELS)]
+DAYS = [(date(2024, 1, 1) + timedelta(days=i)).strftime("%Y%m%d") for i in range(366)]
+SCHEDULE = [
+    ScheduleEvent(label=f"Event {i}", days=DAYS[i:i + 7], actions=[
+        ScheduleEventAction("RUN", "sunset", 0, 30, "Colors/Blue", ["Front"]),
+        ScheduleEventAction("STOP", "time", 23, 0, "", ["Front"]),
+    ])
+    for i in range(0, 366, 7)
+]
+LARGE_SCHEDULE = [
+    ScheduleEvent(label=f"Event {i}", days=[DAYS[i % 366]], actions=[
+        ScheduleEventAction("RUN", "time", 18, 0, "Colors/Blue", ["Front"]),
+        ScheduleEventAction("STOP", "time", 23, 0, "", ["Front"]),
+    ])
+    for i in range(1000)
+]
+MEMO = ValidationMemo()
+
+CASES = {
+    f"pattern config ({NUM_PIXELS} pixels)": lambda: validate_pattern_config(CONFIG, []),
+    f"light string ({NUM_PIXELS} pixels)": lambda: validate_light_string(LIGHT_STRING),
+    f"calendar schedule ({len(SCHEDULE)} weekly events)": lambda: validate_schedule(SCHEDULE, True, {"Colors/Blue"}, {"Front"}),
+    f"calendar schedule ({len(LARGE_SCHEDULE)} events)": lambda: validate_schedule(LARGE_SCHEDULE, True, {"Colors/Blue"}, {"Front"}),
+    f"memoized calendar schedule ({len(LARGE_SCHEDULE)} events)": lambda: validate_schedule(LARGE_SCHEDULE, True, {"Colors/Blue"}, {"Front"}, MEMO),
+}
+
+try:
+    import numpy
+    FRAME = numpy.array(LIGHT_STRING, dtype=numpy.uint8)
+    CASES[f"light string array ({NUM_PIXELS} pixels)"] = lambda: validate_light_string(FRAME)
+except ImportError:
+    pass
+
+if __name__ == "__main__":
+    for name, case in CASES.items():
+        number, total = timeit.Timer(case).autorange()
+        print(f"{name:<45}{total / number * 1e6:>10.1f} us")
@@ -1,27 +1,93 @@
-from .controller import JellyFishController
-from .helpers import JellyFishException
-from .model import (
-    TimeConfig,
-    FirmwareVersion,
-    ZoneState,
-    ZoneConfig,
-    PortMapping,
-    Pattern,
-    PatternConfig,
-    RunConfig,
-    ScheduleEvent,
-    ScheduleEventAction,
-)
-from .const import (
-    NAME_DATA,
-    HOSTNAME_DATA,
-    FIRMWARE_VERSION_DATA,
-    TIME_CONFIG_DATA,
-    ZONE_CONFIG_DATA,
-    PATTERN_LIST_DATA,
-    PATTERN_CONFIG_DATA,
-    ZONE_STATE_DATA,
-    DEFAULT_TIMEOUT,
-    DELETE_PATTERN_DATA,
-    SCHEDULE_DATA,
-)
\ No newline at end of file
+import importlib
+
+# Avoids importing typing just for this flag (type checkers treat this name specially)
+TYPE_CHECKING = False
+
+# Submodules are imported on first attribute access (PEP 562) so that importing the package stays cheap for uses
+# that only need a few of them (e.g. model classes or to_json)
+_EXPORTS = {
+    "JellyFishController": "controller",
+    "PreparedCommand": "controller",
+    "JellyFishProxy": "proxy",
+    "ScheduleTransaction": "schedule",
+    "ScheduleTimeline": "timeline",
+    "PixelMap": "pixelmap",
+    "FrameCompositor": "compositor",
+    "Animation": "animation",
+    "Timeline": "animation",
+    "PatternRenderer": "render",
+    "render_pattern": "render",
+    "JellyFishException": "helpers",
+    "to_json": "helpers",
+    "from_json": "helpers",
+    "TimeConfig": "model",
+    "FirmwareVersion": "model",
+    "ZoneState": "model",
+    "ZoneConfig": "model",
+    "PortMapping": "model",
+    "Pattern": "model",
+    "PatternConfig": "model",
+    "RunConfig": "model",
+    "ScheduleEvent": "model",
+    "ScheduleEventAction": "model",
+    "NAME_DATA": "const",
+    "HOSTNAME_DATA": "const",
+    "FIRMWARE_VERSION_DATA": "const",
+    "TIME_CONFIG_DATA": "const",
+    "ZONE_CONFIG_DATA": "const",
+    "PATTERN_LIST_DATA": "const",
+    "PATTERN_CONFIG_DATA": "const",
+    "ZONE_STATE_DATA": "const",
+    "DEFAULT_TIMEOUT": "const",
+    "DELETE_PATTERN_DATA": "const",
+    "SCHEDULE_DATA": "const",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    # Cache the value so that subsequent lookups don't call this function
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
+if TYPE_CHECKING:
+    from .controller import JellyFishController, PreparedCommand
+    from .proxy import JellyFishProxy
+    from .schedule import ScheduleTransaction
+    from .timeline import ScheduleTimeline
+    from .pixelmap import PixelMap
+    from .compositor import FrameCompositor
+    from .animation import Animation, Timeline
+    from .render import PatternRenderer, render_pattern
+    from .helpers import JellyFishException, to_json, from_json
+    from .model import (
+        TimeConfig,
+        FirmwareVersion,
+        ZoneState,
+        ZoneConfig,
+        PortMapping,
+        Pattern,
+        PatternConfig,
+        RunConfig,
+        ScheduleEvent,
+        ScheduleEventAction,
+    )
+    from .const import (
+        NAME_DATA,
+        HOSTNAME_DATA,
+        FIRMWARE_VERSION_DATA,
+        TIME_CONFIG_DATA,
+        ZONE_CONFIG_DATA,
+        PATTERN_LIST_DATA,
+        PATTERN_CONFIG_DATA,
+        ZONE_STATE_DATA,
+        DEFAULT_TIMEOUT,
+        DELETE_PATTERN_DATA,
+        SCHEDULE_DATA,
+    )
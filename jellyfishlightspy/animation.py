@@ -0,0 +1,178 @@
+import time
+from threading import Event, Thread
+from typing import Any, Callable, Optional, Sequence, Tuple
+from .const import LOGGER, DEFAULT_ANIMATION_FPS
+from .helpers import JellyFishException, require_numpy
+
+# Animations are functions of time: a frame source returns the frame to show a number of seconds after the animation
+# started (e.g. Timeline.frame_at), so that playback can skip frames when it falls behind instead of slowing down.
+
+class Timeline:
+    """
+    Keyframes (seconds, frame) of an animation. Frames are lists of RGB tuples or NumPy arrays of shape (pixels, 3) and must
+    all have the same number of pixels. Frames between keyframes are interpolated linearly. Requires NumPy
+    """
+
+    def __init__(self, keyframes: Sequence[Tuple[float, Any]], loop: bool=False):
+        np = require_numpy("Timelines")
+        if len(keyframes) == 0:
+            raise JellyFishException("A timeline must have at least one keyframe")
+        keyframes = sorted(keyframes, key=lambda keyframe: keyframe[0])
+        self.times = np.array([t for t, _ in keyframes], dtype=np.float64)
+        if self.times[0] < 0:
+            raise JellyFishException(f"Keyframe time {self.times[0]} is invalid (must be zero or higher)")
+        try:
+            self.__frames = np.stack([np.asarray(frame, dtype=np.float64) for _, frame in keyframes])
+        except ValueError as e:
+            raise JellyFishException("Keyframes must all have the same number of pixels") from e
+        if self.__frames.ndim != 3 or self.__frames.shape[2] != 3:
+            raise JellyFishException("Keyframes must be lists of RGB tuples or arrays of shape (pixels, 3)")
+        self.loop = loop
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"keyframes": len(self.times), "duration": self.duration, "loop": self.loop})
+
+    @property
+    def duration(self) -> float:
+        """The time of the last keyframe"""
+        return float(self.times[-1])
+
+    @property
+    def num_pixels(self) -> int:
+        return self.__frames.shape[1]
+
+    def frames_at(self, times: Sequence[float]) -> Any:
+        """
+        Returns the frames at many times at once as an array of shape (times, pixels, 3) of RGB bytes (e.g. to precompute an
+        animation). Times before the first keyframe show it, and times after the last show it unless the timeline loops
+        """
+        np = require_numpy("Timelines")
+        times = np.asarray(times, dtype=np.float64)
+        if self.loop and self.duration > 0:
+            times = times % self.duration
+        last = len(self.times) - 1
+        before = np.clip(np.searchsorted(self.times, times, side="right") - 1, 0, last)
+        after = np.minimum(before + 1, last)
+        span = self.times[after] - self.times[before]
+        alpha = np.clip((times - self.times[before]) / np.where(span > 0, span, 1), 0, 1)
+        start = self.__frames[before]
+        frames = start + (self.__frames[after] - start) * alpha[:, None, None]
+        return np.rint(frames).astype(np.uint8)
+
+    def frame_at(self, t: float) -> Any:
+        """Returns the frame at a time as an array of shape (pixels, 3) of RGB bytes"""
+        return self.frames_at([t])[0]
+
+
+class AnimationStats:
+    """Playback statistics of an animation"""
+    __slots__ = ("frames", "skipped", "coalesced", "late", "max_lag", "elapsed")
+
+    def __init__(self):
+        self.frames = 0 # Frames sent
+        self.skipped = 0 # Frames skipped because playback fell behind
+        self.coalesced = 0 # Frames skipped because the receiver wasn't ready for another
+        self.late = 0 # Frames sent more than half a frame interval after they were due
+        self.max_lag = 0.0 # The longest time a frame was sent after it was due (in seconds)
+        self.elapsed = 0.0 # Seconds since playback started
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({**{attr: getattr(self, attr) for attr in self.__slots__}, "fps": self.fps})
+
+    @property
+    def fps(self) -> float:
+        """The achieved frame rate"""
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class Animation:
+    """
+    Plays an animation by sending the frames of a source (a function of the seconds since playback started) at a target
+    frame rate. Frames are due at fixed times from the start on a monotonic clock, so time spent rendering and sending
+    doesn't accumulate as drift, and frames whose time has passed are skipped when playback falls behind. Playback stops
+    after the duration (if given, showing its final frame), when stop() is called, or if sending a frame raises an
+    exception (which is kept in error). If a ready function is given, frames that are due while it returns False are
+    skipped (except the final frame), so that a slow receiver gets the latest frame instead of a growing backlog.
+    See JellyFishController.animate
+    """
+
+    def __init__(self, source: Callable[[float], Any], send: Callable[[Any], None], fps: float=DEFAULT_ANIMATION_FPS, duration: Optional[float]=None, ready: Optional[Callable[[], bool]]=None):
+        if not fps > 0:
+            raise JellyFishException(f"Frame rate {fps} is invalid (must be greater than zero)")
+        self.fps = fps
+        self.duration = duration
+        self.stats = AnimationStats()
+        self.error: Optional[Exception] = None
+        self.__source = source
+        self.__send = send
+        self.__ready = ready
+        self.__stopped = Event()
+        self.__thread: Optional[Thread] = None
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"fps": self.fps, "duration": self.duration, "running": self.running})
+
+    @property
+    def running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def start(self) -> "Animation":
+        """Starts playback on a new thread. Returns self"""
+        if self.__thread is not None:
+            raise JellyFishException("The animation has already been started")
+        self.__thread = Thread(target=self.play, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float]=None) -> None:
+        """Stops playback and waits for it to finish"""
+        self.__stopped.set()
+        self.wait(timeout)
+
+    def wait(self, timeout: Optional[float]=None) -> bool:
+        """Waits for playback on its thread to finish. Returns False if it is still running after the timeout"""
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+        return not self.running
+
+    def play(self) -> AnimationStats:
+        """Plays the animation on the calling thread until it finishes. Returns the playback statistics"""
+        interval = 1 / self.fps
+        start = time.perf_counter()
+        index = 0 # The index of the next frame, which is due at start + index * interval
+        try:
+            while not self.__stopped.is_set():
+                due = start + index * interval
+                now = time.perf_counter()
+                if now < due:
+                    if self.__stopped.wait(due - now):
+                        break
+                    now = time.perf_counter()
+                elif now - due >= interval:
+                    behind = int((now - due) / interval)
+                    index += behind
+                    self.stats.skipped += behind
+                    due += behind * interval
+                t = index * interval
+                final = self.duration is not None and t >= self.duration
+                if final:
+                    t = self.duration
+                elif self.__ready is not None and not self.__ready():
+                    self.stats.coalesced += 1
+                    index += 1
+                    continue
+                lag = now - due
+                if lag > interval / 2:
+                    self.stats.late += 1
+                self.stats.max_lag = max(self.stats.max_lag, lag)
+                self.__send(self.__source(t))
+                self.stats.frames += 1
+                self.stats.elapsed = time.perf_counter() - start
+                index += 1
+                if final:
+                    break
+        except Exception as e:
+            LOGGER.error("Animation stopped: %s", e)
+            self.error = e
+        self.stats.elapsed = time.perf_counter() - start
+        return self.stats
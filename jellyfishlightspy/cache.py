@@ -1,7 +1,7 @@
 import time
 from threading import Lock
-from typing import Dict, List, Optional, Generic, TypeVar
-from .helpers import TimelyEvent, copy
+from typing import Any, Dict, List, Optional, Generic, TypeVar, Callable, Iterator, FrozenSet, Tuple, Union
+from .helpers import TimelyEvent, copy, to_json
 from .model import FirmwareVersion, TimeConfig, ZoneConfig, ZoneState, Pattern, PatternConfig, ScheduleEvent
 
 T = TypeVar('T')
@@ -27,6 +27,205 @@ class CacheEntry(Generic[T]):
         self.event.trigger()
 
 
+class NameIndex(Generic[T]):
+    """
+    Tracks the keys of a DataCache's entries as they are updated, so that name lookups and validation don't need to
+    copy every cached object. Entries for which the include function returns False (e.g. pattern folders) can
+    still be retrieved with get() but are excluded from names and iteration.
+    """
+
+    def __init__(self, include: Optional[Callable[[T], bool]] = None):
+        self.__entries: Dict[str, T] = {}
+        self.__included: Dict[str, None] = {}
+        self.__names: Optional[FrozenSet[str]] = frozenset()
+        self.__include = include
+        self.__lock = Lock()
+        # Incremented whenever the included keys change, so that users of the index can tell when to revalidate
+        self.version = 0
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"size": len(self)})
+
+    def __len__(self) -> int:
+        return len(self.__included)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__included
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over the included keys in the order they were first cached"""
+        with self.__lock:
+            return iter(list(self.__included))
+
+    @property
+    def names(self) -> FrozenSet[str]:
+        """The included keys as a frozenset (rebuilt only after the index changes)"""
+        names = self.__names
+        if names is None:
+            with self.__lock:
+                names = self.__names = frozenset(self.__included)
+        return names
+
+    def get(self, key: str) -> Optional[T]:
+        """Returns a copy of the data for a key (including excluded entries), or None if it is not indexed"""
+        data = self.__entries.get(key)
+        return copy(data) if data is not None else None
+
+    def update(self, key: str, data: T) -> None:
+        with self.__lock:
+            self.__entries[key] = data
+            if self.__include is None or self.__include(data):
+                if key not in self.__included:
+                    self.__included[key] = None
+                    self.__names = None
+                    self.version += 1
+            elif key in self.__included:
+                del self.__included[key]
+                self.__names = None
+                self.version += 1
+
+    def remove(self, key: str) -> None:
+        with self.__lock:
+            self.__entries.pop(key, None)
+            if key in self.__included:
+                del self.__included[key]
+                self.__names = None
+                self.version += 1
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__included.clear()
+            self.__names = frozenset()
+            self.version += 1
+
+
+class _FolderNode:
+    """A folder within a PatternTree"""
+
+    def __init__(self):
+        self.folders: Dict[str, _FolderNode] = {}
+        self.patterns: Dict[str, str] = {} # Maps pattern names to their full names (e.g. "Red" -> "Christmas/Red")
+        self.explicit = False # True if the controller listed the folder itself (so it remains when empty)
+
+    def iter_patterns(self) -> Iterator[str]:
+        yield from self.patterns.values()
+        for folder in self.folders.values():
+            yield from folder.iter_patterns()
+
+
+class PatternTree:
+    """
+    Indexes the pattern catalog by folder (a DataCache index, like NameIndex) so that folders can be listed, walked, and
+    searched by prefix without scanning and splitting every pattern name. Folder paths use '/' as a separator and
+    results are the same full names used by pattern_names (e.g. "Christmas/Red").
+    """
+
+    def __init__(self):
+        self.__root = _FolderNode()
+        self.__paths: Dict[str, Tuple[Tuple[str, ...], str]] = {}
+        self.__lock = Lock()
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"size": len(self.__paths)})
+
+    @staticmethod
+    def __split(folder: str) -> Tuple[str, ...]:
+        return tuple(part for part in folder.split("/") if part)
+
+    def __find(self, path: Tuple[str, ...]) -> Optional[_FolderNode]:
+        node = self.__root
+        for part in path:
+            node = node.folders.get(part)
+            if node is None:
+                return None
+        return node
+
+    def __folder_key(self, path: Tuple[str, ...]) -> str:
+        return "/".join(path) + "/"
+
+    def list_folder(self, folder: str = "") -> List[str]:
+        """
+        Returns the contents of a folder (the top level if not provided): subfolders as "Folder/" followed by
+        the full names of the patterns it contains. Returns an empty list if the folder doesn't exist
+        """
+        path = self.__split(folder)
+        with self.__lock:
+            node = self.__find(path)
+            if node is None:
+                return []
+            return [self.__folder_key(path + (f,)) for f in node.folders] + list(node.patterns.values())
+
+    def walk(self, folder: str = "") -> Iterator[Tuple[str, List[str], List[str]]]:
+        """
+        Walks a folder (the top level if not provided) and its subfolders, similar to os.walk. Yields tuples of
+        (folder path, subfolder names, full pattern names) from a snapshot taken when the walk starts
+        """
+        start = self.__split(folder)
+        results = []
+        with self.__lock:
+            stack = [(start, self.__find(start))]
+            while stack:
+                path, node = stack.pop()
+                if node is None:
+                    continue
+                results.append(("/".join(path), list(node.folders), list(node.patterns.values())))
+                stack.extend((path + (f,), node.folders[f]) for f in reversed(list(node.folders)))
+        return iter(results)
+
+    def search(self, prefix: str) -> List[str]:
+        """Returns the full names of all patterns that start with the prefix (e.g. "Christmas/" or "Christmas/Re")"""
+        *folders, partial = prefix.split("/")
+        path = self.__split("/".join(folders))
+        with self.__lock:
+            node = self.__find(path)
+            if node is None:
+                return []
+            results = [full for name, full in node.patterns.items() if name.startswith(partial)]
+            for name, child in node.folders.items():
+                if name.startswith(partial):
+                    results.extend(child.iter_patterns())
+            return results
+
+    def update(self, key: str, data: Pattern) -> None:
+        path = self.__split(data.folders)
+        with self.__lock:
+            if key in self.__paths:
+                return
+            node = self.__root
+            for part in path:
+                node = node.folders.setdefault(part, _FolderNode())
+            if data.is_folder:
+                node.explicit = True
+            else:
+                node.patterns[data.name] = key
+            self.__paths[key] = (path, data.name)
+
+    def remove(self, key: str) -> None:
+        with self.__lock:
+            if key not in self.__paths:
+                return
+            path, name = self.__paths.pop(key)
+            nodes = [self.__root]
+            for part in path:
+                nodes.append(nodes[-1].folders[part])
+            if name:
+                nodes[-1].patterns.pop(name, None)
+            else:
+                nodes[-1].explicit = False
+            # Prune folders that are now empty and were not listed by the controller
+            for i in range(len(path), 0, -1):
+                node = nodes[i]
+                if node.explicit or node.patterns or node.folders:
+                    break
+                del nodes[i - 1].folders[path[i - 1]]
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__root = _FolderNode()
+            self.__paths.clear()
+
+
 SINGLE_ENTRY_KEY = "__single_entry__"
 
 class DataCache(Generic[T]):
@@ -36,10 +235,16 @@ class DataCache(Generic[T]):
     Cache entries are stored in a dict that maps the entry key (a string) to the CacheEntry object.
     """
 
-    def __init__(self):
+    def __init__(self, indexes: Optional[List[Union[NameIndex[T], PatternTree]]] = None):
         self.__data: Dict[str, CacheEntry[T]] = {}
         self.__lock = Lock()
         self.__finalized = TimelyEvent()
+        self.__indexes = indexes or []
+        self.__listeners: List[Callable[[str, T], None]] = []
+        # Events of deleted entries, so that deletions can be awaited after they occur
+        self.__deleted: Dict[str, TimelyEvent] = {}
+        # Incremented whenever entries are updated or deleted, so that readers can detect changes since they read the data
+        self.version = 0
 
     def __repr__(self):
         return self.__class__.__name__ + str({"type": T, "size": self.size})
@@ -48,6 +253,7 @@ class DataCache(Generic[T]):
         """Retrieves an entry in a non-thread-safe manner, or creates it if it doesn't exist"""
         if entry_key not in self.__data:
             self.__data[entry_key] = CacheEntry()
+            self.__deleted.pop(entry_key, None)
         return self.__data[entry_key]
 
     @property
@@ -55,6 +261,29 @@ class DataCache(Generic[T]):
         """The current number of entries stored in the cache"""
         return len(self.__data)
 
+    def add_listener(self, listener: Callable[[str, T], None]) -> None:
+        """
+        Adds a function that is called with the entry key and data whenever an entry is updated.
+        Listeners are called while the cache is locked, so they must be quick and must not access the cache
+        """
+        with self.__lock:
+            self.__listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, T], None]) -> None:
+        """Removes a function added with add_listener"""
+        with self.__lock:
+            if listener in self.__listeners:
+                self.__listeners.remove(listener)
+
+    def __notify(self, entry_key: str, data: T) -> None:
+        for listener in self.__listeners:
+            listener(entry_key, data)
+
+    def keys(self) -> List[str]:
+        """Returns the keys of all cache entries (without copying their data)"""
+        with self.__lock:
+            return list(self.__data)
+
     def get_entry(self, entry_key: str=SINGLE_ENTRY_KEY) -> T:
         """Returns the data for a cache entry (or the sole entry if entry_key is not provided)"""
         with self.__lock:
@@ -66,16 +295,48 @@ class DataCache(Generic[T]):
         with self.__lock:
             return {k: v.data for k, v in self.__data.items()}
 
+    def matches_entry(self, data: T, entry_key: str=SINGLE_ENTRY_KEY) -> bool:
+        """Returns True if an entry (or the sole entry if entry_key is not provided) is cached and equal to data, without copying it"""
+        with self.__lock:
+            entry = self.__data.get(entry_key)
+            return entry is not None and entry._data is not None and entry._data == data
+
+    def matches_all_entries(self, entries: Dict[str, T]) -> bool:
+        """Returns True if the cached entries are exactly the given entries, without copying them"""
+        with self.__lock:
+            return set(self.__data) == set(entries) and all(self.__data[k]._data == v for k, v in entries.items())
+
+    def get_update_ts(self, entry_keys: Optional[List[str]] = None) -> Optional[float]:
+        """
+        Returns the time (time.perf_counter()) of the oldest update among the given entries (or all entries if entry_keys
+        is not provided). Returns None if any of the entries have not been cached or the cache is empty.
+        """
+        with self.__lock:
+            keys = list(self.__data) if entry_keys is None else entry_keys
+            entries = [self.__data.get(key) for key in keys]
+            if not entries or any(entry is None or entry._data is None for entry in entries):
+                return None
+            return min(entry.event.ts for entry in entries)
+
     def update_entry(self, data: T, entry_key: str=SINGLE_ENTRY_KEY) -> None:
         """Updates the data for a single entry (or the sole entry if entry_key is not provided)"""
         with self.__lock:
+            # Update indexes first so they are current when waiting threads are notified
+            for index in self.__indexes:
+                index.update(entry_key, data)
             self.__get_or_create_entry(entry_key).data = data
+            self.version += 1
+            self.__notify(entry_key, data)
 
     def update_entries(self, entries: Dict[str, T]) -> None:
         """Updates the data for multiple entries as a single transaction and triggers the finalization event when complete"""
         with self.__lock:
             for k, v in entries.items():
+                for index in self.__indexes:
+                    index.update(k, v)
                 self.__get_or_create_entry(k).data = v
+                self.__notify(k, v)
+            self.version += 1
         self.__finalized.trigger()
 
     def delete_entry(self, entry_key: str) -> None:
@@ -85,45 +346,116 @@ class DataCache(Generic[T]):
             entry = self.__data.get(entry_key)
             if entry:
                 del self.__data[entry_key]
+                self.__deleted[entry_key] = entry.event
+                for index in self.__indexes:
+                    index.remove(entry_key)
+                self.version += 1
                 entry.event.trigger()
 
     def clear(self) -> None:
         """Clears all currently cached data"""
         with self.__lock:
             self.__data.clear()
+            for index in self.__indexes:
+                index.clear()
+            self.version += 1
 
-    def await_update(self, timeout: float, entry_keys: Optional[List[str]] = None) -> bool:
-        """Waits for a cache update to occur. If entry_keys is provided, waits until all keys have been updated."""
+    def await_update(self, timeout: float, entry_keys: Optional[List[str]] = None, after_ts: Optional[float] = None) -> bool:
+        """
+        Waits for a cache update to occur. If entry_keys is provided, waits until all keys have been updated.
+        Updates that occurred after after_ts (a time.perf_counter() value, e.g. captured before sending a request) count
+        as well, which avoids missing responses that arrive before this function is called.
+        """
         start_ts = time.perf_counter()
+        after_ts = after_ts or start_ts
         entry_keys = entry_keys or [SINGLE_ENTRY_KEY]
-        for event in [self.__get_or_create_entry(key).event for key in entry_keys]:
+        with self.__lock:
+            events = [self.__deleted[key] if key in self.__deleted else self.__get_or_create_entry(key).event for key in entry_keys]
+        for event in events:
             # We cannot simply wait for each event sequentially because messages can be received simultaneously and out of order.
-            # To overcome this, use the TimelyEvent timestamp to check if data has been received since this function was called.
+            # To overcome this, use the TimelyEvent timestamp to check if data has been received since after_ts.
             timeout_remaining = timeout - (time.perf_counter() - start_ts) # Decrement the timeout as we wait for each event
-            if not event.wait(timeout=timeout_remaining, after_ts=start_ts):
+            if not event.wait(timeout=timeout_remaining, after_ts=after_ts):
                 return False
         return True
 
-    def await_finalization(self, timeout: float) -> bool:
+    def await_finalization(self, timeout: float, after_ts: Optional[float] = None) -> bool:
         """
         Waits for finalization of a cache after multiple related updates.
         Used when listeners of cache events need to wait until a multi-update transaction is finished and
-        the entity keys are not known in advance.
+        the entity keys are not known in advance. Finalizations that occurred after after_ts count as well.
         """
-        return self.__finalized.wait(timeout=timeout)
+        return self.__finalized.wait(timeout=timeout, after_ts=after_ts)
+
+
+class ZoneFingerprints:
+    """
+    Tracks what each zone is currently showing so that requests that would not change it can be skipped. A zone's fingerprint
+    holds the key of the inputs of the last request applied to it (e.g. a color and brightness), which allows skipping a request
+    without encoding it, and the state key of the resulting zone state (see state_key). Zone states pushed by the controller
+    replace the fingerprint unless they match it.
+    """
+
+    def __init__(self):
+        self.__fingerprints: Dict[str, Tuple[Any, str]] = {}
+        self.__lock = Lock()
+
+    @staticmethod
+    def state_key(state: int, file: Optional[str], data: Any) -> str:
+        """Returns a key that is equal for zone states showing the same thing"""
+        return to_json([state, file or "", data or ""])
+
+    def matches_input(self, zones: List[str], input_key: Any) -> bool:
+        """Returns True if the last request applied to every zone had the same input key"""
+        with self.__lock:
+            return all(zone in self.__fingerprints and self.__fingerprints[zone][0] == input_key for zone in zones)
+
+    def matches_state(self, zones: List[str], state_key: str) -> bool:
+        """Returns True if every zone is showing the zone state with the given key"""
+        with self.__lock:
+            return all(zone in self.__fingerprints and self.__fingerprints[zone][1] == state_key for zone in zones)
+
+    def update(self, zones: List[str], input_key: Any, state_key: str) -> None:
+        with self.__lock:
+            for zone in zones:
+                self.__fingerprints[zone] = (input_key, state_key)
+
+    def invalidate(self, zones: Optional[List[str]]=None) -> None:
+        """Forgets what the zones (or all zones if not provided) are showing, e.g. when other requests are sent to them"""
+        with self.__lock:
+            if zones is None:
+                self.__fingerprints.clear()
+            for zone in zones or []:
+                self.__fingerprints.pop(zone, None)
+
+    def on_zone_state(self, zone: str, state: ZoneState) -> None:
+        """Zone state cache listener that keeps fingerprints current when zone states are received from the controller"""
+        key = self.state_key(state.state, state.file, state.data)
+        with self.__lock:
+            fingerprint = self.__fingerprints.get(zone)
+            if fingerprint is None or fingerprint[1] != key:
+                self.__fingerprints[zone] = (None, key)
 
 
 class JellyFishCache:
     """Responsible for caching all data received from the controller and coordinating data access"""
 
-    def __init__(self):
+    def __init__(self, compact: bool=False):
+        # If True, pattern configurations are compacted before they are cached (see PatternConfig.compact)
+        self.compact = compact
         self.name_data: DataCache[str] = DataCache()
         self.hostname_data: DataCache[str] = DataCache()
         self.firmware_version_data: DataCache[FirmwareVersion] = DataCache()
         self.time_config_data: DataCache[TimeConfig] = DataCache()
-        self.zone_config_data: DataCache[ZoneConfig] = DataCache()
+        self.zone_index: NameIndex[ZoneConfig] = NameIndex()
+        self.zone_config_data: DataCache[ZoneConfig] = DataCache([self.zone_index])
         self.zone_state_data: DataCache[ZoneState] = DataCache()
-        self.pattern_list_data: DataCache[Pattern] = DataCache()
+        self.zone_fingerprints = ZoneFingerprints()
+        self.zone_state_data.add_listener(self.zone_fingerprints.on_zone_state)
+        # Indexes pattern names to their Pattern objects (folders are excluded from the names)
+        self.pattern_index: NameIndex[Pattern] = NameIndex(lambda pattern: not pattern.is_folder)
+        self.pattern_tree = PatternTree()
+        self.pattern_list_data: DataCache[Pattern] = DataCache([self.pattern_index, self.pattern_tree])
         self.pattern_config_data: DataCache[PatternConfig] = DataCache()
         self.calendar_schedule_data: DataCache[List[ScheduleEvent]] = DataCache()
         self.daily_schedule_data: DataCache[List[ScheduleEvent]] = DataCache()
\ No newline at end of file
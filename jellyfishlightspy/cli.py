@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+from typing import List, Dict, Optional, Any
+from .helpers import JellyFishException
+from .const import DEFAULT_TIMEOUT, DEFAULT_DAEMON_SOCKET_NAME, DEFAULT_DAEMON_IDLE_TIMEOUT
+
+# NOTE: the controller, daemon, and subprocess modules are imported only where needed so that commands sent to a running daemon
+# don't pay for importing them
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="jellyfish", description="Control JellyFish Lighting controllers from the command line")
+    parser.add_argument("--host", default=os.environ.get("JF_HOST"), help="controller hostname or address (defaults to the JF_HOST environment variable)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds to wait for the controller to respond")
+    parser.add_argument("--socket", help="path of the daemon's Unix domain socket (defaults to a directory private to the current user)")
+    parser.add_argument("--no-daemon", action="store_true", help="connect to the controller directly instead of through the daemon")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, help in [("on", "turn zones on"), ("off", "turn zones off"), ("state", "print the state of zones")]:
+        commands.add_parser(command, help=help).add_argument("zones", nargs="*", help="zone names (defaults to all zones)")
+    pattern = commands.add_parser("pattern", help="run a preset pattern")
+    pattern.add_argument("pattern", help="pattern name (e.g. 'Colors/Blue')")
+    pattern.add_argument("zones", nargs="*", help="zone names (defaults to all zones)")
+    color = commands.add_parser("color", help="set zones to a solid color")
+    color.add_argument("rgb", type=int, nargs=3, metavar=("R", "G", "B"), help="color intensity values between 0 and 255")
+    color.add_argument("zones", nargs="*", help="zone names (defaults to all zones)")
+    color.add_argument("--brightness", type=int, default=100, help="brightness between 0 and 100")
+    commands.add_parser("zones", help="print zone names")
+    commands.add_parser("patterns", help="print pattern names")
+    commands.add_parser("name", help="print the controller's name")
+    daemon = commands.add_parser("daemon", help="run the daemon in the foreground")
+    daemon.add_argument("--idle-timeout", type=float, default=DEFAULT_DAEMON_IDLE_TIMEOUT, help="seconds without a request before the daemon exits")
+    daemon.add_argument("--stop", action="store_true", help="stop a running daemon")
+    return parser
+
+def daemon_supported() -> bool:
+    """Returns True if the platform supports the daemon (which listens on a Unix domain socket)"""
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "getuid")
+
+def default_socket_path() -> Optional[str]:
+    """
+    Returns the path of the daemon's socket in a directory private to the current user ($XDG_RUNTIME_DIR/jellyfish, or
+    jellyfish-<uid> in the temporary directory), or None if the platform doesn't support the daemon
+    """
+    if not daemon_supported():
+        return None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        directory = os.path.join(runtime_dir, "jellyfish")
+    else:
+        import tempfile
+        directory = os.path.join(tempfile.gettempdir(), f"jellyfish-{os.getuid()}")
+    return os.path.join(directory, DEFAULT_DAEMON_SOCKET_NAME)
+
+def check_socket_owner(socket_path: str) -> None:
+    """Raises a JellyFishException if the socket belongs to another user. Raises an OSError if it doesn't exist"""
+    if os.stat(socket_path).st_uid != os.getuid():
+        raise JellyFishException(f"Daemon socket {socket_path} is owned by another user")
+
+def send_daemon_request(request: Dict[str, Any], socket_path: Optional[str]=None, timeout: float=DEFAULT_TIMEOUT) -> Any:
+    """Sends a request to the daemon and returns the result. Raises an OSError if the daemon is not running"""
+    socket_path = socket_path or default_socket_path()
+    if socket_path is None:
+        raise JellyFishException("The daemon isn't supported on this platform (it requires Unix domain sockets)")
+    # Don't send commands to a socket another user created in our place
+    check_socket_owner(socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            response = json.loads(f.readline())
+    if "error" in response:
+        raise JellyFishException(response["error"])
+    return response["result"]
+
+def _start_daemon(socket_path: str, timeout: float) -> None:
+    """Starts the daemon in a background process and waits for it to begin listening"""
+    import subprocess
+    subprocess.Popen(
+        [sys.executable, "-m", "jellyfishlightspy.cli", "--socket", socket_path, "daemon"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    start_ts = time.monotonic()
+    while not os.path.exists(socket_path):
+        if time.monotonic() - start_ts > timeout:
+            raise JellyFishException(f"Timed out waiting for the daemon to listen on {socket_path}")
+        time.sleep(.01)
+
+def _run_with_daemon(host: str, command: str, args: Dict[str, Any], socket_path: str, timeout: float) -> Any:
+    request = {"host": host, "command": command, "args": args}
+    try:
+        return send_daemon_request(request, socket_path, timeout)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if os.path.exists(socket_path):
+            # Stale socket file left behind by a daemon that did not exit cleanly
+            os.unlink(socket_path)
+        _start_daemon(socket_path, timeout)
+    # Allow extra time for the new daemon to connect to the controller
+    return send_daemon_request(request, socket_path, timeout * 2)
+
+def _run_without_daemon(host: str, command: str, args: Dict[str, Any], timeout: float) -> Any:
+    from .controller import JellyFishController
+    from .commands import run_command
+    controller = JellyFishController(host)
+    controller.connect(timeout)
+    try:
+        return run_command(controller, command, args)
+    finally:
+        controller.disconnect(timeout)
+
+def _print_result(result: Any) -> None:
+    if isinstance(result, list):
+        for item in result:
+            print(item)
+    elif isinstance(result, dict):
+        for key, value in result.items():
+            print(f"{key}: {value}")
+    elif result is not None:
+        print(result)
+
+def main(argv: Optional[List[str]]=None) -> int:
+    """Entry point for the jellyfish command"""
+    args = _parser().parse_args(argv)
+    try:
+        socket_path = (args.socket or default_socket_path()) if daemon_supported() else None
+        if args.command == "daemon":
+            if socket_path is None:
+                raise JellyFishException("The daemon isn't supported on this platform (it requires Unix domain sockets)")
+            if args.stop:
+                try:
+                    send_daemon_request({"command": "shutdown"}, socket_path, args.timeout)
+                except (FileNotFoundError, ConnectionRefusedError):
+                    pass
+                return 0
+            from .daemon import JellyFishDaemon
+            JellyFishDaemon(socket_path, args.idle_timeout).serve_forever()
+            return 0
+        if not args.host:
+            raise JellyFishException("A controller host is required (use --host or set the JF_HOST environment variable)")
+        command_args = {k: v for k, v in vars(args).items() if k in ["zones", "pattern", "rgb", "brightness", "timeout"]}
+        if args.no_daemon or socket_path is None:
+            result = _run_without_daemon(args.host, args.command, command_args, args.timeout)
+        else:
+            result = _run_with_daemon(args.host, args.command, command_args, socket_path, args.timeout)
+        _print_result(result)
+        return 0
+    except (JellyFishException, OSError) as e:
+        print(f"jellyfish: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+from typing import Dict, Any, Callable
+from .helpers import JellyFishException
+
+
+def _zones(args: Dict[str, Any]):
+    return args.get("zones") or None
+
+def _zone_states(controller, args: Dict[str, Any]) -> Dict[str, Any]:
+    states = controller.get_zone_states(_zones(args), timeout=args["timeout"])
+    return {zone: {"on": state.is_on, "file": state.file} for zone, state in states.items()}
+
+COMMANDS: Dict[str, Callable[[Any, Dict[str, Any]], Any]] = {
+    "on": lambda jfc, args: jfc.turn_on(_zones(args), timeout=args["timeout"]),
+    "off": lambda jfc, args: jfc.turn_off(_zones(args), timeout=args["timeout"]),
+    "pattern": lambda jfc, args: jfc.apply_pattern(args["pattern"], _zones(args), timeout=args["timeout"]),
+    "color": lambda jfc, args: jfc.apply_color(tuple(args["rgb"]), args["brightness"], _zones(args), timeout=args["timeout"]),
+    "state": _zone_states,
+    "zones": lambda jfc, args: jfc.zone_names,
+    "patterns": lambda jfc, args: jfc.pattern_names,
+    "name": lambda jfc, args: jfc.name,
+}
+
+def run_command(controller, command: str, args: Dict[str, Any]) -> Any:
+    """Executes a CLI command against a connected JellyFishController and returns a JSON-serializable result"""
+    if command not in COMMANDS:
+        raise JellyFishException(f"Command '{command}' is invalid (valid values are {list(COMMANDS)})")
+    return COMMANDS[command](controller, args)
@@ -0,0 +1,75 @@
+from array import array
+from typing import Any, Dict, List, Optional
+from .helpers import JellyFishException, import_numpy, require_numpy
+from .pixelmap import PixelMap
+from .validators import _is_ndarray
+
+# A frame holds one color per physical pixel of a group of zones, so that an animation can span zones without knowing where
+# one zone ends and the next begins (or which of them run backward). Its pixels are ordered by port (in the order of
+# PixelMap.ports) and then by physical pixel index. Pixels of the ports that aren't mapped to any of the zones are skipped.
+
+class FrameCompositor:
+    """
+    Splits frames spanning several zones into the zones' light strings. The position in the frame of each zone pixel is
+    computed once, so that splitting is a single gather (vectorized for NumPy arrays)
+    """
+
+    def __init__(self, pixel_map: PixelMap, zones: List[str]):
+        self.zones = list(zones)
+        ports = pixel_map.ports
+        pixels: Dict[tuple, None] = {}
+        zone_pixels = []
+        for zone in self.zones:
+            _, port_ids, indexes = pixel_map.indexes(zone)
+            physical = list(zip(port_ids, indexes))
+            pixels.update(dict.fromkeys(physical))
+            zone_pixels.append(physical)
+        # Zones that overlap share frame positions
+        positions = {pixel: i for i, pixel in enumerate(sorted(pixels))}
+        self.num_pixels = len(positions)
+        self.__gather = array("l")
+        self.__offsets: List[int] = []
+        for physical in zone_pixels:
+            self.__gather.extend([positions[pixel] for pixel in physical])
+            self.__offsets.append(len(self.__gather))
+        self.__np_gather: Optional[Any] = None
+        self.ports = [ports[port_id] for port_id in sorted({port_id for port_id, _ in pixels})]
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"zones": self.zones, "num_pixels": self.num_pixels})
+
+    def __numpy_gather(self, np) -> Any:
+        if self.__np_gather is None:
+            self.__np_gather = np.asarray(self.__gather, dtype=np.intp)
+        return self.__np_gather
+
+    def split(self, frame: Any) -> Dict[str, Any]:
+        """
+        Returns the light string of each zone in a frame (a list of RGB tuples or a NumPy array of shape (pixels, 3)). The
+        light strings of a NumPy frame are arrays
+        """
+        if len(frame) != self.num_pixels:
+            raise JellyFishException(f"Frame has {len(frame)} pixels (zones {self.zones} have {self.num_pixels} pixels)")
+        if _is_ndarray(frame):
+            np = import_numpy()
+            return dict(zip(self.zones, np.split(frame[self.__numpy_gather(np)], self.__offsets[:-1])))
+        gathered = list(map(frame.__getitem__, self.__gather))
+        starts = [0] + self.__offsets[:-1]
+        return {zone: gathered[start:end] for zone, start, end in zip(self.zones, starts, self.__offsets)}
+
+    def join(self, light_strings: Dict[str, Any]) -> Any:
+        """
+        Combines light strings of the zones (one per zone, each the length of its zone) into a frame, the inverse of split.
+        Returns a NumPy array of shape (pixels, 3) of RGB bytes. Requires NumPy
+        """
+        np = require_numpy("Joining light strings")
+        missing = [zone for zone in self.zones if zone not in light_strings]
+        if missing:
+            raise JellyFishException(f"Light strings of zones {missing} are missing")
+        frame = np.zeros((self.num_pixels, 3), dtype=np.uint8)
+        if self.zones:
+            try:
+                frame[self.__numpy_gather(np)] = np.concatenate([np.asarray(light_strings[zone], dtype=np.uint8).reshape(-1, 3) for zone in self.zones])
+            except ValueError as e:
+                raise JellyFishException("Light strings must have one RGB value per pixel of their zones") from e
+        return frame
@@ -25,4 +25,16 @@ VALID_ACTION_TYPES = ["RUN", "STOP"]
 VALID_START_FROMS = ["sunrise", "sunset", "time"]
 VALID_DAYS = ["M", "T", "W", "TH", "F", "SA", "S"]
 
-DEFAULT_TIMEOUT = 10
\ No newline at end of file
+DEFAULT_TIMEOUT = 10
+DEFAULT_PORT = 9000
+DEFAULT_PROXY_MAX_AGE = 5
+DEFAULT_PROXY_MAX_MESSAGE_SIZE = 1 << 20
+DEFAULT_PATTERN_BATCH_SIZE = 10
+DEFAULT_PATTERN_BATCHES_IN_FLIGHT = 2
+DEFAULT_SAVE_WINDOW = 8
+DEFAULT_VALIDATION_MEMO_SIZE = 4096
+DEFAULT_RENDER_CACHE_SIZE = 256
+DEFAULT_ANIMATION_FPS = 20
+DEFAULT_GAMMA = 2.2
+DEFAULT_DAEMON_IDLE_TIMEOUT = 900
+DEFAULT_DAEMON_SOCKET_NAME = "daemon.sock"
@@ -1,14 +1,27 @@
 # https://medium.com/@joel.barmettler/how-to-upload-your-python-package-to-pypi-65edc5fe9c56
 #TODO: get rid of above once this is done
 
-import websocket
-from typing import Dict, List, Tuple, Optional, Callable, Any
-from threading import Thread
-from .const import LOGGER, DEFAULT_TIMEOUT
-from .model import TimeConfig, Pattern, RunConfig, PatternConfig, ZoneState, ZoneConfig, FirmwareVersion, ScheduleEvent
-from .cache import JellyFishCache
+import os
+import time
+from queue import Queue, Empty
+from collections import deque
+from datetime import date, datetime, timedelta, tzinfo
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Callable, Iterator, Any, Union
+from threading import Thread, Lock
+from .const import LOGGER, DEFAULT_TIMEOUT, DEFAULT_PORT, DEFAULT_PATTERN_BATCH_SIZE, DEFAULT_PATTERN_BATCHES_IN_FLIGHT, DEFAULT_SAVE_WINDOW, DEFAULT_ANIMATION_FPS, DEFAULT_GAMMA
+from .model import TimeConfig, Pattern, RunConfig, PatternConfig, ZoneState, ZoneConfig, FirmwareVersion, ScheduleEvent, count_pixels
+from .cache import JellyFishCache, DataCache, NameIndex, PatternTree
+from .lightstring import encode_light_string, PIXEL_ENCODING
+from .library import PatternSyncReport, write_pattern_library, write_pattern_directory, read_patterns
+from .pixelmap import PixelMap
+from .compositor import FrameCompositor
+from .animation import Animation, AnimationStats, Timeline
+from .effects import Crossfade
+from .render import render_pattern
+from .schedule import ScheduleTransaction
+from .timeline import ScheduleTimeline, expand_schedules, lint_schedules, resolve_timezone, CONFLICT
 from .monitor import WebSocketMonitor
-from .helpers import JellyFishException, to_json
+from .helpers import JellyFishException, to_json, copy, content_hash, import_websocket, require_numpy
 from .requests import (
     GetNameRequest,
     GetHostnameRequest,
@@ -32,22 +45,90 @@ from .validators import (
     validate_rgb,
     validate_brightness,
     validate_zones,
-    validate_zone_config,
+    validate_zone_configs,
     validate_patterns,
     validate_pattern_config,
-    validate_schedule_event,
+    validate_schedule,
+    validate_pattern_library,
+    ValidationMemo,
 )
 
-# Silence logging - we do our own
-websocket.enableTrace(True, level="FATAL")
+if TYPE_CHECKING:
+    import websocket
+
+class PreparedCommand:
+    """
+    A command that was validated and encoded once so that it can be sent repeatedly with a single socket write.
+    Created by the JellyFishController.prepare_* functions. If the controller's zone or pattern names have changed
+    since the command was prepared, it is validated and encoded again before it is sent.
+    """
+
+    def __init__(self, description: str, prepare: Callable[[], Tuple[List[str], bytes]], versions: Callable[[], Any], send: Callable[[str, List[str], bytes, bool, float], None]):
+        self.description = description
+        self.__prepare = prepare
+        self.__versions = versions
+        self.__send = send
+        self.__lock = Lock()
+        self.__prepared_versions = None
+        self.__refresh()
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"description": self.description, "zones": self.zones})
+
+    def __refresh(self) -> None:
+        # Capture the versions first so that changes made while preparing cause another refresh
+        versions = self.__versions()
+        self.__prepared = self.__prepare()
+        self.__prepared_versions = versions
+
+    @property
+    def zones(self) -> List[str]:
+        """The zones the command applies to"""
+        return list(self.__prepared[0])
+
+    @property
+    def message(self) -> bytes:
+        """The encoded request that is sent to the controller"""
+        return self.__prepared[1]
+
+    def send(self, sync: bool=True, timeout: float=DEFAULT_TIMEOUT) -> None:
+        """
+        Sends the command. If sync is set to True (the default), the function call will not return until a confirmation
+        response is received from the controller or the request times out. Raises a JellyFishException if the command is
+        no longer valid (e.g. a zone or pattern it uses was deleted)
+        """
+        if self.__versions() != self.__prepared_versions:
+            with self.__lock:
+                if self.__versions() != self.__prepared_versions:
+                    LOGGER.debug("Zones or patterns changed; preparing command to %s again", self.description)
+                    self.__refresh()
+        zones, message = self.__prepared
+        self.__send(self.description, zones, message, sync, timeout)
+
 
 class JellyFishController:
     """Main interface that enables retrieving data, saving data, and manipulating the lights"""
 
-    def __init__(self, address: str):
+    def __init__(self, address: str, compact_cache: bool=False, suppress_duplicate_frames: bool=False):
+        """
+        Set compact_cache to True to store cached pattern colors as compact arrays, which reduces memory usage when
+        caching large pattern catalogs (data returned by the controller still uses lists, but data passed to message
+        listeners may contain arrays)
+
+        Set suppress_duplicate_frames to True (or set the attribute of the same name at any time) to skip sending colors
+        and light strings that zones are already showing, e.g. when an animation loop repeats frames. Skipped requests
+        are counted by method name in suppressed_messages
+        """
         self.address = address
-        self.__cache = JellyFishCache()
-        self.__ws: websocket.WebSocketApp
+        self.suppress_duplicate_frames = suppress_duplicate_frames
+        self.suppressed_messages: Dict[str, int] = {"apply_color": 0, "apply_light_string": 0, "apply_frame": 0}
+        self.__suppressed_lock = Lock()
+        self.__cache = JellyFishCache(compact_cache)
+        # Validated schedule events and zone configurations are remembered until the zone or pattern names change
+        self.__validation_memo = ValidationMemo(lambda: (self.__cache.zone_index.version, self.__cache.pattern_index.version))
+        self.__pixel_map: Optional[Tuple[int, PixelMap]] = None # Compiled from the zone configurations of a cache version
+        self.__compositor: Optional[Tuple[PixelMap, FrameCompositor]] = None # The compositor last used by apply_frame
+        self.__ws: "websocket.WebSocketApp"
         self.__ws_thread: Thread
         self.__ws_monitor = WebSocketMonitor(address, self.__cache)
 
@@ -86,10 +167,21 @@ class JellyFishController:
             return self.get_zone_configs()
         return self.__cache.zone_config_data.get_all_entries()
 
+    @property
+    def pixel_map(self) -> PixelMap:
+        """The physical layout of the zones, compiled from their configuration (recompiled only when it changes)"""
+        if self.__cache.zone_config_data.size == 0:
+            self.get_zone_configs()
+        # Read the version first so that configurations updated meanwhile are compiled again next time
+        version = self.__cache.zone_config_data.version
+        if self.__pixel_map is None or self.__pixel_map[0] != version:
+            self.__pixel_map = (version, PixelMap(self.__cache.zone_config_data.get_all_entries()))
+        return self.__pixel_map[1]
+
     @property
     def zone_names(self) -> List[str]:
         """The current zone names (returns cached data if available)"""
-        return list(self.zone_configs)
+        return list(self.__zone_index())
 
     @property
     def pattern_list(self) -> List[Pattern]:
@@ -101,7 +193,7 @@ class JellyFishController:
     @property
     def pattern_names(self) -> List[str]:
         """The current pattern names, excluding folders (returns cached data if available)"""
-        return [str(p) for p in self.pattern_list if not p.is_folder]
+        return list(self.__pattern_index())
 
     @property
     def pattern_configs(self) -> Dict[str, PatternConfig]:
@@ -131,11 +223,44 @@ class JellyFishController:
             return self.get_daily_schedule()
         return self.__cache.daily_schedule_data.get_entry()
 
+    def __zone_index(self) -> NameIndex[ZoneConfig]:
+        """The index of cached zone names (retrieves zone configurations if they are not cached)"""
+        if self.__cache.zone_config_data.size == 0:
+            self.get_zone_configs()
+        return self.__cache.zone_index
+
+    def __pattern_index(self) -> NameIndex[Pattern]:
+        """The index of cached pattern names (retrieves the pattern list if it is not cached)"""
+        if self.__cache.pattern_list_data.size == 0:
+            self.get_pattern_list()
+        return self.__cache.pattern_index
+
+    def __pattern_tree(self) -> PatternTree:
+        """The folder index of cached patterns (retrieves the pattern list if it is not cached)"""
+        if self.__cache.pattern_list_data.size == 0:
+            self.get_pattern_list()
+        return self.__cache.pattern_tree
+
+    def list_pattern_folder(self, folder: str="") -> List[str]:
+        """Lists the subfolders (as "Folder/") and patterns directly within a folder, or the top level if not provided (returns cached data if available)"""
+        return self.__pattern_tree().list_folder(folder)
+
+    def walk_patterns(self, folder: str="") -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Walks a pattern folder and its subfolders like os.walk, yielding (folder, subfolders, pattern names) tuples (returns cached data if available)"""
+        return self.__pattern_tree().walk(folder)
+
+    def search_patterns(self, prefix: str) -> List[str]:
+        """Returns the names of all patterns starting with the prefix, e.g. "Christmas/" (returns cached data if available)"""
+        return self.__pattern_tree().search(prefix)
+
     def connect(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> None:
         """Establishes a connection to the JellyFish Lighting controller at the given address and begins listening for messages"""
+        # Zones may have changed while disconnected
+        self.__cache.zone_fingerprints.invalidate()
         try:
+            websocket = import_websocket()
             self.__ws = websocket.WebSocketApp(
-                f"ws://{self.address}:9000",
+                f"ws://{self.address}:{DEFAULT_PORT}",
                 on_open = self.__ws_monitor.on_open,
                 on_close = self.__ws_monitor.on_close,
                 on_message = self.__ws_monitor.on_message,
@@ -154,6 +279,7 @@ class JellyFishController:
 
     def disconnect(self, timeout: Optional[float]=DEFAULT_TIMEOUT):
         """Disconnects from the JellyFish Lighting controller"""
+        self.__cache.zone_fingerprints.invalidate()
         try:
             self.__ws.close()
             self.__ws_thread.join(timeout)
@@ -167,19 +293,110 @@ class JellyFishController:
     def add_listener(self, on_open:Callable=None, on_close:Callable=None, on_message:Callable=None, on_error:Callable=None) -> None:
         self.__ws_monitor.add_listener(on_open, on_close, on_message, on_error)
 
-    def __send(self, data: Any) -> None:
-        """Sends data to the controller over the web socket connection"""
+    def __send(self, data: Any) -> float:
+        """
+        Sends data to the controller over the web socket connection. Returns the time (time.perf_counter()) just before
+        the data was sent, for use when awaiting the response
+        """
         if not self.connected:
             raise JellyFishException("Not connected to controller")
         msg = to_json(data)
         LOGGER.debug("Sending: %s", msg)
+        if isinstance(data, SetZoneStateRequest):
+            # The zones will no longer show what was last applied (if successful, callers update their fingerprints)
+            self.__cache.zone_fingerprints.invalidate(data.runPattern.zoneName)
+        ts = time.perf_counter()
         self.__ws.send(msg)
+        return ts
+
+    def __suppress_duplicate(self, method: str, zones: List[str], input_key: Any, request: Optional[SetZoneStateRequest]=None) -> bool:
+        """
+        Returns True (and counts the suppressed message) if duplicate frames are suppressed and the zones are already showing
+        what the request would apply. Checks the input key if the request has not been built yet, or the request's state key
+        """
+        if not self.suppress_duplicate_frames:
+            return False
+        fingerprints = self.__cache.zone_fingerprints
+        if request is None:
+            duplicate = fingerprints.matches_input(zones, input_key)
+        else:
+            state = request.runPattern
+            duplicate = fingerprints.matches_state(zones, fingerprints.state_key(state.state, state.file, state.data))
+        if duplicate:
+            with self.__suppressed_lock:
+                self.suppressed_messages[method] += 1
+            LOGGER.debug("Suppressed duplicate %s request for zones %s", method, zones)
+        return duplicate
+
+    def __send_frame(self, zones: List[str], input_key: Any, request: SetZoneStateRequest) -> float:
+        """Sends a zone state request and records its fingerprint for the zones if duplicate frames are suppressed"""
+        sent_ts = self.__send(request)
+        self.__record_frame(zones, input_key, request)
+        return sent_ts
+
+    def __send_frames(self, frames: List[Tuple[List[str], Any, SetZoneStateRequest]]) -> float:
+        """
+        Sends (zones, input key, request) frames back to back, like __send_frame. All requests are encoded before the first
+        is sent so that the zones change as close together as possible. Returns the time just before the first was sent
+        """
+        if not self.connected:
+            raise JellyFishException("Not connected to controller")
+        messages = [to_json(request) for _, _, request in frames]
+        sent_ts = time.perf_counter()
+        for (zones, input_key, request), msg in zip(frames, messages):
+            LOGGER.debug("Sending: %s", msg)
+            self.__cache.zone_fingerprints.invalidate(zones)
+            self.__ws.send(msg)
+            self.__record_frame(zones, input_key, request)
+        return sent_ts
+
+    def __record_frame(self, zones: List[str], input_key: Any, request: SetZoneStateRequest) -> None:
+        if self.suppress_duplicate_frames:
+            state = request.runPattern
+            fingerprints = self.__cache.zone_fingerprints
+            fingerprints.update(zones, input_key, fingerprints.state_key(state.state, state.file, state.data))
+
+    def __send_pipelined(self, requests: List[Tuple[str, Any]], data_cache: DataCache, window: int, timeout: float, progress: Optional[Callable[[int, int], None]]=None) -> None:
+        """
+        Sends (entry key, request) pairs while keeping at most window requests awaiting the update of their cache entry, instead
+        of waiting for each response before sending the next request. Calls progress with the number of completed and total requests
+        as responses arrive. Raises a JellyFishException if any response is not received within the timeout
+        """
+        if window < 1:
+            raise JellyFishException("The number of requests in flight must be at least 1")
+        received: "Queue[str]" = Queue()
+        listener = lambda key, data: received.put(key)
+        # Listen before sending any requests so that no responses are missed
+        data_cache.add_listener(listener)
+        try:
+            queued = deque(requests)
+            pending: Dict[str, float] = {} # Maps entry keys to the deadline of their request
+            completed = 0
+            while queued or pending:
+                while queued and len(pending) < window:
+                    key, request = queued.popleft()
+                    self.__send(request)
+                    pending[key] = time.perf_counter() + timeout
+                try:
+                    key = received.get(timeout=max(0, min(pending.values()) - time.perf_counter()))
+                except Empty:
+                    now = time.perf_counter()
+                    expired = [key for key, deadline in pending.items() if deadline <= now]
+                    if expired:
+                        raise JellyFishException(f"Requests for {expired} timed out ({completed} of {len(requests)} completed)")
+                    continue
+                if pending.pop(key, None) is not None:
+                    completed += 1
+                    if progress:
+                        progress(completed, len(requests))
+        finally:
+            data_cache.remove_listener(listener)
 
     def get_name(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> str:
         """Retrieves the user-defined name for the controller"""
         try:
-            self.__send(GetNameRequest())
-            if not self.__cache.name_data.await_update(timeout):
+            sent_ts = self.__send(GetNameRequest())
+            if not self.__cache.name_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request for controller name timed out")
             return self.__cache.name_data.get_entry()
         except JellyFishException:
@@ -190,8 +407,8 @@ class JellyFishController:
     def get_hostname(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> str:
         """Retrieves the hostname from the controller"""
         try:
-            self.__send(GetHostnameRequest())
-            if not self.__cache.hostname_data.await_update(timeout):
+            sent_ts = self.__send(GetHostnameRequest())
+            if not self.__cache.hostname_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request for controller hostname timed out")
             return self.__cache.hostname_data.get_entry()
         except JellyFishException:
@@ -202,8 +419,8 @@ class JellyFishController:
     def get_firmware_version(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> FirmwareVersion:
         """Retrieves version information from the controller"""
         try:
-            self.__send(GetFirmwareVersionRequest())
-            if not self.__cache.firmware_version_data.await_update(timeout):
+            sent_ts = self.__send(GetFirmwareVersionRequest())
+            if not self.__cache.firmware_version_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request for controller version information timed out")
             return self.__cache.firmware_version_data.get_entry()
         except JellyFishException:
@@ -214,8 +431,8 @@ class JellyFishController:
     def get_time_config(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> TimeConfig:
         """Retrieves timezone configuration information from the controller"""
         try:
-            self.__send(GetTimeConfigRequest())
-            if not self.__cache.time_config_data.await_update(timeout):
+            sent_ts = self.__send(GetTimeConfigRequest())
+            if not self.__cache.time_config_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request for time config information timed out")
             return self.__cache.time_config_data.get_entry()
         except JellyFishException:
@@ -230,8 +447,8 @@ class JellyFishController:
     def get_zone_configs(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> Dict[str, ZoneConfig]:
         """Retrieves the list of current zones and their configuration from the controller and caches the data"""
         try:
-            self.__send(GetZoneConfigRequest())
-            if not self.__cache.zone_config_data.await_finalization(timeout):
+            sent_ts = self.__send(GetZoneConfigRequest())
+            if not self.__cache.zone_config_data.await_finalization(timeout, sent_ts):
                 raise JellyFishException("Request for zone config data timed out")
             return self.__cache.zone_config_data.get_all_entries()
         except JellyFishException:
@@ -246,8 +463,8 @@ class JellyFishController:
     def get_pattern_list(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> List[Pattern]:
         """Retrieves the list of preset patterns from the controller and caches the data"""
         try:
-            self.__send(GetPatternListRequest())
-            if not self.__cache.pattern_list_data.await_finalization(timeout):
+            sent_ts = self.__send(GetPatternListRequest())
+            if not self.__cache.pattern_list_data.await_finalization(timeout, sent_ts):
                 raise JellyFishException("Request for pattern list data timed out")
             return list(self.__cache.pattern_list_data.get_all_entries().values())
         except JellyFishException:
@@ -265,9 +482,9 @@ class JellyFishController:
             if not patterns:
                 # clear the cache for a full refresh (ensures deleted records do not remain)
                 self.__cache.pattern_config_data.clear()
-            patterns = validate_patterns(patterns, self.pattern_names) if patterns else self.pattern_names
-            self.__send(GetPatternConfigRequest(patterns))
-            if not self.__cache.pattern_config_data.await_update(timeout, patterns):
+            patterns = validate_patterns(patterns, self.__pattern_index().names) if patterns else self.pattern_names
+            sent_ts = self.__send(GetPatternConfigRequest(patterns))
+            if not self.__cache.pattern_config_data.await_update(timeout, patterns, sent_ts):
                 raise JellyFishException(f"Request for the configuration of patterns '{patterns}' timed out")
             return self.__cache.pattern_config_data.get_all_entries()
         except JellyFishException:
@@ -275,6 +492,67 @@ class JellyFishController:
         except Exception as e:
             raise JellyFishException(f"Error encountered while retrieving config data for pattern(s) {patterns}") from e
 
+    def iter_pattern_configs(self, patterns: List[str]=None, batch_size: int=DEFAULT_PATTERN_BATCH_SIZE, max_in_flight: int=DEFAULT_PATTERN_BATCHES_IN_FLIGHT, retries: int=1, timeout: Optional[float]=DEFAULT_TIMEOUT) -> Iterator[Tuple[str, PatternConfig]]:
+        """
+        Retrieves the configurations for the specified patterns (or all patterns if not provided) from the controller and caches the data,
+        yielding (pattern name, config) tuples as each response arrives. Patterns are requested in batches of batch_size with at most
+        max_in_flight batches awaiting responses at a time. Patterns that were not received within the timeout of their batch are
+        requested again up to the number of retries before a JellyFishException is raised. A timeout of None waits indefinitely
+        """
+        patterns = validate_patterns(patterns, self.__pattern_index().names) if patterns else self.pattern_names
+        if batch_size < 1 or max_in_flight < 1:
+            raise JellyFishException("Pattern batch size and number of batches in flight must be at least 1")
+        received: "Queue[str]" = Queue()
+        listener = lambda key, data: received.put(key)
+        # Listen before sending any requests so that no responses are missed
+        self.__cache.pattern_config_data.add_listener(listener)
+        try:
+            # Each batch is a [remaining patterns, attempt number, deadline (None without a timeout)] list
+            queued = deque([set(patterns[i:i + batch_size]), 0, None] for i in range(0, len(patterns), batch_size))
+            in_flight: List[list] = []
+            while queued or in_flight:
+                while queued and len(in_flight) < max_in_flight:
+                    batch = queued.popleft()
+                    self.__send(GetPatternConfigRequest(sorted(batch[0])))
+                    batch[2] = time.perf_counter() + timeout if timeout is not None else None
+                    in_flight.append(batch)
+                deadlines = [batch[2] for batch in in_flight if batch[2] is not None]
+                try:
+                    key = received.get(timeout=max(0, min(deadlines) - time.perf_counter()) if deadlines else None)
+                except Empty:
+                    now = time.perf_counter()
+                    for batch in [batch for batch in in_flight if batch[2] is not None and batch[2] <= now]:
+                        in_flight.remove(batch)
+                        if batch[1] >= retries:
+                            raise JellyFishException(f"Request for the configuration of patterns '{sorted(batch[0])}' timed out")
+                        LOGGER.debug("Retrying request for the configuration of patterns %s", sorted(batch[0]))
+                        # Retry ahead of batches that have not been requested yet
+                        queued.appendleft([batch[0], batch[1] + 1, None])
+                    continue
+                # Responses may also arrive for batches queued for a retry after timing out
+                for batches in [in_flight, queued]:
+                    batch = next((batch for batch in batches if key in batch[0]), None)
+                    if batch:
+                        batch[0].discard(key)
+                        if not batch[0]:
+                            batches.remove(batch)
+                        yield key, self.__cache.pattern_config_data.get_entry(key)
+                        break
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while retrieving config data for pattern(s) {patterns}") from e
+        finally:
+            self.__cache.pattern_config_data.remove_listener(listener)
+
+    def get_folder_pattern_configs(self, folder: str, timeout: Optional[float]=DEFAULT_TIMEOUT) -> Dict[str, PatternConfig]:
+        """Retrieves the configurations of all patterns within a folder and its subfolders from the controller in a single request and caches the data"""
+        patterns = self.search_patterns(folder.rstrip("/") + "/")
+        if not patterns:
+            raise JellyFishException(f"Pattern folder '{folder}' is invalid or empty")
+        configs = self.get_pattern_configs(patterns, timeout)
+        return {pattern: configs[pattern] for pattern in patterns}
+
     def get_zone_state(self, zone: str, timeout: Optional[float]=DEFAULT_TIMEOUT) -> ZoneState:
         """Retrieves the current state of the specified zone from the controller and caches the data"""
         return self.get_zone_states([zone], timeout)[zone]
@@ -285,9 +563,9 @@ class JellyFishController:
             if not zones:
                 # clear the cache for a full refresh (ensures deleted records do not remain)
                 self.__cache.zone_state_data.clear()
-            zones = validate_zones(zones, self.zone_names) if zones else self.zone_names
-            self.__send(GetZoneStateRequest(zones))
-            if not self.__cache.zone_state_data.await_update(timeout, zones):
+            zones = validate_zones(zones, self.__zone_index().names) if zones else self.zone_names
+            sent_ts = self.__send(GetZoneStateRequest(zones))
+            if not self.__cache.zone_state_data.await_update(timeout, zones, sent_ts):
                 raise JellyFishException(f"Request for the state data of zones '{zones}' timed out")
             return self.__cache.zone_state_data.get_all_entries()
         except JellyFishException:
@@ -298,8 +576,8 @@ class JellyFishController:
     def get_calendar_schedule(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> List[ScheduleEvent]:
         """Retrieves the current calendar event schedule from the controller and caches the data"""
         try:
-            self.__send(GetCalendarScheduleRequest())
-            if not self.__cache.calendar_schedule_data.await_update(timeout):
+            sent_ts = self.__send(GetCalendarScheduleRequest())
+            if not self.__cache.calendar_schedule_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request for calendar schedule data timed out")
             return self.__cache.calendar_schedule_data.get_entry()
         except JellyFishException:
@@ -310,8 +588,8 @@ class JellyFishController:
     def get_daily_schedule(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> List[ScheduleEvent]:
         """Retrieves the current daily event schedule from the controller and caches the data"""
         try:
-            self.__send(GetDailyScheduleRequest())
-            if not self.__cache.daily_schedule_data.await_update(timeout):
+            sent_ts = self.__send(GetDailyScheduleRequest())
+            if not self.__cache.daily_schedule_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request for daily schedule data timed out")
             return self.__cache.daily_schedule_data.get_entry()
         except JellyFishException:
@@ -319,12 +597,16 @@ class JellyFishController:
         except Exception as e:
             raise JellyFishException("Error encountered while retrieving daily schedule data") from e
 
+    def __build_turn_on_off(self, on: bool, zones: List[str]) -> Tuple[List[str], SetZoneStateRequest]:
+        zones = validate_zones(zones, self.__zone_index().names) if zones else self.zone_names
+        return zones, SetZoneStateRequest(state=int(on), zoneName=zones)
+
     def __turn_on_off(self, on: bool, zones: List[str], sync: bool, timeout: float) -> None:
         """Convenience function that turns zones on or off"""
         try:
-            zones = validate_zones(zones, self.zone_names) if zones else self.zone_names
-            self.__send(SetZoneStateRequest(state=int(on), zoneName=zones))
-            if sync and not self.__cache.zone_state_data.await_update(timeout, zones):
+            zones, request = self.__build_turn_on_off(on, zones)
+            sent_ts = self.__send(request)
+            if sync and not self.__cache.zone_state_data.await_update(timeout, zones, sent_ts):
                 raise JellyFishException(f"Request to turn {'on' if on else 'off'} zones '{zones}' timed out")
         except JellyFishException:
             raise
@@ -345,80 +627,302 @@ class JellyFishController:
         """
         self.__turn_on_off(False, zones, sync, timeout)
 
-    def apply_light_string(self, light_string: List[Tuple[int, int, int]], brightness: int=100, zones: List[str]=None, sync: bool=True, timeout: float=DEFAULT_TIMEOUT) -> None:
+    def apply_light_string(self, light_string: List[Tuple[int, int, int]], brightness: int=100, zones: List[str]=None, sync: bool=True, timeout: float=DEFAULT_TIMEOUT, encoding: str=PIXEL_ENCODING) -> None:
         """
         Sets lights in the provided zone(s) to a custom string of colors at the given brightness (or all zones
         if not provided. Default brighness=100%). If sync is set to True (the default), the function call will
         not return until a confirmation response is received from the controller or the request times out.
+        The encoding can be "pixel" (the default, one color per light), "palette" (each distinct color once, which is
+        smaller when many lights share colors), or "auto" (whichever is smaller)
         """
         try:
-            zones = validate_zones(zones, self.zone_names) if zones else self.zone_names
-            validate_brightness(brightness)
-            colors = [0,0,0]
-            colors_pos = [-1]
-            for i, rgb in enumerate(light_string):
-                validate_rgb(rgb)
-                colors.extend(rgb)
-                colors_pos.append(i)
-            config = PatternConfig(type="Soffit", colors=colors, colorPos=colors_pos, runData=RunConfig(brightness=brightness))
-            self.__send(SetZoneStateRequest(state=3, zoneName=zones, data=config))
-            if sync and not self.__cache.zone_state_data.await_update(timeout, zones):
+            zones = validate_zones(zones, self.__zone_index().names) if zones else self.zone_names
+            input_key = ("light_string", tuple(map(tuple, light_string)), brightness, encoding) if self.suppress_duplicate_frames else None
+            if self.__suppress_duplicate("apply_light_string", zones, input_key):
+                return
+            request = SetZoneStateRequest(state=3, zoneName=zones, data=encode_light_string(light_string, brightness, encoding))
+            if self.__suppress_duplicate("apply_light_string", zones, input_key, request):
+                return
+            sent_ts = self.__send_frame(zones, input_key, request)
+            if sync and not self.__cache.zone_state_data.await_update(timeout, zones, sent_ts):
                 raise JellyFishException(f"Request to apply light string on zones {zones} timed out")
         except JellyFishException:
             raise
         except Exception as e:
             raise JellyFishException(f"Error encountered while applying light string to zone(s) {zones}") from e
 
+    def compositor(self, zones: List[str]=None) -> FrameCompositor:
+        """
+        Returns a compositor that splits frames spanning the provided zones (or all zones if not provided) into their light
+        strings (see FrameCompositor). The compositor last returned is reused until the zones or their configurations change
+        """
+        zones = validate_zones(zones, self.__zone_index().names) if zones else self.zone_names
+        pixel_map = self.pixel_map
+        cached = self.__compositor
+        if cached is not None and cached[0] is pixel_map and cached[1].zones == zones:
+            return cached[1]
+        compositor = FrameCompositor(pixel_map, zones)
+        self.__compositor = (pixel_map, compositor)
+        return compositor
+
+    def apply_frame(self, frame: Any, brightness: int=100, zones: List[str]=None, sync: bool=True, timeout: float=DEFAULT_TIMEOUT, encoding: str=PIXEL_ENCODING) -> None:
+        """
+        Sets lights across the provided zones (or all zones if not provided) to a frame at the given brightness. The frame
+        holds one color per physical pixel of the zones, ordered by port and pixel index (see FrameCompositor), as a list of
+        RGB tuples or a NumPy array of shape (pixels, 3). The zones' light strings are sent back to back so that they change
+        together. If sync is set to True (the default), the function call will not return until confirmation responses are
+        received for all zones or the request times out. See apply_light_string for the encoding
+        """
+        try:
+            sent_zones, sent_ts = self.__apply_frame(frame, brightness, zones, encoding)
+            if sync and sent_zones and not self.__cache.zone_state_data.await_update(timeout, sent_zones, sent_ts):
+                raise JellyFishException(f"Request to apply frame on zones {sent_zones} timed out")
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while applying frame to zone(s) {zones}") from e
+
+    def __apply_frame(self, frame: Any, brightness: int, zones: Optional[List[str]], encoding: str) -> Tuple[List[str], float]:
+        """Sends the light strings of a frame's zones (except suppressed duplicates). Returns the zones sent and the time they were sent"""
+        compositor = self.compositor(zones)
+        validate_brightness(brightness)
+        frames = []
+        for zone, light_string in compositor.split(frame).items():
+            input_key = ("light_string", tuple(map(tuple, light_string)), brightness, encoding) if self.suppress_duplicate_frames else None
+            if self.__suppress_duplicate("apply_frame", [zone], input_key):
+                continue
+            request = SetZoneStateRequest(state=3, zoneName=[zone], data=encode_light_string(light_string, brightness, encoding))
+            if self.__suppress_duplicate("apply_frame", [zone], input_key, request):
+                continue
+            frames.append(([zone], input_key, request))
+        if not frames:
+            return [], time.perf_counter()
+        return [frame_zones[0] for frame_zones, _, _ in frames], self.__send_frames(frames)
+
+    def __frame_sender(self, zones: List[str], brightness: int, encoding: str, coalesce: bool, timeout: float) -> Tuple[Callable[[Any], None], Optional[Callable[[], bool]]]:
+        """
+        Returns functions that send an animation's frames without waiting for responses, and (if coalescing) that return
+        True once the controller has responded to the last frame sent (or it timed out)
+        """
+        last: List[Tuple[List[str], float]] = [([], 0.0)]
+        def send(frame: Any) -> None:
+            last[0] = self.__apply_frame(frame, brightness, zones, encoding)
+        def ready() -> bool:
+            sent_zones, sent_ts = last[0]
+            return not sent_zones or time.perf_counter() - sent_ts > timeout or self.__cache.zone_state_data.await_update(0, sent_zones, sent_ts)
+        return send, ready if coalesce else None
+
+    def animate(self, frames: Union[Timeline, Callable[[float], Any]], zones: List[str]=None, fps: float=DEFAULT_ANIMATION_FPS, brightness: int=100, duration: Optional[float]=None, encoding: str=PIXEL_ENCODING, coalesce: bool=False, timeout: float=DEFAULT_TIMEOUT) -> Animation:
+        """
+        Starts playing an animation across the provided zones (or all zones if not provided) on a new thread and returns it
+        (see Animation). The frames come from a timeline or a function that returns the frame at a number of seconds after
+        playback started, and are applied with apply_frame without waiting for responses. Timelines that don't loop stop
+        after their last keyframe unless a duration is given; otherwise playback continues until the animation is stopped.
+        Set coalesce to True to skip frames until the controller has responded to the previous one (or the timeout passes)
+        """
+        try:
+            zones = self.compositor(zones).zones
+            validate_brightness(brightness)
+            source = frames.frame_at if isinstance(frames, Timeline) else frames
+            if duration is None and isinstance(frames, Timeline) and not frames.loop:
+                duration = frames.duration
+            send, ready = self.__frame_sender(zones, brightness, encoding, coalesce, timeout)
+            return Animation(source, send, fps, duration, ready).start()
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while starting animation on zone(s) {zones}") from e
+
+    def __current_light_string(self, zone: str, num_pixels: int, timeout: float) -> Any:
+        """
+        Returns a preview of what a zone is showing, rendered from its cached state and the configuration of its pattern
+        (retrieved if it isn't cached). Returns black if the zone is off or its pattern is unknown
+        """
+        state = self.__cache.zone_state_data.get_entry(zone)
+        config = None
+        if state is not None and state.is_on:
+            config = state.data
+            if not config and state.file in self.__pattern_index():
+                config = self.__cache.pattern_config_data.get_entry(state.file) or self.get_pattern_config(state.file, timeout)
+        if not config:
+            return [(0, 0, 0)] * num_pixels
+        return render_pattern(config, num_pixels)[0]
+
+    def transition_to(self, target: Union[Tuple[int, int, int], List[Tuple[int, int, int]], PatternConfig, str], duration: float=1.0, zones: List[str]=None, brightness: int=100, fps: float=DEFAULT_ANIMATION_FPS, gamma: float=DEFAULT_GAMMA, sync: bool=True, timeout: float=DEFAULT_TIMEOUT, encoding: str=PIXEL_ENCODING) -> AnimationStats:
+        """
+        Crossfades the provided zones (or all zones if not provided) from what they are showing to a target over duration
+        seconds, then applies the target itself. The target is a color (an RGB tuple), a light string (a list of RGB tuples
+        or a NumPy array of shape (pixels, 3)), a pattern configuration, or a pattern name (brightness applies to colors and
+        light strings). What zones are showing is rendered from their last known state (see render_pattern), so pattern
+        animations are approximated by their first frame. A duration of zero applies the target without a transition. Colors are blended in linear light with the given gamma (see
+        effects.Crossfade), and frames are streamed at up to fps frames per second, skipping frames while the controller
+        hasn't responded to the previous one. Blocks until the transition is finished and returns its playback statistics.
+        If sync is set to True (the default), also waits for the controller to confirm the target. Frames and light string
+        targets are sent with the encoding (see apply_light_string). Requires NumPy
+        """
+        try:
+            np = require_numpy("Transitions")
+            compositor = self.compositor(zones)
+            zones = compositor.zones
+            validate_brightness(brightness)
+            if isinstance(target, str):
+                validate_patterns([target], self.__pattern_index().names)
+                config = self.get_pattern_config(target, timeout)
+                finish = lambda: self.apply_pattern(target, zones, sync, timeout)
+            elif isinstance(target, PatternConfig):
+                config = target
+                finish = lambda: self.apply_pattern_config(target, zones, sync, timeout)
+            elif isinstance(target, tuple):
+                validate_rgb(target)
+                config = PatternConfig(type="Color", colors=[*target], runData=RunConfig(brightness=brightness))
+                finish = lambda: self.apply_color(target, brightness, zones, sync, timeout)
+            else:
+                config = encode_light_string(target, brightness)
+                finish = lambda: self.apply_light_string(target, brightness, zones, sync, timeout, encoding)
+            if not duration >= 0:
+                raise JellyFishException(f"Transition duration {duration} is invalid (must be zero or higher)")
+            stats = AnimationStats()
+            if duration > 0:
+                pixel_map = self.pixel_map
+                start = compositor.join({zone: self.__current_light_string(zone, pixel_map.num_pixels(zone), timeout) for zone in zones})
+                end = compositor.join({zone: render_pattern(config, pixel_map.num_pixels(zone))[0] for zone in zones})
+                if not np.array_equal(start, end):
+                    send, ready = self.__frame_sender(zones, 100, encoding, True, timeout)
+                    animation = Animation(Crossfade(start, end, duration, gamma), send, fps, duration, ready)
+                    stats = animation.play()
+                    if animation.error is not None:
+                        raise animation.error
+            # The fade ends on a preview of the target, so the target itself is applied afterward (e.g. so patterns animate)
+            finish()
+            return stats
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while transitioning zone(s) {zones}") from e
+
+    def __build_apply_color(self, rgb: Tuple[int, int, int], brightness: int, zones: List[str]) -> Tuple[List[str], SetZoneStateRequest]:
+        zones = validate_zones(zones, self.__zone_index().names) if zones else self.zone_names
+        validate_rgb(rgb)
+        validate_brightness(brightness)
+        config = PatternConfig(type="Color", colors=[*rgb], runData=RunConfig(brightness=brightness))
+        return zones, SetZoneStateRequest(state=1, zoneName=zones, data=config)
+
     def apply_color(self, rgb: Tuple[int, int, int], brightness: int=100, zones: List[str]=None, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
         """Sets all lights in the provided zone(s) to a solid color at the given brightness (or all zones if not provided. Default brighness=100%)"""
         try:
-            zones = validate_zones(zones, self.zone_names) if zones else self.zone_names
-            validate_rgb(rgb)
-            validate_brightness(brightness)
-            config = PatternConfig(type="Color", colors=[*rgb], runData=RunConfig(brightness=brightness))
-            self.__send(SetZoneStateRequest(state=1, zoneName=zones, data=config))
-            if sync and not self.__cache.zone_state_data.await_update(timeout, zones):
-                raise JellyFishException(f"Request to apply color {color} on zones {zones} timed out")
+            zones = validate_zones(zones, self.__zone_index().names) if zones else self.zone_names
+            input_key = ("color", tuple(rgb), brightness) if self.suppress_duplicate_frames else None
+            if self.__suppress_duplicate("apply_color", zones, input_key):
+                return
+            zones, request = self.__build_apply_color(rgb, brightness, zones)
+            if self.__suppress_duplicate("apply_color", zones, input_key, request):
+                return
+            sent_ts = self.__send_frame(zones, input_key, request)
+            if sync and not self.__cache.zone_state_data.await_update(timeout, zones, sent_ts):
+                raise JellyFishException(f"Request to apply color {rgb} on zones {zones} timed out")
         except JellyFishException:
             raise
         except Exception as e:
             raise JellyFishException(f"Error encountered while applying color to zone(s) {zones}") from e
 
+    def __build_apply_pattern(self, pattern: str, zones: List[str]) -> Tuple[List[str], SetZoneStateRequest]:
+        zones = validate_zones(zones, self.__zone_index().names) if zones else self.zone_names
+        validate_patterns([pattern], self.__pattern_index().names)
+        return zones, SetZoneStateRequest(state=1, zoneName=zones, file=pattern)
+
     def apply_pattern(self, pattern: str, zones: List[str]=None, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
         """Activates a predefined pattern on the provided zone(s) (or all zones if not provided)"""
         try:
-            zones = validate_zones(zones, self.zone_names) if zones else self.zone_names
-            validate_patterns([pattern], self.pattern_names)
-            self.__send(SetZoneStateRequest(state=1, zoneName=zones, file=pattern))
-            if sync and not self.__cache.zone_state_data.await_update(timeout, zones):
+            zones, request = self.__build_apply_pattern(pattern, zones)
+            sent_ts = self.__send(request)
+            if sync and not self.__cache.zone_state_data.await_update(timeout, zones, sent_ts):
                 raise JellyFishException(f"Request to apply pattern '{pattern}' on zones {zones} timed out")
         except JellyFishException:
             raise
         except Exception as e:
             raise JellyFishException(f"Error encountered while applying pattern to zone(s) {zones}") from e
 
+    def __build_apply_pattern_config(self, config: PatternConfig, zones: List[str]) -> Tuple[List[str], SetZoneStateRequest]:
+        zones = validate_zones(zones, self.__zone_index().names) if zones else self.zone_names
+        validate_pattern_config(config, zones)
+        return zones, SetZoneStateRequest(state=1, zoneName=zones, data=config)
+
     def apply_pattern_config(self, config: PatternConfig, zones: List[str]=None, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
         """Activates a pattern configuration on the provided zone(s) (or all zones if not provided)"""
         try:
-            zones = validate_zones(zones, self.zone_names) if zones else self.zone_names
-            validate_pattern_config(config, zones)
-            self.__send(SetZoneStateRequest(state=1, zoneName=zones, data=config))
-            if sync and not self.__cache.zone_state_data.await_update(timeout, zones):
+            zones, request = self.__build_apply_pattern_config(config, zones)
+            sent_ts = self.__send(request)
+            if sync and not self.__cache.zone_state_data.await_update(timeout, zones, sent_ts):
                 raise JellyFishException(f"Request to apply pattern config on zones '{zones}' timed out")
         except JellyFishException:
             raise
         except Exception as e:
             raise JellyFishException(f"Error encountered while applying pattern config to zone(s) {zones}") from e
 
+    def __prepare(self, description: str, build: Callable[[], Tuple[List[str], SetZoneStateRequest]]) -> "PreparedCommand":
+        """Creates a prepared command that is rebuilt whenever the zone or pattern names change"""
+        def prepare() -> Tuple[List[str], bytes]:
+            try:
+                zones, request = build()
+                return zones, to_json(request).encode("utf-8")
+            except JellyFishException:
+                raise
+            except Exception as e:
+                raise JellyFishException(f"Error encountered while preparing command to {description}") from e
+        versions = lambda: (self.__cache.zone_index.version, self.__cache.pattern_index.version)
+        return PreparedCommand(description, prepare, versions, self.__send_prepared)
+
+    def __send_prepared(self, description: str, zones: List[str], message: bytes, sync: bool, timeout: float) -> None:
+        """Sends an encoded zone state request and awaits the state updates of its zones"""
+        if not self.connected:
+            raise JellyFishException("Not connected to controller")
+        LOGGER.debug("Sending: %s", message)
+        self.__cache.zone_fingerprints.invalidate(zones)
+        sent_ts = time.perf_counter()
+        try:
+            # Bytes are sent as-is in a text frame
+            self.__ws.send(message)
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while sending command to {description}") from e
+        if sync and not self.__cache.zone_state_data.await_update(timeout, zones, sent_ts):
+            raise JellyFishException(f"Request to {description} on zones {zones} timed out")
+
+    def prepare_turn_on(self, zones: List[str]=None) -> "PreparedCommand":
+        """Prepares a command that turns on the provided zone(s) (or all zones if not provided). See PreparedCommand"""
+        return self.__prepare("turn on zones", lambda: self.__build_turn_on_off(True, zones))
+
+    def prepare_turn_off(self, zones: List[str]=None) -> "PreparedCommand":
+        """Prepares a command that turns off the provided zone(s) (or all zones if not provided). See PreparedCommand"""
+        return self.__prepare("turn off zones", lambda: self.__build_turn_on_off(False, zones))
+
+    def prepare_apply_color(self, rgb: Tuple[int, int, int], brightness: int=100, zones: List[str]=None) -> "PreparedCommand":
+        """Prepares a command that sets all lights in the provided zone(s) (or all zones if not provided) to a solid color. See PreparedCommand"""
+        return self.__prepare(f"apply color {rgb}", lambda: self.__build_apply_color(rgb, brightness, zones))
+
+    def prepare_apply_pattern(self, pattern: str, zones: List[str]=None) -> "PreparedCommand":
+        """Prepares a command that activates a predefined pattern on the provided zone(s) (or all zones if not provided). See PreparedCommand"""
+        return self.__prepare(f"apply pattern '{pattern}'", lambda: self.__build_apply_pattern(pattern, zones))
+
+    def prepare_apply_pattern_config(self, config: PatternConfig, zones: List[str]=None) -> "PreparedCommand":
+        """
+        Prepares a command that activates a pattern configuration on the provided zone(s) (or all zones if not provided). See PreparedCommand.
+        The configuration is copied, so later changes to it don't affect the command
+        """
+        config = copy(config)
+        return self.__prepare("apply pattern config", lambda: self.__build_apply_pattern_config(config, zones))
+
     def save_pattern(self, pattern: str, config: PatternConfig, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
-        """Creates or updates a pattern file"""
+        """Creates or updates a pattern file (nothing is sent if the pattern's cached configuration is unchanged)"""
         try:
-            validate_pattern_config(config, self.zone_names)
-            pattern = Pattern.from_str(pattern) if pattern not in self.pattern_names else next(p for p in self.pattern_list if str(p) == pattern)
+            if self.__cache.pattern_config_data.matches_entry(config, pattern):
+                LOGGER.debug("Pattern '%s' is unchanged; skipping save", pattern)
+                return
+            validate_pattern_config(config, self.__zone_index().names)
+            pattern = self.__pattern_index().get(pattern) or Pattern.from_str(pattern)
             if pattern.readOnly:
                 raise JellyFishException(f"Cannot update pattern '{pattern}' because it is read only")
-            self.__send(SetPatternConfigRequest(pattern=pattern, jsonData=config))
-            if sync and not self.__cache.pattern_config_data.await_update(timeout, [str(pattern)]):
+            sent_ts = self.__send(SetPatternConfigRequest(pattern=pattern, jsonData=config))
+            if sync and not self.__cache.pattern_config_data.await_update(timeout, [str(pattern)], sent_ts):
                 raise JellyFishException(f"Request to save pattern '{str(pattern)}' timed out")
         except JellyFishException:
             raise
@@ -428,62 +932,233 @@ class JellyFishController:
     def delete_pattern(self, pattern: str, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
         """Deletes a pattern file or folder"""
         try:
-            patterns = self.pattern_list
-            pattern_obj = next((p for p in patterns if str(p) == pattern), None)
+            pattern_obj = self.__pattern_index().get(pattern)
             if not pattern_obj:
                 raise JellyFishException(f"Cannot delete pattern '{pattern}' because it does not exist")
             if pattern_obj.readOnly:
                 raise JellyFishException(f"Cannot delete pattern '{pattern}' because it is read only")
-            self.__send(DeletePatternRequest(pattern_obj))
-            if sync and not self.__cache.pattern_list_data.await_update(timeout, [pattern]):
+            sent_ts = self.__send(DeletePatternRequest(pattern_obj))
+            if sync and not self.__cache.pattern_list_data.await_update(timeout, [pattern], sent_ts):
                 raise JellyFishException(f"Request to delete pattern '{pattern}' timed out")
         except JellyFishException:
             raise
         except Exception as e:
             raise JellyFishException(f"Error encountered while deleting pattern '{pattern}'") from e
 
+    def export_patterns(self, path: str, patterns: List[str]=None, progress: Optional[Callable[[int, int], None]]=None, timeout: float=DEFAULT_TIMEOUT) -> int:
+        """
+        Writes the configurations of the specified patterns (or all patterns if not provided) to a pattern library file (or to one file
+        per pattern if path is an existing directory) as they are received from the controller. An existing library file is only
+        replaced once all patterns are written. Calls progress with the number of exported and total patterns. Returns the number of
+        patterns exported
+        """
+        try:
+            patterns = validate_patterns(patterns, self.__pattern_index().names) if patterns else self.pattern_names
+            def entries():
+                for count, (name, config) in enumerate(self.iter_pattern_configs(patterns, timeout=timeout), 1):
+                    yield Pattern.from_str(name), config
+                    if progress:
+                        progress(count, len(patterns))
+            if os.path.isdir(path):
+                return write_pattern_directory(path, entries())
+            # Replace the library file only after every pattern is written, so that a failed export leaves it intact
+            temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    count = write_pattern_library(f, entries())
+                os.replace(temp_path, path)
+                return count
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while exporting patterns to '{path}'") from e
+
+    def import_patterns(self, path: str, overwrite: bool=True, window: int=DEFAULT_SAVE_WINDOW, progress: Optional[Callable[[int, int], None]]=None, timeout: float=DEFAULT_TIMEOUT) -> List[str]:
+        """
+        Creates or updates (unless overwrite is False) the patterns in a pattern library file or directory written by export_patterns.
+        Every pattern is validated before any are saved, and up to window saves are sent before awaiting their responses.
+        Calls progress with the number of saved and total patterns. Returns the names of the saved patterns
+        """
+        try:
+            entries = {str(pattern): (pattern, config) for pattern, config in read_patterns(path)}
+            index = self.__pattern_index()
+            requests = []
+            for name, (pattern, config) in entries.items():
+                if name in index:
+                    if not overwrite:
+                        continue
+                    if index.get(name).readOnly:
+                        raise JellyFishException(f"Cannot update pattern '{name}' because it is read only")
+                requests.append((name, SetPatternConfigRequest(pattern=pattern, jsonData=config)))
+            # Validate everything upfront so that an invalid entry doesn't leave the library partially imported
+            validate_pattern_library([entries[name] for name, _ in requests], self.__zone_index().names)
+            self.__send_pipelined(requests, self.__cache.pattern_config_data, window, timeout, progress)
+            return [name for name, _ in requests]
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while importing patterns from '{path}'") from e
+
+    def sync_patterns(self, local_dir: str, delete: bool=False, dry_run: bool=False, window: int=DEFAULT_SAVE_WINDOW, progress: Optional[Callable[[int, int], None]]=None, timeout: float=DEFAULT_TIMEOUT) -> PatternSyncReport:
+        """
+        Makes the controller's patterns match a pattern library directory (or file) written by export_patterns, sending only the
+        patterns whose content hashes differ from the controller's configurations (cached configurations are used when available).
+        Patterns missing from the library are deleted only if delete is True, and read only patterns are never changed.
+        If dry_run is True, nothing is sent and the returned report lists the changes that would be made
+        """
+        try:
+            entries = {str(pattern): (pattern, config) for pattern, config in read_patterns(local_dir)}
+            validate_pattern_library(entries.values(), self.__zone_index().names)
+            index = self.__pattern_index()
+            # Only fetch the configurations that aren't cached
+            remote = self.__cache.pattern_config_data.get_all_entries()
+            missing = [name for name in entries if name in index and name not in remote]
+            remote.update(self.iter_pattern_configs(missing, timeout=timeout) if missing else [])
+            report = PatternSyncReport(dry_run)
+            requests = []
+            for name, (pattern, config) in entries.items():
+                if name not in index:
+                    report.created.append(name)
+                elif content_hash(config) == content_hash(remote[name]):
+                    report.unchanged.append(name)
+                    continue
+                elif index.get(name).readOnly:
+                    report.skipped.append(name)
+                    continue
+                else:
+                    report.updated.append(name)
+                requests.append((name, SetPatternConfigRequest(pattern=pattern, jsonData=config)))
+            deletes = [pattern for pattern in (index.get(name) for name in index if name not in entries) if not pattern.readOnly] if delete else []
+            report.deleted = [str(pattern) for pattern in deletes]
+            if dry_run:
+                return report
+            self.__send_pipelined(requests, self.__cache.pattern_config_data, window, timeout, progress)
+            if report.deleted:
+                sent_ts = min(self.__send(DeletePatternRequest(pattern)) for pattern in deletes)
+                if not self.__cache.pattern_list_data.await_update(timeout, report.deleted, sent_ts):
+                    raise JellyFishException(f"Request to delete patterns {report.deleted} timed out")
+            return report
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while syncing patterns from '{local_dir}'") from e
+
     def add_calendar_event(self, event: ScheduleEvent, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
         """Adds a calendar event to the schedule"""
         events = self.calendar_schedule
         events.append(event)
         self.set_calendar_schedule(events, sync, timeout)
 
-    def set_calendar_schedule(self, events: List[ScheduleEvent], sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
-        """Saves the schedule of calendar events. WARNING: this list must include all calendar events in the entire schedule! Any events not included will be deleted"""
+    def set_calendar_schedule(self, events: List[ScheduleEvent], sync: bool=True, timeout: float=DEFAULT_TIMEOUT, check_conflicts: bool=False):
+        """
+        Saves the schedule of calendar events (nothing is sent if it is unchanged). WARNING: this list must include all calendar events in the entire schedule! Any events not included will be deleted.
+        If check_conflicts is True, the schedule is not saved if it conflicts with itself or the daily schedule during the next year (see ScheduleTimeline.lint)
+        """
         try:
-            patterns = self.pattern_names
-            zones = self.zone_names
-            for event in events:
-                validate_schedule_event(event, True, patterns, zones)
-            self.__send(SetCalendarScheduleRequest(events))
-            if sync and not self.__cache.calendar_schedule_data.await_update(timeout):
+            if self.__cache.calendar_schedule_data.matches_entry(events):
+                LOGGER.debug("Calendar schedule is unchanged; skipping save")
+                return
+            validate_schedule(events, True, self.__pattern_index().names, self.__zone_index().names, self.__validation_memo)
+            if check_conflicts:
+                self.__check_schedule_conflicts(self.daily_schedule, events)
+            sent_ts = self.__send(SetCalendarScheduleRequest(events))
+            if sync and not self.__cache.calendar_schedule_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request for calendar schedule data timed out")
         except JellyFishException:
             raise
         except Exception as e:
             raise JellyFishException("Error encountered while saving calendar event schedule") from e
 
+    def edit_calendar_schedule(self, sync: bool=True, timeout: float=DEFAULT_TIMEOUT, check_conflicts: bool=False) -> ScheduleTransaction:
+        """
+        Begins a transaction that edits the calendar schedule and saves it with a single request when committed, e.g.
+        with jfc.edit_calendar_schedule() as schedule: schedule.add(event). See ScheduleTransaction
+        """
+        return self.__edit_schedule(True, sync, timeout, check_conflicts)
+
     def add_daily_event(self, event: ScheduleEvent, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
         """Adds a daily event to the schedule"""
         events = self.daily_schedule
         events.append(event)
         self.set_daily_schedule(events, sync, timeout)
 
-    def set_daily_schedule(self, events: List[ScheduleEvent], sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
-        """Saves the schedule of daily events. WARNING: this list must include all daily events in the entire schedule! Any events not included will be deleted"""
+    def set_daily_schedule(self, events: List[ScheduleEvent], sync: bool=True, timeout: float=DEFAULT_TIMEOUT, check_conflicts: bool=False):
+        """
+        Saves the schedule of daily events (nothing is sent if it is unchanged). WARNING: this list must include all daily events in the entire schedule! Any events not included will be deleted.
+        If check_conflicts is True, the schedule is not saved if it conflicts with itself or the calendar schedule during the next year (see ScheduleTimeline.lint)
+        """
         try:
-            patterns = self.pattern_names
-            zones = self.zone_names
-            for event in events:
-                validate_schedule_event(event, False, patterns, zones)
-            self.__send(SetDailyScheduleRequest(events))
-            if sync and not self.__cache.daily_schedule_data.await_update(timeout):
+            if self.__cache.daily_schedule_data.matches_entry(events):
+                LOGGER.debug("Daily schedule is unchanged; skipping save")
+                return
+            validate_schedule(events, False, self.__pattern_index().names, self.__zone_index().names, self.__validation_memo)
+            if check_conflicts:
+                self.__check_schedule_conflicts(events, self.calendar_schedule)
+            sent_ts = self.__send(SetDailyScheduleRequest(events))
+            if sync and not self.__cache.daily_schedule_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request for daily schedule data timed out")
         except JellyFishException:
             raise
         except Exception as e:
             raise JellyFishException("Error encountered while saving daily event schedule") from e
 
+    def edit_daily_schedule(self, sync: bool=True, timeout: float=DEFAULT_TIMEOUT, check_conflicts: bool=False) -> ScheduleTransaction:
+        """
+        Begins a transaction that edits the daily schedule and saves it with a single request when committed, e.g.
+        with jfc.edit_daily_schedule() as schedule: schedule.remove("Porch"). See ScheduleTransaction
+        """
+        return self.__edit_schedule(False, sync, timeout, check_conflicts)
+
+    def get_schedule_timeline(self, start: date, end: date, tz: Optional[tzinfo]=None) -> ScheduleTimeline:
+        """
+        Expands the daily and calendar schedules into the actions that will run from the start date through the end date
+        (computing sunrise and sunset times from the controller's time configuration), indexed to answer which pattern is
+        scheduled on a zone at a given time. The time zone defaults to the controller's (returns cached data if available)
+        """
+        try:
+            time_config = self.time_config
+            tz = tz or resolve_timezone(time_config)
+            actions = expand_schedules(self.daily_schedule, self.calendar_schedule, start, end, time_config.lat, time_config.lon, tz)
+            return ScheduleTimeline(actions)
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException("Error encountered while computing the schedule timeline") from e
+
+    def __check_schedule_conflicts(self, daily_events: List[ScheduleEvent], calendar_events: List[ScheduleEvent]) -> None:
+        """Raises a JellyFishException if the schedules have conflicts during the next year, and logs their other issues"""
+        time_config = self.time_config
+        tz = resolve_timezone(time_config)
+        start = datetime.now(tz).date()
+        issues = lint_schedules(daily_events, calendar_events, start, start + timedelta(days=365), time_config.lat, time_config.lon, tz)
+        conflicts = [issue for issue in issues if issue.kind == CONFLICT]
+        if len(issues) > len(conflicts):
+            others = [issue for issue in issues if issue.kind != CONFLICT]
+            LOGGER.warning("Schedule has %d other issue(s) during the next year, e.g.: %s", len(others), others[0])
+        if conflicts:
+            raise JellyFishException(f"Schedule has {len(conflicts)} conflict(s) during the next year, e.g.:\n  " + "\n  ".join(str(c) for c in conflicts[:5]))
+
+    def __edit_schedule(self, is_calendar: bool, sync: bool, timeout: float, check_conflicts: bool) -> ScheduleTransaction:
+        """Creates a schedule transaction that saves the schedule only if it wasn't modified elsewhere since the transaction began"""
+        data_cache = self.__cache.calendar_schedule_data if is_calendar else self.__cache.daily_schedule_data
+        description = "calendar" if is_calendar else "daily"
+        # Read the version before the events so that updates received in between are detected
+        version = data_cache.version
+        events = self.calendar_schedule if is_calendar else self.daily_schedule
+
+        def commit(transaction: ScheduleTransaction) -> None:
+            # The version also changes when an identical schedule is received, so compare the content before failing
+            if data_cache.version != version and not data_cache.matches_entry(transaction.original):
+                raise JellyFishException(f"The {description} schedule was modified since the transaction began")
+            if is_calendar:
+                self.set_calendar_schedule(transaction.events, sync, timeout, check_conflicts)
+            else:
+                self.set_daily_schedule(transaction.events, sync, timeout, check_conflicts)
+        return ScheduleTransaction(events, commit)
+
     def add_zone(self, zone: str, config: ZoneConfig, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
         """Adds a zone configuration"""
         configs = self.zone_configs
@@ -501,17 +1176,19 @@ class JellyFishController:
         self.set_zone_configs(configs, sync, timeout)
 
     def set_zone_configs(self, zone_configs: Dict[str, ZoneConfig], sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
-        """Saves zone configurations. WARNING: this list must include all zones! Any zones not included will be deleted"""
+        """Saves zone configurations (nothing is sent if they are unchanged). WARNING: this list must include all zones! Any zones not included will be deleted"""
         try:
             # Do some reasonable data defaulting
             for config in zone_configs.values():
-                config.numPixels = 0
                 for mapping in config.portMap:
                     mapping.ctlrName = mapping.ctlrName or self.hostname
-                    config.numPixels += abs(mapping.phyEndIdx - mapping.phyStartIdx) + 1
-                validate_zone_config(config)
-            self.__send(SetZoneConfigRequest(zone_configs))
-            if sync and not self.__cache.zone_config_data.await_update(timeout, zone_configs.keys()):
+                config.numPixels = count_pixels(config.portMap)
+            if self.__cache.zone_config_data.matches_all_entries(zone_configs):
+                LOGGER.debug("Zone configurations are unchanged; skipping save")
+                return
+            validate_zone_configs(zone_configs, self.__validation_memo)
+            sent_ts = self.__send(SetZoneConfigRequest(zone_configs))
+            if sync and not self.__cache.zone_config_data.await_update(timeout, zone_configs.keys(), sent_ts):
                 raise JellyFishException("Request to set zone configurations timed out")
         except JellyFishException:
             raise
@@ -519,10 +1196,13 @@ class JellyFishController:
             raise JellyFishException("Error encountered while saving zone configurations") from e
 
     def set_name(self, name: str, sync: bool=True, timeout: float=DEFAULT_TIMEOUT):
-        """Sets the user-defined name of the controller"""
+        """Sets the user-defined name of the controller (nothing is sent if it is unchanged)"""
         try:
-            self.__send(SetControllerNameRequest(name))
-            if sync and not self.__cache.name_data.await_update(timeout):
+            if self.__cache.name_data.matches_entry(name):
+                LOGGER.debug("Controller name is unchanged; skipping save")
+                return
+            sent_ts = self.__send(SetControllerNameRequest(name))
+            if sync and not self.__cache.name_data.await_update(timeout, after_ts=sent_ts):
                 raise JellyFishException("Request to set controller name timed out")
         except JellyFishException:
             raise
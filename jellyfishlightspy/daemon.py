@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import stat
+import socket
+import socketserver
+from threading import Thread, Lock
+from typing import Dict, Optional, Any
+from .controller import JellyFishController
+from .commands import run_command
+from .cli import default_socket_path, check_socket_owner
+from .helpers import JellyFishException
+from .const import LOGGER, DEFAULT_TIMEOUT, DEFAULT_DAEMON_IDLE_TIMEOUT
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """Reads a single JSON request line, executes it, and writes a single JSON response line"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            if request["command"] == "shutdown":
+                # Shutting down waits for the request loop to exit, so it can't happen on this thread
+                Thread(target=self.server.jf_daemon.shutdown, daemon=True).start()
+                self.wfile.write(b'{"result": null}\n')
+                return
+            result = self.server.jf_daemon.execute(request["host"], request["command"], request.get("args", {}))
+            response = {"result": result}
+        except JellyFishException as e:
+            response = {"error": str(e)}
+        except Exception as e:
+            LOGGER.exception("Error encountered while processing daemon request: '%s'", line)
+            response = {"error": f"Error encountered while processing request: {e}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _make_private_directory(path: str) -> None:
+    """Creates a directory that only the current user can access, or checks that an existing one belongs to them"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise JellyFishException(f"Daemon socket directory {path} is not a directory owned by the current user")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+
+
+class JellyFishDaemon:
+    """
+    Serves CLI commands over a Unix domain socket and keeps controller connections (and their caches) open between
+    invocations so that commands don't pay for connecting and fetching zone and pattern data each time.
+    Shuts itself down after idle_timeout seconds without a request. The socket is only accessible by the current user,
+    and by default is created in a directory private to them (see cli.default_socket_path).
+    """
+
+    def __init__(self, socket_path: Optional[str]=None, idle_timeout: float=DEFAULT_DAEMON_IDLE_TIMEOUT):
+        socket_path = socket_path or default_socket_path()
+        if socket_path is None:
+            raise JellyFishException("The daemon isn't supported on this platform (it requires Unix domain sockets)")
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.__controllers: Dict[str, JellyFishController] = {}
+        self.__lock = Lock()
+        self.__last_request_ts = time.monotonic()
+        self.__server: _DaemonServer
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"socket_path": self.socket_path, "controllers": list(self.__controllers)})
+
+    def __get_controller(self, host: str) -> JellyFishController:
+        """Returns a connected controller for the host, connecting (or reconnecting) if necessary"""
+        with self.__lock:
+            controller = self.__controllers.get(host)
+            if controller is None:
+                controller = self.__controllers[host] = JellyFishController(host)
+            if not controller.connected:
+                controller.connect()
+                # Warm up the cache with the data needed to validate commands
+                controller.zone_names
+                controller.pattern_names
+            return controller
+
+    def execute(self, host: str, command: str, args: Dict[str, Any]) -> Any:
+        """Executes a command against the controller at the given host"""
+        self.__last_request_ts = time.monotonic()
+        args.setdefault("timeout", DEFAULT_TIMEOUT)
+        return run_command(self.__get_controller(host), command, args)
+
+    def serve_forever(self) -> None:
+        """Listens for requests until shutdown() is called or the idle timeout elapses"""
+        if self.socket_path == default_socket_path():
+            _make_private_directory(os.path.dirname(self.socket_path))
+        if os.path.exists(self.socket_path):
+            check_socket_owner(self.socket_path)
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(self.socket_path)
+                raise JellyFishException(f"A daemon is already listening on {self.socket_path}")
+            except OSError:
+                # Stale socket file left behind by a daemon that did not exit cleanly
+                os.unlink(self.socket_path)
+        self.__server = _DaemonServer(self.socket_path, _DaemonHandler)
+        self.__server.jf_daemon = self
+        os.chmod(self.socket_path, 0o600)
+        Thread(target=self.__monitor_idle, daemon=True).start()
+        LOGGER.debug("Daemon listening on %s", self.socket_path)
+        try:
+            self.__server.serve_forever()
+        finally:
+            self.__server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            for controller in self.__controllers.values():
+                if controller.connected:
+                    controller.disconnect()
+
+    def shutdown(self) -> None:
+        """Stops listening for requests"""
+        self.__server.shutdown()
+
+    def __monitor_idle(self) -> None:
+        while time.monotonic() - self.__last_request_ts < self.idle_timeout:
+            time.sleep(min(1, self.idle_timeout))
+        LOGGER.debug("Daemon idle for %s seconds; shutting down", self.idle_timeout)
+        self.shutdown()
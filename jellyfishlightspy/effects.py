@@ -0,0 +1,201 @@
+from abc import ABC, abstractmethod
+from typing import Any, Sequence, Tuple
+from .const import DEFAULT_GAMMA
+from .helpers import JellyFishException, require_numpy
+
+# Effects compute the frame shown a number of seconds into an animation for every pixel at once. Calling an effect with a
+# time returns one frame (an array of shape (pixels, 3) of RGB bytes) that can be passed to apply_light_string or
+# apply_frame, and effects can be played with JellyFishController.animate. frames() computes many times at once for
+# precomputed frame buffers. Effects are deterministic: the same time always produces the same frame.
+
+RGB = Tuple[int, int, int]
+
+class Effect(ABC):
+    """Base class of effects. Subclasses implement _render, which computes frames of float RGB values for an array of times"""
+
+    def __init__(self, num_pixels: int):
+        self._np = require_numpy("Effects")
+        if type(num_pixels) is not int or num_pixels < 1:
+            raise JellyFishException(f"Number of pixels {num_pixels} is invalid (must be a positive integer)")
+        self.num_pixels = num_pixels
+        # Each pixel's position along the light string, from 0 (the first pixel) to just under 1 (the last)
+        self.positions = self._np.arange(num_pixels) / num_pixels
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({k: v for k, v in vars(self).items() if k != "positions" and not k.startswith("_")})
+
+    def __call__(self, t: float) -> Any:
+        """Returns the frame at a time as an array of shape (pixels, 3) of RGB bytes"""
+        return self.frames([t])[0]
+
+    def frames(self, times: Sequence[float]) -> Any:
+        """Returns the frames at many times as an array of shape (times, pixels, 3) of RGB bytes"""
+        np = self._np
+        frames = self._render(np.asarray(times, dtype=np.float64)[:, None])
+        return np.clip(frames + 0.5, 0, 255).astype(np.uint8)
+
+    @abstractmethod
+    def _render(self, t: Any) -> Any:
+        """Returns the frames at times (an array of shape (times, 1)) as an array of shape (times, pixels, 3) of float RGB values"""
+
+def _wrap(values: Any, np) -> Any:
+    """Returns the fractional part of values (values % 1 for float arrays, but several times faster)"""
+    return values - np.floor(values)
+
+def _positive(name: str, value: float) -> float:
+    if not value > 0:
+        raise JellyFishException(f"{name} {value} is invalid (must be greater than zero)")
+    return value
+
+def _color(rgb: Sequence[int], np) -> Any:
+    color = np.asarray(rgb, dtype=np.float64)
+    if color.shape != (3,) or (color < 0).any() or (color > 255).any():
+        raise JellyFishException(f"RGB value {rgb} is invalid (must be 3 integers between 0 and 255)")
+    return color
+
+
+class Rainbow(Effect):
+    """Fully saturated hues that span the light string repeat times and move speed light string lengths per second"""
+
+    def __init__(self, num_pixels: int, speed: float=0.25, repeat: float=1.0, brightness: float=1.0):
+        super().__init__(num_pixels)
+        self.speed = speed
+        self.repeat = repeat
+        self.brightness = brightness
+
+    def _render(self, t: Any) -> Any:
+        np = self._np
+        hue = self.positions * self.repeat - t * self.speed
+        # HSV to RGB for full saturation and value: each channel is a trapezoid of the hue, offset by a third of a turn
+        channels = np.abs(_wrap(hue[..., None] + np.array([0.0, 2 / 3, 1 / 3]), np) * 6 - 3) - 1
+        return np.clip(channels, 0, 1) * (255 * self.brightness)
+
+
+class Comet(Effect):
+    """
+    A head of one color that travels speed pixels per second with a tail that fades over tail pixels. The comet wraps
+    around to the start of the light string, or bounces between its ends
+    """
+
+    def __init__(self, num_pixels: int, color: RGB=(255, 255, 255), speed: float=30.0, tail: int=10, background: RGB=(0, 0, 0), bounce: bool=False):
+        super().__init__(num_pixels)
+        self.color = color
+        self.speed = speed
+        self.tail = tail
+        self.background = background
+        self.bounce = bounce
+        self._color = _color(color, self._np)
+        self._background = _color(background, self._np)
+
+    def _render(self, t: Any) -> Any:
+        np = self._np
+        pixels = np.arange(self.num_pixels)
+        travel = t * self.speed
+        if self.bounce and self.num_pixels > 1:
+            span = self.num_pixels - 1
+            phase = _wrap(travel / (2 * span), np) * (2 * span)
+            forward = phase <= span
+            head = np.where(forward, phase, 2 * span - phase)
+            # The tail trails behind the head, which is toward the end it just left
+            distance = np.where(forward, head - pixels, pixels - head)
+        else:
+            distance = _wrap((travel - pixels) / self.num_pixels, np) * self.num_pixels
+        level = np.where(distance >= 0, np.clip(1 - distance / max(self.tail, 1), 0, 1), 0)
+        return self._background + (self._color - self._background) * level[..., None]
+
+
+class Breathing(Effect):
+    """The whole light string fades between a color at full brightness and a minimum level every period seconds"""
+
+    def __init__(self, num_pixels: int, color: RGB=(255, 255, 255), period: float=4.0, minimum: float=0.05):
+        super().__init__(num_pixels)
+        self.color = color
+        self.period = _positive("Breathing period", period)
+        self.minimum = minimum
+        self._color = _color(color, self._np)
+
+    def _render(self, t: Any) -> Any:
+        np = self._np
+        level = self.minimum + (1 - self.minimum) * (0.5 - 0.5 * np.cos(2 * np.pi * t / self.period))
+        return np.broadcast_to(self._color * level[..., None], (len(t), self.num_pixels, 3))
+
+
+class Twinkle(Effect):
+    """
+    Pixels that flash a color over a background at random times. Each pixel twinkles at its own random phase and rate
+    (from a seeded random number generator, so the same seed produces the same twinkles), and density sets the fraction
+    of each pixel's time spent lit
+    """
+
+    def __init__(self, num_pixels: int, color: RGB=(255, 255, 255), density: float=0.2, period: float=2.0, background: RGB=(0, 0, 0), seed: int=0):
+        super().__init__(num_pixels)
+        if not 0 < density <= 1:
+            raise JellyFishException(f"Twinkle density {density} is invalid (must be greater than 0 and at most 1)")
+        self.color = color
+        self.density = density
+        self.period = _positive("Twinkle period", period)
+        self.background = background
+        self.seed = seed
+        self._color = _color(color, self._np)
+        self._background = _color(background, self._np)
+        rng = self._np.random.default_rng(seed)
+        self._phases = rng.random(num_pixels)
+        self._rates = rng.uniform(0.5, 1.5, num_pixels) / period
+
+    def _render(self, t: Any) -> Any:
+        np = self._np
+        # Each pixel brightens and dims once during the first density fraction of each of its cycles
+        cycle = _wrap(t * self._rates + self._phases, np) / self.density
+        level = np.where(cycle < 1, np.sin(np.pi * np.minimum(cycle, 1)), 0)
+        return self._background + (self._color - self._background) * level[..., None]
+
+
+class Gradient(Effect):
+    """
+    A gradient that blends between colors along the light string (repeat times) and scrolls speed light string lengths
+    per second, so each pixel crossfades from color to color
+    """
+
+    def __init__(self, num_pixels: int, colors: Sequence[RGB], speed: float=0.1, repeat: float=1.0):
+        super().__init__(num_pixels)
+        if len(colors) < 1:
+            raise JellyFishException("A gradient must have at least one color")
+        self.colors = colors
+        self.speed = speed
+        self.repeat = repeat
+        colors = self._np.stack([_color(color, self._np) for color in colors])
+        # Each color followed by the next (wrapping around), so that blending needs no modulo
+        self._starts = colors
+        self._steps = self._np.roll(colors, -1, axis=0) - colors
+
+    def _render(self, t: Any) -> Any:
+        np = self._np
+        count = len(self._starts)
+        position = _wrap(self.positions * self.repeat - t * self.speed, np) * count
+        index = np.minimum(position.astype(np.intp), count - 1)
+        blend = (position - index)[..., None]
+        return np.take(self._starts, index, axis=0) + np.take(self._steps, index, axis=0) * blend
+
+
+class Crossfade(Effect):
+    """
+    Fades from one frame to another (lists of RGB tuples or arrays of shape (pixels, 3)) over duration seconds. Colors are
+    blended in linear light (decoded with the gamma), so that the middle of a fade isn't darker than both ends as it is
+    when blending RGB values directly. A gamma of 1 blends RGB values directly
+    """
+
+    def __init__(self, start: Any, end: Any, duration: float, gamma: float=DEFAULT_GAMMA):
+        np = require_numpy("Effects")
+        start, end = np.asarray(start, dtype=np.float64), np.asarray(end, dtype=np.float64)
+        if start.ndim != 2 or start.shape[1:] != (3,) or start.shape != end.shape:
+            raise JellyFishException(f"Crossfade frames must have the same number of pixels (shapes {start.shape} and {end.shape})")
+        super().__init__(len(start))
+        self.duration = _positive("Crossfade duration", duration)
+        self.gamma = _positive("Crossfade gamma", gamma)
+        self._start = (start / 255) ** gamma
+        self._delta = (end / 255) ** gamma - self._start
+
+    def _render(self, t: Any) -> Any:
+        np = self._np
+        progress = np.clip(t / self.duration, 0, 1)
+        return (self._start + self._delta * progress[..., None]) ** (1 / self.gamma) * 255
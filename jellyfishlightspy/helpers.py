@@ -1,9 +1,12 @@
 import json
 import time
-from typing import Type, Any, Optional
+import functools
+from array import array
+from typing import Type, Any, Optional, Dict, Tuple, Callable
+from json.encoder import encode_basestring_ascii as _encode_str, c_make_encoder
 from threading import Event
-from .requests import SetPatternConfigRequest
 from .model import (
+    ModelBase,
     TimeConfig,
     RunConfig,
     PatternConfig,
@@ -67,6 +70,35 @@ class TimelyEvent(Event):
         self.clear()
 
 
+@functools.lru_cache(maxsize=None)
+def import_websocket():
+    """
+    Imports the websocket-client module. Deferred until a connection is made because it is comparatively slow to
+    import and many uses of this library (e.g. working with model objects) never need it
+    """
+    import websocket
+    # Silence logging - we do our own
+    websocket.enableTrace(True, level="FATAL")
+    return websocket
+
+
+@functools.lru_cache(maxsize=None)
+def import_numpy():
+    """Imports NumPy if it is installed (it is an optional dependency used to speed up bulk calculations), or returns None"""
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+def require_numpy(feature: str):
+    """Imports NumPy for a feature that requires it, or raises a JellyFishException if it is not installed"""
+    numpy = import_numpy()
+    if numpy is None:
+        raise JellyFishException(f"{feature} requires NumPy (install it with 'pip install jellyfishlights-py[numpy]')")
+    return numpy
+
+
 def _serialize_data_attributes(obj: dict) -> dict:
     """
     Special handling for ZoneState.data and SetPatternConfigRequest.patternFileData.jsonData
@@ -91,11 +123,89 @@ def _default(obj):
         return _serialize_data_attributes(vars(obj))
     except TypeError:
         pass
+    # Compact color arrays (see PatternConfig.compact)
+    if isinstance(obj, array):
+        return obj.tolist()
     return __ENCODER.default(obj)
 
+# to_json produces the same output as json.dumps with _default, but faster: each model class gets a function generated from
+# its __slots__ (the first time one of its objects is encoded) that builds the dict to encode in a single step, escaping the
+# data and jsonData attributes as it goes, instead of building a dict with vars() and then copying and scanning it.
+# Top level values use compact separators while the escaped data attribute strings use json.dumps' default separators.
+
+_DATA_ATTRS = ("data", "jsonData")
+_COMPACT = (",", ":")
+_SPACED = (", ", ": ")
+_CLASS_ENCODERS: Dict[Tuple[type, Tuple[str, str]], Callable[[Any], Any]] = {}
+
+def _encode_attribute_dict(attrs: dict, seps: Tuple[str, str]) -> dict:
+    """Same as _serialize_data_attributes, but only copies the dict if it has attributes that need to be escaped"""
+    if not any(key in _DATA_ATTRS or isinstance(value, dict) for key, value in attrs.items()):
+        return attrs
+    attrs = attrs.copy()
+    for key, value in attrs.items():
+        if key in _DATA_ATTRS:
+            attrs[key] = _encode(value, _SPACED) if value else ""
+        elif isinstance(value, dict):
+            attrs[key] = _encode_attribute_dict(value, seps)
+    return attrs
+
+def _compile_class_encoder(cls: type, seps: Tuple[str, str]) -> Callable[[Any], dict]:
+    """Generates a function that converts objects of a model class to the dict to encode by accessing each of its slots in order"""
+    items = []
+    for attr in cls.__slots__:
+        if attr in _DATA_ATTRS:
+            items.append(f"{attr!r}: _encode(obj.{attr}, _SPACED) if obj.{attr} else ''")
+        else:
+            # Attributes that are dicts may contain attributes that need to be escaped
+            items.append(f"{attr!r}: obj.{attr} if not isinstance(obj.{attr}, dict) else _encode_attribute_dict(obj.{attr}, seps)")
+    source = f"def encode(obj):\n    return {{{', '.join(items)}}}\n"
+    namespace = {"_encode": _encode, "_encode_attribute_dict": _encode_attribute_dict, "_SPACED": _SPACED, "seps": seps}
+    exec(compile(source, f"<{cls.__name__} encoder>", "exec"), namespace)
+    compiled = namespace["encode"]
+
+    def encode(obj: Any) -> dict:
+        try:
+            return compiled(obj)
+        except AttributeError:
+            # An attribute was deleted, so encode the attributes that remain
+            return _encode_attribute_dict(vars(obj), seps)
+    return encode
+
+def _get_class_encoder(cls: type, seps: Tuple[str, str]) -> Callable[[Any], Any]:
+    """Returns the function that converts objects of a class into a value the JSON encoder supports"""
+    encoder = _CLASS_ENCODERS.get((cls, seps))
+    if encoder is None:
+        if issubclass(cls, ModelBase) and "__slots__" in vars(cls):
+            encoder = _compile_class_encoder(cls, seps)
+        elif issubclass(cls, array):
+            encoder = array.tolist
+        else:
+            def encoder(obj: Any) -> Any:
+                try:
+                    return _encode_attribute_dict(vars(obj), seps)
+                except TypeError:
+                    return _default(obj) # Raises a TypeError for unsupported objects
+        _CLASS_ENCODERS[(cls, seps)] = encoder
+    return encoder
+
+def _make_encoder(seps: Tuple[str, str]) -> Callable[[Any], str]:
+    """Creates a JSON encoding function that uses the class encoders for objects"""
+    default = lambda obj: _get_class_encoder(type(obj), seps)(obj)
+    if c_make_encoder is None:
+        return json.JSONEncoder(default=default, separators=seps).encode
+    # json.JSONEncoder creates its C encoder on every call, so create it once
+    c_encoder = c_make_encoder(None, default, _encode_str, None, seps[1], seps[0], False, False, True)
+    return lambda obj: "".join(c_encoder(obj, 0))
+
+_ENCODERS = {seps: _make_encoder(seps) for seps in [_COMPACT, _SPACED]}
+
+def _encode(obj: Any, seps: Tuple[str, str]) -> str:
+    return _ENCODERS[seps](obj)
+
 def to_json(obj: Any) -> str:
     """Serializes Python objects from this module to a JSON string compatible with the API"""
-    return json.dumps(obj, default=_default, separators=(',', ':'))
+    return _ENCODERS[_COMPACT](obj)
 
 def _object_hook(data):
     """Determines the object to instantiate based on its attributes"""
@@ -128,6 +238,37 @@ def _object_hook(data):
         return TimeConfig(**data)
     return data
 
+def content_hash(obj: Any) -> str:
+    """
+    Returns a stable hash (SHA-256 hex digest) of a serializable object's content, computed from its JSON with sorted keys.
+    Objects with equal attribute values have equal hashes regardless of the order the attributes were set
+    """
+    import hashlib # Imported here since most uses of this module never need it
+    canonical = json.dumps(obj, default=_default, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def diff(old: Any, new: Any, path: str="") -> Dict[str, Tuple[Any, Any]]:
+    """
+    Compares objects from this module (or lists and dicts of them) and returns a dict that maps the path of each changed value
+    (e.g. "runData.speed", "portMap[0].phyEndIdx", or "Front.numPixels" for a dict of zone configs) to a tuple of its old and new
+    values. Added and removed dict entries have None as their old or new value. Lists of different lengths are compared as a whole
+    """
+    old = old.tolist() if isinstance(old, array) else old
+    new = new.tolist() if isinstance(new, array) else new
+    if isinstance(old, ModelBase) and type(old) is type(new):
+        old, new = vars(old), vars(new)
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = {}
+        for key in list(old) + [key for key in new if key not in old]:
+            changes.update(diff(old.get(key), new.get(key), f"{path}.{key}" if path else str(key)))
+        return changes
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        changes = {}
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            changes.update(diff(old_item, new_item, f"{path}[{i}]"))
+        return changes
+    return {} if old == new else {path: (old, new)}
+
 def from_json(json_str: str):
     """Deserializes a JSON string from the API into Python objects from this module"""
     return json.loads(json_str, object_hook=_object_hook)
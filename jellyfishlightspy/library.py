@@ -0,0 +1,102 @@
+import os
+import json
+from typing import Iterable, Iterator, List, Tuple, TextIO
+from .helpers import JellyFishException, to_json, from_json
+from .model import Pattern, PatternConfig
+
+# Pattern libraries are stored as newline-delimited JSON: one pattern per line in the same format the controller uses
+# for patternFileData messages, e.g. {"folders":"Colors","name":"Blue","jsonData":"{\"type\":\"Color\",...}"}.
+# Lines can be written and read one at a time, so whole libraries never need to be held in memory as JSON.
+# Libraries can also be stored as directories (e.g. for version control), with one indented JSON file of the
+# pattern's configuration per pattern at <folder>/<name>.json.
+
+
+def write_pattern_library(file: TextIO, entries: Iterable[Tuple[Pattern, PatternConfig]]) -> int:
+    """Writes patterns and their configurations to a file as they are iterated. Returns the number of patterns written"""
+    count = 0
+    for pattern, config in entries:
+        file.write(to_json({"folders": pattern.folders, "name": pattern.name, "jsonData": to_json(config)}))
+        file.write("\n")
+        count += 1
+    return count
+
+def read_pattern_library(file: TextIO) -> Iterator[Tuple[Pattern, PatternConfig]]:
+    """Reads patterns and their configurations from a file written by write_pattern_library, one line at a time"""
+    for line_num, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            data = from_json(line)
+            pattern, config = Pattern(data["folders"], data["name"]), data["jsonData"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise JellyFishException(f"Invalid pattern library entry on line {line_num}") from e
+        if pattern.is_folder or not isinstance(config, PatternConfig):
+            raise JellyFishException(f"Invalid pattern library entry on line {line_num}: '{pattern}' is not a pattern configuration")
+        yield pattern, config
+
+def write_pattern_directory(path: str, entries: Iterable[Tuple[Pattern, PatternConfig]]) -> int:
+    """Writes patterns and their configurations to a directory as they are iterated. Returns the number of patterns written"""
+    count = 0
+    for pattern, config in entries:
+        folder = os.path.join(path, *pattern.folders.split("/"))
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"{pattern.name}.json"), "w", encoding="utf-8") as f:
+            # Sorted keys and indentation keep diffs of the files small and readable
+            f.write(json.dumps(json.loads(to_json(config)), indent=2, sort_keys=True))
+            f.write("\n")
+        count += 1
+    return count
+
+def read_pattern_directory(path: str) -> Iterator[Tuple[Pattern, PatternConfig]]:
+    """Reads patterns and their configurations from a directory written by write_pattern_directory"""
+    if not os.path.isdir(path):
+        raise JellyFishException(f"Pattern library directory '{path}' does not exist")
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        folders = os.path.relpath(dirpath, path).replace(os.sep, "/")
+        for filename in sorted(filenames):
+            if not filename.endswith(".json") or folders == ".":
+                continue
+            with open(os.path.join(dirpath, filename), encoding="utf-8") as f:
+                try:
+                    config = from_json(f.read())
+                except ValueError as e:
+                    raise JellyFishException(f"Invalid pattern library file '{os.path.join(dirpath, filename)}'") from e
+            if not isinstance(config, PatternConfig):
+                raise JellyFishException(f"Invalid pattern library file '{os.path.join(dirpath, filename)}': not a pattern configuration")
+            yield Pattern(folders, filename[:-len(".json")]), config
+
+def read_patterns(path: str) -> List[Tuple[Pattern, PatternConfig]]:
+    """Reads a pattern library from either a directory or a newline-delimited JSON file"""
+    if os.path.isdir(path):
+        return list(read_pattern_directory(path))
+    with open(path, encoding="utf-8") as f:
+        return list(read_pattern_library(f))
+
+
+class PatternSyncReport:
+    """The differences between a pattern library and a controller's patterns, and whether they were applied"""
+
+    def __init__(self, dry_run: bool):
+        self.dry_run = dry_run
+        self.created: List[str] = []
+        self.updated: List[str] = []
+        self.deleted: List[str] = []
+        self.unchanged: List[str] = []
+        self.skipped: List[str] = [] # Read only patterns that differ from the library
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({k: len(v) if isinstance(v, list) else v for k, v in vars(self).items()})
+
+    def __str__(self):
+        lines = [f"+ {name}" for name in self.created]
+        lines += [f"~ {name}" for name in self.updated]
+        lines += [f"- {name}" for name in self.deleted]
+        lines += [f"! {name} (read only)" for name in self.skipped]
+        lines.append(f"{len(self.created)} created, {len(self.updated)} updated, {len(self.deleted)} deleted, {len(self.unchanged)} unchanged, {len(self.skipped)} skipped" + (" (dry run)" if self.dry_run else ""))
+        return "\n".join(lines)
+
+    @property
+    def changed(self) -> bool:
+        """True if the controller's patterns differ (or differed) from the library"""
+        return bool(self.created or self.updated or self.deleted)
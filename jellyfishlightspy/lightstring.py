@@ -0,0 +1,60 @@
+from typing import Any, List, Tuple, Dict
+from .helpers import JellyFishException, to_json
+from .model import PatternConfig, RunConfig
+from .validators import validate_light_string, validate_brightness
+
+# Light strings are sent as Soffit pattern configurations in one of two layouts:
+#   pixel:   colors holds black followed by one color per pixel, and colorPos holds the pixel index of each color
+#            (e.g. colors=[0,0,0, 255,0,0, 255,0,0], colorPos=[-1, 0, 1])
+#   palette: colors holds each distinct color once, and ledOnPos maps each color's index to the pixels that use it
+#            (e.g. colors=[0,0,0, 255,0,0], colorPos=[-1], ledOnPos={"1": [0, 1]})
+# The palette layout is much smaller when many pixels share a few colors (e.g. chases or holiday themes). The pixel layout
+# is the one the controller's app sends, so it is the default, and the palette and auto encodings are opt-in.
+
+PIXEL_ENCODING = "pixel"
+PALETTE_ENCODING = "palette"
+AUTO_ENCODING = "auto"
+ENCODINGS = [PIXEL_ENCODING, PALETTE_ENCODING, AUTO_ENCODING]
+
+def _pixel_config(light_string: List[Tuple[int, int, int]], brightness: int) -> PatternConfig:
+    colors = [0, 0, 0]
+    colors_pos = [-1]
+    for i, rgb in enumerate(light_string):
+        colors.extend(rgb)
+        colors_pos.append(i)
+    return PatternConfig(type="Soffit", colors=colors, colorPos=colors_pos, runData=RunConfig(brightness=brightness))
+
+def _palette_config(light_string: List[Tuple[int, int, int]], brightness: int) -> PatternConfig:
+    # Black is always the first color, as in the pixel layout
+    palette: Dict[Tuple[int, int, int], int] = {(0, 0, 0): 0}
+    positions: Dict[str, List[int]] = {}
+    for i, rgb in enumerate(light_string):
+        index = palette.setdefault(tuple(rgb), len(palette))
+        positions.setdefault(str(index), []).append(i)
+    colors = [c for rgb in palette for c in rgb]
+    return PatternConfig(type="Soffit", colors=colors, colorPos=[-1], runData=RunConfig(brightness=brightness), ledOnPos=positions)
+
+def encode_light_string(light_string: Any, brightness: int=100, encoding: str=PIXEL_ENCODING) -> PatternConfig:
+    """
+    Validates a light string (a list of RGB tuples, one per pixel, or a NumPy array of shape (pixels, 3)) and encodes it as a
+    pattern configuration using the pixel (the default) or palette layout. The auto encoding uses whichever layout
+    serializes to fewer bytes
+    """
+    if encoding not in ENCODINGS:
+        raise JellyFishException(f"Light string encoding '{encoding}' is invalid (valid values are {ENCODINGS})")
+    validate_brightness(brightness)
+    light_string = validate_light_string(light_string)
+    if encoding == PIXEL_ENCODING:
+        return _pixel_config(light_string, brightness)
+    palette = _palette_config(light_string, brightness)
+    if encoding == PALETTE_ENCODING:
+        return palette
+    # The palette layout is always smaller when there are at least 4 pixels per distinct color, so skip encoding both
+    if (len(palette.colors) // 3) * 4 <= len(light_string):
+        return palette
+    pixel = _pixel_config(light_string, brightness)
+    return palette if payload_size(palette) < payload_size(pixel) else pixel
+
+def payload_size(config: PatternConfig) -> int:
+    """Returns the number of bytes of a pattern configuration's JSON"""
+    return len(to_json(config).encode("utf-8"))
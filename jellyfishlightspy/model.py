@@ -1,11 +1,43 @@
-from typing import Optional, List, Dict
+from array import array
+from typing import Optional, List, Dict, Any
 
 class ModelBase():
+    """
+    Model classes declare their attributes in __slots__ (in serialization order) to keep the memory footprint of cached
+    data small. The __dict__ property keeps vars() working for serialization, but returns a new dict on each call
+    """
+    __slots__ = ()
+
+    @property
+    def __dict__(self) -> Dict[str, Any]:
+        return {attr: getattr(self, attr) for attr in self.__slots__ if hasattr(self, attr)}
+
     def __repr__(self) -> str:
         return self.__class__.__name__ + str(vars(self))
 
+    def __eq__(self, other: Any) -> bool:
+        """Model objects are equal if they are of the same type and have equal attribute values (arrays are equal to lists of the same values)"""
+        if type(self) is not type(other):
+            return NotImplemented
+        return _comparable(vars(self)) == _comparable(vars(other))
+
+    # Model objects are mutable, so they are not hashable (use content_hash instead)
+    __hash__ = None
+
+    def content_hash(self) -> str:
+        """Returns a stable hash of the object's content (see helpers.content_hash)"""
+        from .helpers import content_hash
+        return content_hash(self)
+
+
+def _comparable(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts arrays (see PatternConfig.compact) to lists so that compacted objects equal their uncompacted copies"""
+    return {k: v.tolist() if isinstance(v, array) else v for k, v in values.items()}
+
 
 class FirmwareVersion(ModelBase):
+    __slots__ = ("ver", "details", "isUpdate")
+
     def __init__(self, ver: str, details: str, isUpdate: bool):
         self.ver = ver
         self.details = details
@@ -13,6 +45,8 @@ class FirmwareVersion(ModelBase):
 
 
 class PortMapping(ModelBase):
+    __slots__ = ("ctlrName", "phyPort", "phyStartIdx", "phyEndIdx", "zoneRGBStartIdx")
+
     def __init__(self, phyPort: int, phyStartIdx: int, phyEndIdx: int, zoneRGBStartIdx: int=None, ctlrName: str=None):
         self.ctlrName = ctlrName
         self.phyPort = phyPort
@@ -21,13 +55,22 @@ class PortMapping(ModelBase):
         self.zoneRGBStartIdx = self.phyStartIdx if zoneRGBStartIdx is None else zoneRGBStartIdx
 
 
+def count_pixels(port_map: List[PortMapping]) -> int:
+    """Returns the number of pixels in a list of port mappings (ranges include both ends and may run in either direction)"""
+    return sum([abs(pm.phyEndIdx - pm.phyStartIdx) + 1 for pm in port_map])
+
+
 class ZoneConfig(ModelBase):
+    __slots__ = ("numPixels", "portMap")
+
     def __init__(self, portMap: List[PortMapping], numPixels: int=None):
-        self.numPixels = numPixels or sum([abs(pm.phyEndIdx - pm.phyStartIdx) + 1 for pm in portMap])
+        self.numPixels = numPixels or count_pixels(portMap)
         self.portMap = portMap
 
 
 class RunConfig(ModelBase):
+    __slots__ = ("speed", "brightness", "effect", "effectValue", "rgbAdj")
+
     def __init__(self, speed: int=0, brightness: int=100, effect: str="No Effect", effectValue: int=0, rgbAdj: List[int]=None) -> None:
         self.speed = speed
         self.brightness = brightness
@@ -37,6 +80,8 @@ class RunConfig(ModelBase):
 
 
 class Pattern(ModelBase):
+    __slots__ = ("folders", "name", "readOnly")
+
     def __init__(self, folders: str, name: str, readOnly: Optional[bool]=False):
         self.folders = folders
         self.name = name
@@ -56,6 +101,8 @@ class Pattern(ModelBase):
 
 
 class PatternConfig(ModelBase):
+    __slots__ = ("type", "colors", "runData", "direction", "spaceBetweenPixels", "numOfLeds", "skip", "effectBetweenPixels", "colorPos", "cursor", "ledOnPos", "soffitZone")
+
     def __init__(self, type: str, colors: List[int], runData: RunConfig=None, direction: str="Center", spaceBetweenPixels: int=2, numOfLeds: int=1, skip: int=2, effectBetweenPixels: str="No Color Transform", colorPos: List[int]=None, cursor: int=-1, ledOnPos: Dict[str, int]=None, soffitZone: str="") -> None:
         self.type = type
         self.colors = colors
@@ -71,8 +118,25 @@ class PatternConfig(ModelBase):
         self.ledOnPos = ledOnPos or {}
         self.soffitZone = soffitZone
 
+    def compact(self) -> "PatternConfig":
+        """
+        Stores colors as an array of bytes and colorPos as an array of ints (instead of lists of Python ints) to reduce memory
+        usage, e.g. for large cached catalogs. Colors are left as a list if they are not all between 0 and 255. Returns self
+        """
+        try:
+            self.colors = array("B", self.colors)
+        except (OverflowError, TypeError):
+            pass
+        try:
+            self.colorPos = array("i", self.colorPos)
+        except (OverflowError, TypeError):
+            pass
+        return self
+
 
 class ZoneState(ModelBase):
+    __slots__ = ("state", "zoneName", "file", "id", "data")
+
     def __init__(self, state: int, zoneName: List[str], file: Optional[str]=None, id: Optional[str]=None, data: Optional[PatternConfig]=None):
         self.state = state
         self.zoneName = zoneName
@@ -86,6 +150,8 @@ class ZoneState(ModelBase):
 
 
 class ScheduleEventAction(ModelBase):
+    __slots__ = ("type", "startFrom", "hour", "minute", "patternFile", "zones")
+
     def __init__(self, type: str, startFrom: str, hour: int, minute: int, patternFile: str, zones: List[str]):
         self.type = type
         self.startFrom = startFrom
@@ -96,6 +162,8 @@ class ScheduleEventAction(ModelBase):
 
 
 class ScheduleEvent(ModelBase):
+    __slots__ = ("label", "days", "actions")
+
     def __init__(self, days: List[str], actions: List[ScheduleEventAction], label: Optional[str] = ""):
         self.label = label
         self.days = days
@@ -103,6 +171,8 @@ class ScheduleEvent(ModelBase):
 
 
 class TimeConfig(ModelBase):
+    __slots__ = ("timezone", "timezoneName", "locName", "lat", "lon")
+
     def __init__(self, timezone: str, timezoneName: str, locName: str, lat: int, lon: int):
         self.timezone = timezone
         self.timezoneName = timezoneName
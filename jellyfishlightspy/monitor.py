@@ -104,17 +104,19 @@ class WebSocketMonitor:
             elif ZONE_CONFIG_DATA in data:
                 entries = data[ZONE_CONFIG_DATA]
                 self.__cache.zone_config_data.update_entries(entries)
-                for deleted in list(set(self.__cache.zone_config_data.get_all_entries()) - set(entries)):
+                for deleted in list(set(self.__cache.zone_config_data.keys()) - set(entries)):
                     self.__cache.zone_config_data.delete_entry(deleted)
 
             elif PATTERN_LIST_DATA in data:
                 entries = {str(pattern): pattern for pattern in data[PATTERN_LIST_DATA]}
                 self.__cache.pattern_list_data.update_entries(entries)
-                for deleted in list(set(self.__cache.pattern_list_data.get_all_entries()) - set(entries)):
+                for deleted in list(set(self.__cache.pattern_list_data.keys()) - set(entries)):
                     self.__cache.pattern_list_data.delete_entry(deleted)
 
             elif ZONE_STATE_DATA in data:
                 state = data[ZONE_STATE_DATA]
+                if self.__cache.compact and isinstance(state.data, PatternConfig):
+                    state.data.compact()
                 entries = {zone: state for zone in state.zoneName}
                 self.__cache.zone_state_data.update_entries(entries)
 
@@ -124,9 +126,11 @@ class WebSocketMonitor:
                 if pattern.is_folder:
                     return
                 config = pc["jsonData"]
+                if self.__cache.compact:
+                    config.compact()
                 self.__cache.pattern_config_data.update_entry(config, str(pattern))
                 # Add to the pattern list if it's new
-                if self.__cache.pattern_list_data.size > 0 and self.__cache.pattern_list_data.get_entry(str(pattern)) is None:
+                if self.__cache.pattern_list_data.size > 0 and str(pattern) not in self.__cache.pattern_index:
                     self.__cache.pattern_list_data.update_entry(pattern, str(pattern))
 
             elif DELETE_PATTERN_DATA in data:
@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, MutableSequence, Optional, Sequence, Tuple
+from .helpers import JellyFishException
+from .model import PortMapping, ZoneConfig
+
+# Each port mapping assigns a range of a physical port's pixels (phyStartIdx through phyEndIdx, in either direction) to
+# the next pixels of a zone. Zone pixels start at the end of the range given by zoneRGBStartIdx, so a mapping whose
+# zoneRGBStartIdx is its phyEndIdx runs backward. Ports are identified by (ctlrName, phyPort) since zones can span
+# controllers.
+
+Port = Tuple[str, int]
+
+def mapping_indexes(mapping: PortMapping) -> range:
+    """Returns the physical pixel indexes of a port mapping in the order of the zone's pixels"""
+    first, last = mapping.phyStartIdx, mapping.phyEndIdx
+    if mapping.zoneRGBStartIdx == last != first:
+        first, last = last, first
+    step = 1 if last >= first else -1
+    return range(first, last + step, step)
+
+
+class PixelOverlap:
+    """A range of a port's pixels that is mapped more than once (by two zones, or twice by the same zone)"""
+    __slots__ = ("port", "first", "last", "zones")
+
+    def __init__(self, port: Port, first: int, last: int, zones: Tuple[str, str]):
+        self.port = port
+        self.first = first
+        self.last = last
+        self.zones = zones
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({attr: getattr(self, attr) for attr in self.__slots__})
+
+    def __str__(self):
+        pixels = f"Pixel {self.first} of port {self.port[1]} on controller '{self.port[0]}' is" if self.first == self.last else \
+            f"Pixels {self.first}-{self.last} of port {self.port[1]} on controller '{self.port[0]}' are"
+        return f"{pixels} mapped by zones '{self.zones[0]}' and '{self.zones[1]}'"
+
+def find_overlaps(mappings: Iterable[Tuple[str, PortMapping]]) -> List[PixelOverlap]:
+    """
+    Returns the overlapping pixel ranges of (zone name, port mapping) pairs, found by sorting each port's ranges and
+    comparing each range with the one that reaches furthest among the ranges that start before it
+    """
+    ranges: Dict[Port, List[Tuple[int, int, str]]] = {}
+    for zone, mapping in mappings:
+        low, high = sorted((mapping.phyStartIdx, mapping.phyEndIdx))
+        ranges.setdefault((mapping.ctlrName, mapping.phyPort), []).append((low, high, zone))
+    overlaps = []
+    for port, port_ranges in ranges.items():
+        port_ranges.sort()
+        reach, reach_zone = -1, None
+        for low, high, zone in port_ranges:
+            if low <= reach:
+                overlaps.append(PixelOverlap(port, low, min(high, reach), (reach_zone, zone)))
+            if high > reach:
+                reach, reach_zone = high, zone
+    return overlaps
+
+
+class PixelMap:
+    """
+    The physical layout of zones compiled from their configurations. Each zone has index arrays that map its pixels to
+    ports and physical pixel indexes, and each port has its zones' ranges sorted by index so that the zone showing a
+    physical pixel, or the zones overlapping a range, are found with a binary search
+    """
+
+    def __init__(self, zone_configs: Dict[str, ZoneConfig]):
+        self.__ports: List[Port] = []
+        port_ids: Dict[Port, int] = {}
+        self.__zones: Dict[str, Tuple[array, array]] = {}
+        # Per port: range starts, the furthest index reached by the ranges up to each start, and (end, zone, zone offset, range)
+        ranges: Dict[Port, List[Tuple[int, int, str, int, range]]] = {}
+        for zone, config in zone_configs.items():
+            zone_ports, zone_indexes = array("H"), array("l")
+            for mapping in config.portMap:
+                port = (mapping.ctlrName, mapping.phyPort)
+                if port not in port_ids:
+                    port_ids[port] = len(self.__ports)
+                    self.__ports.append(port)
+                indexes = mapping_indexes(mapping)
+                ranges.setdefault(port, []).append((min(indexes), max(indexes), zone, len(zone_indexes), indexes))
+                zone_ports.extend(array("H", [port_ids[port]]) * len(indexes))
+                zone_indexes.extend(indexes)
+            self.__zones[zone] = (zone_ports, zone_indexes)
+        self.__ranges: Dict[Port, Tuple[List[int], List[int], List[Tuple[int, str, int, range]]]] = {}
+        for port, port_ranges in ranges.items():
+            port_ranges.sort(key=lambda r: r[:2])
+            reach, reaches = -1, []
+            for r in port_ranges:
+                reach = max(reach, r[1])
+                reaches.append(reach)
+            self.__ranges[port] = ([r[0] for r in port_ranges], reaches, [r[1:] for r in port_ranges])
+        self.overlaps = find_overlaps((zone, mapping) for zone, config in zone_configs.items() for mapping in config.portMap)
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"zones": self.zones, "ports": self.ports, "overlaps": len(self.overlaps)})
+
+    @property
+    def zones(self) -> List[str]:
+        """The names of the mapped zones"""
+        return list(self.__zones)
+
+    @property
+    def ports(self) -> List[Port]:
+        """The (ctlrName, phyPort) of each port that zones are mapped to"""
+        return list(self.__ports)
+
+    def __zone(self, zone: str) -> Tuple[array, array]:
+        if zone not in self.__zones:
+            raise JellyFishException(f"Zone name '{zone}' is invalid (valid values are {sorted(self.__zones)})")
+        return self.__zones[zone]
+
+    def num_pixels(self, zone: str) -> int:
+        """Returns the number of pixels in a zone"""
+        return len(self.__zone(zone)[1])
+
+    def locate(self, zone: str, pixel: int) -> Tuple[str, int, int]:
+        """Returns the (ctlrName, phyPort, phyIdx) of a zone's pixel"""
+        zone_ports, zone_indexes = self.__zone(zone)
+        try:
+            return self.__ports[zone_ports[pixel]] + (zone_indexes[pixel],)
+        except IndexError:
+            raise JellyFishException(f"Pixel {pixel} is out of range (zone '{zone}' has {len(zone_indexes)} pixels)") from None
+
+    def indexes(self, zone: str) -> Tuple[List[Port], array, array]:
+        """
+        Returns the index arrays of a zone: the ports list, and arrays holding each zone pixel's index in that list and
+        physical pixel index
+        """
+        zone_ports, zone_indexes = self.__zone(zone)
+        return self.ports, zone_ports, zone_indexes
+
+    def zone_at(self, ctlr_name: str, phy_port: int, phy_idx: int) -> Optional[Tuple[str, int]]:
+        """Returns the zone showing a physical pixel and the pixel's index within the zone, or None if it isn't mapped"""
+        for end, zone, offset, indexes in self.__overlapping((ctlr_name, phy_port), phy_idx, phy_idx):
+            return zone, offset + abs(phy_idx - indexes.start)
+        return None
+
+    def zones_overlapping(self, ctlr_name: str, phy_port: int, first: int, last: int) -> List[str]:
+        """Returns the zones that are mapped to any of a port's physical pixels from first through last"""
+        return list(dict.fromkeys(zone for _, zone, _, _ in self.__overlapping((ctlr_name, phy_port), *sorted((first, last)))))
+
+    def __overlapping(self, port: Port, low: int, high: int) -> List[Tuple[int, str, int, range]]:
+        starts, reaches, ranges = self.__ranges.get(port, ([], [], []))
+        # Ranges before the first whose reach includes low all end before it, and ranges after the last start within high begin after it
+        candidates = ranges[bisect_left(reaches, low):bisect_right(starts, high)]
+        return [r for r in candidates if r[0] >= low]
+
+    def to_zone(self, zone: str, port_light_strings: Dict[Port, Sequence[Any]], default: Any=(0, 0, 0)) -> List[Any]:
+        """
+        Translates light strings of physical ports (indexed by physical pixel) into a light string of a zone. Pixels
+        missing from the port light strings use the default color
+        """
+        zone_ports, zone_indexes = self.__zone(zone)
+        strings = [port_light_strings.get(port, ()) for port in self.__ports]
+        lengths = [len(string) for string in strings]
+        return [strings[p][i] if i < lengths[p] else default for p, i in zip(zone_ports, zone_indexes)]
+
+    def to_ports(self, zone: str, light_string: Sequence[Any], port_light_strings: Dict[Port, MutableSequence[Any]]) -> Dict[Port, MutableSequence[Any]]:
+        """
+        Writes a zone's light string into light strings of its physical ports (indexed by physical pixel), which must be
+        long enough to hold the zone's pixels. Returns the port light strings
+        """
+        zone_ports, zone_indexes = self.__zone(zone)
+        if len(light_string) != len(zone_indexes):
+            raise JellyFishException(f"Light string has {len(light_string)} pixels (zone '{zone}' has {len(zone_indexes)} pixels)")
+        strings = [port_light_strings.get(port) for port in self.__ports]
+        try:
+            for p, i, rgb in zip(zone_ports, zone_indexes, light_string):
+                strings[p][i] = rgb
+        except (TypeError, IndexError):
+            raise JellyFishException(f"Port light strings are missing pixels of zone '{zone}' (pixel {i} of port {self.__ports[p]})") from None
+        return port_light_strings
@@ -0,0 +1,421 @@
+import os
+import json
+import time
+import base64
+import struct
+import socket
+import hashlib
+import socketserver
+from threading import Thread, Lock
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple, Optional, Callable, Any
+from .cache import JellyFishCache, DataCache
+from .monitor import WebSocketMonitor
+from .helpers import JellyFishException, to_json, import_websocket
+from .model import Pattern
+from .const import (
+    LOGGER,
+    NAME_DATA,
+    HOSTNAME_DATA,
+    FIRMWARE_VERSION_DATA,
+    TIME_CONFIG_DATA,
+    ZONE_CONFIG_DATA,
+    PATTERN_LIST_DATA,
+    PATTERN_CONFIG_DATA,
+    ZONE_STATE_DATA,
+    CALENDAR_SCHEDULE_DATA,
+    DAILY_SCHEDULE_DATA,
+    SCHEDULE_DATA,
+    DEFAULT_TIMEOUT,
+    DEFAULT_PORT,
+    DEFAULT_PROXY_MAX_AGE,
+    DEFAULT_PROXY_MAX_MESSAGE_SIZE,
+)
+
+if TYPE_CHECKING:
+    import websocket
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OP_CONTINUATION = 0x0
+_OP_TEXT = 0x1
+_OP_CLOSE = 0x8
+_OP_PING = 0x9
+_OP_PONG = 0xA
+_CLOSE_GOING_AWAY = 1001
+_CLOSE_PROTOCOL_ERROR = 1002
+_CLOSE_TOO_BIG = 1009
+
+
+class _ProtocolError(Exception):
+    """Raised when a peer violates the web socket protocol. The connection should be closed with the status code"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _apply_mask(payload: bytes, key: bytes) -> bytes:
+    """Masks (or unmasks) a web socket frame payload with the given 4 byte key"""
+    length = len(payload)
+    key = (key * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+
+def _encode_frame(opcode: int, payload: bytes, mask: bool=False) -> bytes:
+    """Encodes a single, final web socket frame (servers send unmasked frames; clients must mask theirs)"""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 65536:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = _apply_mask(payload, key)
+    return bytes(header) + payload
+
+def _read_exact(rfile, length: int) -> bytes:
+    data = rfile.read(length)
+    if len(data) < length:
+        raise ConnectionError("Web socket connection closed unexpectedly")
+    return data
+
+def _read_frame(rfile, max_size: Optional[int]=None, require_mask: bool=False) -> Tuple[bool, int, bytes]:
+    """
+    Reads a single web socket frame and returns a tuple containing the fin flag, opcode, and (unmasked) payload. Raises a
+    _ProtocolError before reading the payload if it is larger than max_size, or if it is unmasked and require_mask is set
+    (servers must reject unmasked frames from clients)
+    """
+    b1, b2 = _read_exact(rfile, 2)
+    length = b2 & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _read_exact(rfile, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _read_exact(rfile, 8))[0]
+    if require_mask and not b2 & 0x80:
+        raise _ProtocolError(_CLOSE_PROTOCOL_ERROR, "Web socket frame from client is not masked")
+    if max_size is not None and length > max_size:
+        raise _ProtocolError(_CLOSE_TOO_BIG, f"Web socket frame of {length} bytes exceeds the maximum of {max_size} bytes")
+    key = _read_exact(rfile, 4) if b2 & 0x80 else None
+    payload = _read_exact(rfile, length)
+    if key:
+        payload = _apply_mask(payload, key)
+    return bool(b1 & 0x80), b1 & 0x0F, payload
+
+
+class _WebSocketClient:
+    """A client connected to a _WebSocketServer"""
+
+    def __init__(self, sock, address: Tuple[str, int]):
+        self.address = address
+        self.__sock = sock
+        self.__lock = Lock()
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"address": self.address})
+
+    def send(self, message: str) -> None:
+        """Sends a text message to the client"""
+        self.send_frame(_OP_TEXT, message.encode("utf-8"))
+
+    def send_frame(self, opcode: int, payload: bytes) -> None:
+        with self.__lock:
+            self.__sock.sendall(_encode_frame(opcode, payload))
+
+    def close(self, code: int=_CLOSE_GOING_AWAY) -> None:
+        """Sends a close frame with the status code and shuts down the connection"""
+        try:
+            self.send_frame(_OP_CLOSE, struct.pack("!H", code))
+            self.__sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class _WebSocketServer(socketserver.ThreadingTCPServer):
+    """
+    A minimal web socket server (RFC 6455 text messages only) that accepts connections on a background thread and
+    invokes callbacks when clients connect, send messages, and disconnect. Clients that send messages larger than
+    max_message_size bytes are disconnected
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, server_address: Tuple[str, int], on_message: Callable, on_connect: Callable=None, on_disconnect: Callable=None, max_message_size: int=DEFAULT_PROXY_MAX_MESSAGE_SIZE):
+        self.max_message_size = max_message_size
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        socketserver.ThreadingTCPServer.__init__(self, server_address, _WebSocketHandler)
+
+
+class _WebSocketHandler(socketserver.StreamRequestHandler):
+    """Performs the web socket handshake and reads messages from a single client connection"""
+
+    def handle(self):
+        if not self.__handshake():
+            return
+        client = _WebSocketClient(self.connection, self.client_address)
+        if self.server.on_connect:
+            self.server.on_connect(client)
+        try:
+            fragments: List[bytes] = []
+            size = 0
+            while True:
+                fin, opcode, payload = _read_frame(self.rfile, self.server.max_message_size - size, require_mask=True)
+                if opcode == _OP_CLOSE:
+                    client.send_frame(_OP_CLOSE, payload[:2])
+                    break
+                if opcode == _OP_PING:
+                    client.send_frame(_OP_PONG, payload)
+                    continue
+                if opcode in [_OP_TEXT, _OP_CONTINUATION]:
+                    fragments.append(payload)
+                    size += len(payload)
+                    if fin:
+                        message = b"".join(fragments).decode("utf-8")
+                        fragments = []
+                        size = 0
+                        self.server.on_message(client, message)
+        except _ProtocolError as e:
+            LOGGER.debug("Closing connection to web socket client %s: %s", client.address, e)
+            client.close(e.code)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if self.server.on_disconnect:
+                self.server.on_disconnect(client)
+
+    def __handshake(self) -> bool:
+        """Reads the HTTP upgrade request and responds with the web socket handshake. Returns False if the request is invalid"""
+        self.rfile.readline()
+        headers = {}
+        while True:
+            line = self.rfile.readline().decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if headers.get("upgrade", "").lower() != "websocket" or not key:
+            self.wfile.write(b"HTTP/1.1 400 Bad Request\r\nConnection: close\r\n\r\n")
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()).decode("ascii")
+        self.wfile.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode("ascii"))
+        return True
+
+
+class _ControllerResponse:
+    """A message in the format the controller sends to its clients"""
+
+    def __init__(self, **data):
+        self.cmd = "fromCtlr"
+        vars(self).update(data)
+
+
+class JellyFishProxy:
+    """
+    Accepts web socket connections from any number of clients that speak the controller's native protocol and
+    multiplexes them over a single connection to the JellyFish Lighting controller. Data requests are answered from
+    the cache when it is fresh, duplicate in-flight data requests are only forwarded once, and all messages pushed by
+    the controller are rebroadcast to every client. Only accepts connections from the local host unless host is set to
+    the address of another interface (e.g. "0.0.0.0" for all of them). Clients that send messages larger than
+    max_message_size bytes are disconnected.
+    """
+
+    def __init__(self, address: str, host: str="127.0.0.1", port: int=DEFAULT_PORT, max_age: float=DEFAULT_PROXY_MAX_AGE, controller_port: int=DEFAULT_PORT, max_message_size: int=DEFAULT_PROXY_MAX_MESSAGE_SIZE):
+        self.address = address
+        self.max_age = max_age
+        self.__controller_port = controller_port
+        self.__cache = JellyFishCache()
+        self.__ws: "websocket.WebSocketApp"
+        self.__ws_thread: Thread
+        self.__ws_monitor = WebSocketMonitor(address, self.__cache)
+        self.__server = _WebSocketServer((host, port), self.__on_client_message, self.__on_client_connect, self.__on_client_disconnect, max_message_size)
+        self.__server_thread: Thread
+        self.__clients: Set[_WebSocketClient] = set()
+        self.__pending: Dict[str, float] = {}
+        self.__lock = Lock()
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"address": self.address, "port": self.port, "connected": self.connected, "clients": len(self.__clients)})
+
+    @property
+    def connected(self) -> bool:
+        """Indicates if the the web socket connection to the controller is established"""
+        return self.__ws_monitor.connected
+
+    @property
+    def port(self) -> int:
+        """The port the proxy is accepting client connections on"""
+        return self.__server.server_address[1]
+
+    def start(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> None:
+        """Connects to the JellyFish Lighting controller and begins accepting client connections"""
+        try:
+            websocket = import_websocket()
+            self.__ws = websocket.WebSocketApp(
+                f"ws://{self.address}:{self.__controller_port}",
+                on_open = self.__ws_monitor.on_open,
+                on_close = self.__ws_monitor.on_close,
+                on_message = self.__on_controller_message,
+                on_error = self.__ws_monitor.on_error
+            )
+            # A ping timeout (without pings) keeps the reader from blocking indefinitely if the socket is closed from another thread
+            self.__ws_thread = Thread(target=lambda: self.__ws.run_forever(ping_timeout=1), daemon=True)
+            self.__ws_thread.start()
+            if not self.__ws_monitor.await_connection(timeout):
+                self.__ws.close()
+                raise JellyFishException(f"Connection to controller at {self.address} timed out")
+            self.__server_thread = Thread(target=self.__server.serve_forever, daemon=True)
+            self.__server_thread.start()
+            LOGGER.debug("Proxying connections on port %s to the JellyFish Lighting controller at %s", self.port, self.address)
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Could not start proxy for controller at {self.address}") from e
+
+    def stop(self, timeout: Optional[float]=DEFAULT_TIMEOUT) -> None:
+        """Stops accepting client connections, disconnects all clients, and disconnects from the JellyFish Lighting controller"""
+        try:
+            self.__server.shutdown()
+            self.__server.server_close()
+            with self.__lock:
+                clients = list(self.__clients)
+            for client in clients:
+                client.close()
+            self.__ws.close()
+            self.__ws_thread.join(timeout)
+            if self.__ws_thread.is_alive():
+                raise JellyFishException(f"Attempt to disconnect from controller at {self.address} timed out")
+        except JellyFishException:
+            raise
+        except Exception as e:
+            raise JellyFishException(f"Error encountered while stopping proxy for controller at {self.address}") from e
+
+    def __on_client_connect(self, client: _WebSocketClient) -> None:
+        LOGGER.debug("Proxy client connected: %s", client.address)
+        with self.__lock:
+            self.__clients.add(client)
+
+    def __on_client_disconnect(self, client: _WebSocketClient) -> None:
+        LOGGER.debug("Proxy client disconnected: %s", client.address)
+        with self.__lock:
+            self.__clients.discard(client)
+
+    def __on_client_message(self, client: _WebSocketClient, message: str) -> None:
+        """Answers data requests from the cache where possible and forwards everything else to the controller"""
+        LOGGER.debug("Recieved from proxy client %s: %s", client.address, message)
+        try:
+            data = json.loads(message)
+            if data.get("cmd") != "toCtlrGet":
+                self.__forward(message)
+                return
+            forward = []
+            for item in data.get("get", []):
+                responses = self.__get_cached_responses(item)
+                if responses is not None:
+                    for response in responses:
+                        client.send(response)
+                    continue
+                key = json.dumps(item)
+                now = time.perf_counter()
+                with self.__lock:
+                    # Collapse duplicate requests that are already awaiting a response from the controller
+                    if now - self.__pending.get(key, 0) < DEFAULT_TIMEOUT:
+                        continue
+                    self.__pending[key] = now
+                forward.append(item)
+            if forward:
+                self.__forward(to_json({"cmd": "toCtlrGet", "get": forward}))
+        except Exception:
+            LOGGER.exception("Error encountered while processing message from proxy client %s: '%s'", client.address, message)
+
+    def __forward(self, message: str) -> None:
+        """Sends a message to the controller over the shared web socket connection"""
+        if not self.connected:
+            raise JellyFishException("Not connected to controller")
+        LOGGER.debug("Sending: %s", message)
+        self.__ws.send(message)
+
+    def __on_controller_message(self, ws, message: str) -> None:
+        """Updates the cache and rebroadcasts every message received from the controller to all clients"""
+        self.__ws_monitor.on_message(ws, message)
+        try:
+            data = json.loads(message)
+            # Schedule requests (e.g. scheduleCalendar) are answered with a generic 'schedule' message
+            answered = set(data)
+            if data.get(SCHEDULE_DATA) == "calendar":
+                answered.add(CALENDAR_SCHEDULE_DATA)
+            elif data.get(SCHEDULE_DATA) == "daily":
+                answered.add(DAILY_SCHEDULE_DATA)
+            with self.__lock:
+                self.__pending = {k: ts for k, ts in self.__pending.items() if json.loads(k)[0] not in answered}
+                clients = list(self.__clients)
+        except Exception:
+            LOGGER.exception("Error encountered while processing web socket message: '%s'", message)
+            return
+        for client in clients:
+            try:
+                client.send(message)
+            except OSError:
+                LOGGER.debug("Could not send message to proxy client %s", client.address)
+
+    def __is_fresh(self, cache: DataCache, entry_keys: Optional[List[str]]=None) -> bool:
+        ts = cache.get_update_ts(entry_keys)
+        return ts is not None and time.perf_counter() - ts <= self.max_age
+
+    def __get_cached_responses(self, item: List[Any]) -> Optional[List[str]]:
+        """Builds the controller's responses to a single data request from the cache. Returns None if the cached data is missing or stale"""
+        if not item:
+            return None
+        data_type, args = item[0], item[1:]
+        single_entries = {
+            NAME_DATA: self.__cache.name_data,
+            HOSTNAME_DATA: self.__cache.hostname_data,
+            FIRMWARE_VERSION_DATA: self.__cache.firmware_version_data,
+            TIME_CONFIG_DATA: self.__cache.time_config_data,
+        }
+        if data_type in single_entries:
+            cache = single_entries[data_type]
+            if not self.__is_fresh(cache):
+                return None
+            return [to_json(_ControllerResponse(**{data_type: cache.get_entry()}))]
+        if data_type == ZONE_CONFIG_DATA:
+            if not self.__is_fresh(self.__cache.zone_config_data):
+                return None
+            return [to_json(_ControllerResponse(zones=self.__cache.zone_config_data.get_all_entries()))]
+        if data_type == PATTERN_LIST_DATA:
+            if not self.__is_fresh(self.__cache.pattern_list_data):
+                return None
+            patterns = list(self.__cache.pattern_list_data.get_all_entries().values())
+            return [to_json(_ControllerResponse(patternFileList=patterns))]
+        if data_type == ZONE_STATE_DATA:
+            if not args or not self.__is_fresh(self.__cache.zone_state_data, args):
+                return None
+            responses = [to_json(_ControllerResponse(runPattern=self.__cache.zone_state_data.get_entry(zone))) for zone in args]
+            return list(dict.fromkeys(responses))
+        if data_type == PATTERN_CONFIG_DATA:
+            patterns = [Pattern(folders, name) for folders, name in zip(args[::2], args[1::2])]
+            if not patterns or not self.__is_fresh(self.__cache.pattern_config_data, [str(p) for p in patterns]):
+                return None
+            return [
+                to_json(_ControllerResponse(patternFileData={"folders": p.folders, "name": p.name, "jsonData": self.__cache.pattern_config_data.get_entry(str(p))}))
+                for p in patterns
+            ]
+        if data_type in [CALENDAR_SCHEDULE_DATA, DAILY_SCHEDULE_DATA]:
+            calendar = data_type == CALENDAR_SCHEDULE_DATA
+            cache = self.__cache.calendar_schedule_data if calendar else self.__cache.daily_schedule_data
+            if not self.__is_fresh(cache):
+                return None
+            return [to_json(_ControllerResponse(schedule="calendar" if calendar else "daily", events=cache.get_entry()))]
+        return None
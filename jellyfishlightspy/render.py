@@ -0,0 +1,156 @@
+from collections import OrderedDict
+from typing import Any, Tuple, Union
+from .const import DEFAULT_RENDER_CACHE_SIZE
+from .helpers import JellyFishException, require_numpy
+from .model import PatternConfig, ZoneConfig
+
+# Patterns are rendered as arrays of shape (frames, pixels, 3) of RGB bytes, where each frame is one animation step.
+# The controller's firmware doesn't document its animations, so renders are previews that approximate them:
+#   - A pattern's colors are laid out in order, each spanning spaceBetweenPixels pixels, and repeated along the zone.
+#     effectBetweenPixels blends each color into the next (Progression, Fade), lights only its first pixel (Fill with
+#     Black), or leaves it solid (No Color Transform, Repeat)
+#   - Color, Paint, and Multi-Paint patterns are static
+#   - Chase patterns follow each color with skip dark pixels and move one pixel per frame toward the direction (Left or
+#     Right), or outward from the middle of the zone (Center)
+#   - Stacker patterns stack blocks of numOfLeds pixels from the end the direction points to (or from both ends for Center)
+#     until the zone is full, and then start over
+#   - Sequence patterns light the whole zone with one color per spaceBetweenPixels frames, blending between colors for
+#     Progression and Fade
+#   - Soffit patterns are static light strings (see lightstring.py)
+# runData.brightness and runData.rgbAdj (percentages) scale the colors. runData.speed only sets how fast the controller
+# advances frames, and random effects (Twinkle, Lightning) aren't rendered.
+
+def _num_pixels(zone: Union[ZoneConfig, int]) -> int:
+    num_pixels = zone.numPixels if isinstance(zone, ZoneConfig) else zone
+    if type(num_pixels) is not int or num_pixels < 0:
+        raise JellyFishException(f"Number of pixels {num_pixels} is invalid (must be a non-negative integer)")
+    return num_pixels
+
+def _palette(config: PatternConfig, np) -> Any:
+    colors = np.asarray(config.colors, dtype=np.float64).reshape(-1, 3)
+    return colors if len(colors) else np.zeros((1, 3))
+
+def _color_blocks(palette, width: int, effect: str, gap: int, np) -> Any:
+    """Returns one repetition of the colors laid out along a zone: each color spans width pixels followed by gap dark pixels"""
+    span = width + gap
+    pos = np.arange(len(palette) * span)
+    index, offset = np.divmod(pos, span)
+    blocks = palette[index]
+    if effect in ("Progression", "Fade"):
+        following = palette[(index + 1) % len(palette)]
+        blocks = blocks + (following - blocks) * (np.minimum(offset, width) / width)[:, None]
+    elif effect == "Fill with Black":
+        blocks = blocks * (offset == 0)[:, None]
+    return blocks * (offset < width)[:, None]
+
+def _positions(num_pixels: int, direction: str, np) -> Any:
+    """Returns the distance of each pixel from where the pattern starts (the end it moves away from, or the middle for Center)"""
+    pixels = np.arange(num_pixels)
+    if direction == "Left":
+        return num_pixels - 1 - pixels
+    if direction == "Center":
+        return np.abs(pixels - (num_pixels - 1) / 2).astype(np.int64)
+    return pixels
+
+def _render_soffit(config: PatternConfig, palette, num_pixels: int, np) -> Any:
+    frame = np.zeros((num_pixels, 3))
+    # Pixel layout: colorPos holds the pixel of each color (-1 for the unused first color)
+    positions = np.asarray(config.colorPos, dtype=np.int64)[:len(palette)]
+    shown = (positions >= 0) & (positions < num_pixels)
+    frame[positions[shown]] = palette[:len(positions)][shown]
+    # Palette layout: ledOnPos maps the index of each color to its pixels
+    for index, pixels in config.ledOnPos.items():
+        if str(index).isdigit() and int(index) < len(palette) and isinstance(pixels, list):
+            pixels = np.asarray([p for p in pixels if type(p) is int and 0 <= p < num_pixels], dtype=np.int64)
+            frame[pixels] = palette[int(index)]
+    return frame[None]
+
+def _render_frames(config: PatternConfig, num_pixels: int, frames: int, np) -> Any:
+    palette = _palette(config, np)
+    if config.type == "Soffit":
+        return np.broadcast_to(_render_soffit(config, palette, num_pixels, np), (frames, num_pixels, 3))
+    width = max(1, config.spaceBetweenPixels)
+    steps = np.arange(frames)
+    if config.type == "Sequence":
+        index, offset = np.divmod(steps, width)
+        colors = palette[index % len(palette)]
+        if config.effectBetweenPixels in ("Progression", "Fade"):
+            colors = colors + (palette[(index + 1) % len(palette)] - colors) * (offset / width)[:, None]
+        return np.broadcast_to(colors[:, None], (frames, num_pixels, 3))
+    gap = max(0, config.skip) if config.type == "Chase" else 0
+    blocks = _color_blocks(palette, width, config.effectBetweenPixels, gap, np)
+    positions = _positions(num_pixels, config.direction, np)
+    if config.type == "Chase":
+        # Moving away from the start shows the colors that were one pixel closer to it in the previous frame
+        return blocks[(positions[None] - steps[:, None]) % len(blocks)]
+    static = blocks[positions % len(blocks)]
+    if config.type != "Stacker":
+        return np.broadcast_to(static, (frames, num_pixels, 3))
+    # Stacks grow from the far end, so the pixels farthest from the start are lit first
+    block = max(1, config.numOfLeds)
+    length = positions.max(initial=0) + 1
+    cycle = -(-length // block) + 1 # Frames to fill the zone, plus an empty frame before starting over
+    lit = ((steps % cycle) * block)[:, None] > (length - 1 - positions)[None]
+    return static * lit[:, :, None]
+
+def _adjust(frames, config: PatternConfig, np) -> Any:
+    run = config.runData
+    if run is None:
+        return frames
+    scale = np.asarray(run.rgbAdj, dtype=np.float64) / 100 * run.brightness / 100
+    return frames * scale
+
+def render_pattern(config: PatternConfig, zone: Union[ZoneConfig, int], frames: int=1) -> Any:
+    """
+    Renders a preview of a pattern on a zone (a zone configuration or a number of pixels) as a NumPy array of shape
+    (frames, pixels, 3) of RGB bytes. Requires NumPy
+    """
+    np = require_numpy("Rendering patterns")
+    num_pixels = _num_pixels(zone)
+    if type(frames) is not int or frames < 1:
+        raise JellyFishException(f"Number of frames {frames} is invalid (must be a positive integer)")
+    try:
+        rendered = _adjust(_render_frames(config, num_pixels, frames, np), config, np)
+        return np.clip(np.rint(rendered), 0, 255).astype(np.uint8)
+    except (AttributeError, TypeError, ValueError, IndexError) as e:
+        raise JellyFishException(f"Could not render pattern configuration {config}") from e
+
+
+class PatternRenderer:
+    """
+    Renders pattern previews (see render_pattern) and keeps the most recently used ones in a bounded cache keyed by the
+    content hash of their pattern configurations, so that previews of unchanged patterns aren't rendered again.
+    Cached previews are read-only arrays
+    """
+
+    def __init__(self, maxsize: int=DEFAULT_RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__previews: "OrderedDict[Tuple[str, int, int], Any]" = OrderedDict()
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"previews": len(self), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses})
+
+    def __len__(self) -> int:
+        return len(self.__previews)
+
+    def render(self, config: PatternConfig, zone: Union[ZoneConfig, int], frames: int=1) -> Any:
+        """Returns a cached preview of a pattern on a zone, rendering it if needed"""
+        key = (config.content_hash(), _num_pixels(zone), frames)
+        preview = self.__previews.get(key)
+        if preview is not None:
+            self.hits += 1
+            self.__previews.move_to_end(key)
+            return preview
+        self.misses += 1
+        preview = render_pattern(config, key[1], frames)
+        preview.setflags(write=False)
+        self.__previews[key] = preview
+        if len(self.__previews) > self.maxsize:
+            self.__previews.popitem(last=False)
+        return preview
+
+    def clear(self) -> None:
+        """Removes all cached previews"""
+        self.__previews.clear()
@@ -0,0 +1,102 @@
+from typing import Any, Callable, Iterator, List, Union
+from .helpers import JellyFishException, copy
+from .model import ScheduleEvent
+
+# Events are matched by label (a string) or by a function that returns True for the events to match
+EventMatch = Union[str, Callable[[ScheduleEvent], bool]]
+
+def _matcher(match: EventMatch) -> Callable[[ScheduleEvent], bool]:
+    if callable(match):
+        return match
+    return lambda event: event.label == match
+
+
+class ScheduleTransaction:
+    """
+    A set of edits to a copy of a schedule's events that are saved with a single request when the transaction is committed
+    (e.g. when the with block it is used in exits without an exception). Nothing is sent if the events are unchanged.
+    Committing raises a JellyFishException if the schedule was modified elsewhere since the transaction began.
+    See JellyFishController.edit_calendar_schedule and JellyFishController.edit_daily_schedule
+    """
+
+    def __init__(self, events: List[ScheduleEvent], commit: Callable[["ScheduleTransaction"], None]):
+        self.original = events
+        self.events = copy(events)
+        self.committed = False
+        self.__commit = commit
+        self.__closed = False
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"events": len(self.events), "changed": self.changed, "committed": self.committed})
+
+    def __enter__(self) -> "ScheduleTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self.__closed:
+            return
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def __iter__(self) -> Iterator[ScheduleEvent]:
+        return iter(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __check_open(self) -> None:
+        if self.__closed:
+            raise JellyFishException("The schedule transaction has already been committed or rolled back")
+
+    @property
+    def changed(self) -> bool:
+        """True if the events differ from the schedule when the transaction began"""
+        return self.events != self.original
+
+    def find(self, match: EventMatch) -> List[ScheduleEvent]:
+        """Returns the events with the given label or for which the given function returns True"""
+        matches = _matcher(match)
+        return [event for event in self.events if matches(event)]
+
+    def add(self, *events: ScheduleEvent) -> None:
+        """Adds events to the schedule"""
+        self.__check_open()
+        self.events.extend(events)
+
+    def remove(self, match: EventMatch) -> int:
+        """Removes the events with the given label or for which the given function returns True. Returns the number of events removed"""
+        self.__check_open()
+        matches = _matcher(match)
+        count = len(self.events)
+        self.events = [event for event in self.events if not matches(event)]
+        return count - len(self.events)
+
+    def update(self, match: EventMatch, **attrs: Any) -> int:
+        """
+        Sets attributes (e.g. days=["M", "W"]) of the events with the given label or for which the given function returns True.
+        Returns the number of events updated
+        """
+        self.__check_open()
+        invalid = [attr for attr in attrs if attr not in ScheduleEvent.__slots__]
+        if invalid:
+            raise JellyFishException(f"ScheduleEvent attribute(s) {invalid} are invalid (valid attributes are {list(ScheduleEvent.__slots__)})")
+        events = self.find(match)
+        for event in events:
+            for attr, value in attrs.items():
+                setattr(event, attr, value)
+        return len(events)
+
+    def commit(self) -> None:
+        """Saves the schedule if it changed. The events are validated and sent with a single request"""
+        self.__check_open()
+        self.__closed = True
+        if self.changed:
+            self.__commit(self)
+            self.committed = True
+
+    def rollback(self) -> None:
+        """Discards the edits"""
+        self.__check_open()
+        self.__closed = True
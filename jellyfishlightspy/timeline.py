@@ -0,0 +1,208 @@
+import math
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Dict, List, Optional, Tuple
+from .const import VALID_DAYS
+from .helpers import JellyFishException, import_numpy
+from .model import ScheduleEvent, TimeConfig
+
+# Schedules are expanded into the actions that run on each day of a date range:
+#   - Daily events run on the days of the week in their days list (e.g. ["M", "W", "F"])
+#   - Calendar events run annually on the month and day of each date in their days list (e.g. "20231225" runs every December 25th)
+#   - Calendar events take precedence: daily events don't run on days that have calendar events
+# Actions start at a time of day or at sunrise/sunset plus a minute offset. Sun times are computed locally with the NOAA
+# solar equations (accurate to a minute or two outside polar regions) for all days at once, using NumPy when it is installed.
+
+def resolve_timezone(time_config: TimeConfig) -> tzinfo:
+    """Returns the time zone of a controller's time configuration (its timezone or timezoneName must be an IANA time zone name)"""
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError # Imported here since most uses of this library never need it
+    for name in [time_config.timezone, time_config.timezoneName]:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            pass
+    raise JellyFishException(f"Time zone '{time_config.timezone}' is not recognized (pass a tzinfo instead)")
+
+def _sun_minutes(day_of_year, days_in_year, lat: float, lon: float, sin, cos, tan, acos, clip):
+    """
+    Returns the sunrise and sunset times (in minutes after midnight UTC) for days of the year. The days can be numbers or
+    NumPy arrays, given math functions that operate on them
+    """
+    g = 2 * math.pi / days_in_year * (day_of_year - 1) # Fractional year
+    eqtime = 229.18 * (0.000075 + 0.001868 * cos(g) - 0.032077 * sin(g) - 0.014615 * cos(2 * g) - 0.040849 * sin(2 * g))
+    decl = 0.006918 - 0.399912 * cos(g) + 0.070257 * sin(g) - 0.006758 * cos(2 * g) + 0.000907 * sin(2 * g) - 0.002697 * cos(3 * g) + 0.00148 * sin(3 * g)
+    lat = math.radians(lat)
+    # The sun never sets (or rises) when the cosine of the hour angle is out of range, so clip it to a full (or empty) day
+    cos_ha = math.cos(math.radians(90.833)) / (math.cos(lat) * cos(decl)) - math.tan(lat) * tan(decl)
+    ha = acos(clip(cos_ha, -1, 1)) * 180 / math.pi
+    return 720 - 4 * (lon + ha) - eqtime, 720 - 4 * (lon - ha) - eqtime
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def sun_times(lat: float, lon: float, days: List[date], tz: tzinfo) -> List[Tuple[datetime, datetime]]:
+    """Returns the (sunrise, sunset) times of each day at a location as datetimes in the given time zone"""
+    days_of_year = [day.timetuple().tm_yday for day in days]
+    days_in_year = [366 if (day.year % 4 == 0 and day.year % 100 != 0) or day.year % 400 == 0 else 365 for day in days]
+    np = import_numpy()
+    if np is not None:
+        rises, sets = _sun_minutes(np.array(days_of_year), np.array(days_in_year), lat, lon, np.sin, np.cos, np.tan, np.arccos, np.clip)
+        minutes = zip(rises.tolist(), sets.tolist())
+    else:
+        clip = lambda value, low, high: min(max(value, low), high)
+        minutes = [_sun_minutes(doy, diy, lat, lon, math.sin, math.cos, math.tan, math.acos, clip) for doy, diy in zip(days_of_year, days_in_year)]
+    times = []
+    for day, (rise, set_) in zip(days, minutes):
+        midnight = (day.toordinal() - _EPOCH_ORDINAL) * 86400 # UTC
+        times.append((datetime.fromtimestamp(midnight + rise * 60, tz), datetime.fromtimestamp(midnight + set_ * 60, tz)))
+    return times
+
+
+class ScheduledAction:
+    """An action of a schedule event at a specific time (event is the schedule event that the action came from)"""
+    __slots__ = ("time", "type", "patternFile", "zones", "label", "event")
+
+    def __init__(self, time: datetime, type: str, patternFile: str, zones: List[str], label: str, event: ScheduleEvent):
+        self.time = time
+        self.type = type
+        self.patternFile = patternFile
+        self.zones = zones
+        self.label = label
+        self.event = event
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({attr: getattr(self, attr) for attr in self.__slots__})
+
+
+def _action_order(action: ScheduledAction) -> Tuple[datetime, bool]:
+    # Actions at the same time stop zones before running patterns, so that a pattern can start when another stops
+    return action.time, action.type != "STOP"
+
+def expand_schedules(daily_events: List[ScheduleEvent], calendar_events: List[ScheduleEvent], start: date, end: date, lat: float, lon: float, tz: tzinfo) -> List[ScheduledAction]:
+    """Expands daily and calendar schedules into the actions that run from the start date through the end date, sorted by time"""
+    if end < start:
+        raise JellyFishException(f"The end date {end} is before the start date {start}")
+    # Index the events by weekday and by month and day so that each day's events are found without scanning all events
+    # (VALID_DAYS is in the order of date.weekday())
+    daily: Dict[int, List[ScheduleEvent]] = {}
+    for event in daily_events:
+        for day in event.days:
+            if day not in VALID_DAYS:
+                raise JellyFishException(f"Daily event '{event.label}' has an invalid day '{day}' (valid values are {VALID_DAYS})")
+            daily.setdefault(VALID_DAYS.index(day), []).append(event)
+    calendar: Dict[str, List[ScheduleEvent]] = {}
+    for event in calendar_events:
+        for day in event.days:
+            calendar.setdefault(day[4:], []).append(event)
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    needs_sun = any(action.startFrom != "time" for event in daily_events + calendar_events for action in event.actions)
+    suns = sun_times(lat, lon, days, tz) if needs_sun else [None] * len(days)
+    actions = []
+    for day, sun in zip(days, suns):
+        for event in calendar.get(day.strftime("%m%d")) or daily.get(day.weekday(), []):
+            for action in event.actions:
+                if action.startFrom == "time":
+                    when = datetime.combine(day, time(action.hour, action.minute), tz)
+                else:
+                    when = sun[0 if action.startFrom == "sunrise" else 1] + timedelta(minutes=action.minute)
+                actions.append(ScheduledAction(when, action.type, action.patternFile, action.zones, event.label, event))
+    actions.sort(key=_action_order)
+    return actions
+
+
+CONFLICT = "conflict"
+REDUNDANT_STOP = "redundant stop"
+GAP = "gap"
+
+class ScheduleIssue:
+    """
+    A likely mistake in schedules found by ScheduleTimeline.lint: a conflict (an event runs a pattern on a zone while
+    another event's pattern is running), a redundant stop (an event stops a zone that isn't running a pattern), or a gap
+    (a zone is briefly stopped between two patterns)
+    """
+    __slots__ = ("kind", "zone", "time", "labels")
+
+    def __init__(self, kind: str, zone: str, time: datetime, labels: List[str]):
+        self.kind = kind
+        self.zone = zone
+        self.time = time
+        self.labels = labels
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({attr: getattr(self, attr) for attr in self.__slots__})
+
+    def __str__(self):
+        if self.kind == CONFLICT:
+            return f"{self.time}: '{self.labels[1]}' runs a pattern on zone '{self.zone}' while '{self.labels[0]}' is running"
+        if self.kind == REDUNDANT_STOP:
+            return f"{self.time}: '{self.labels[0]}' stops zone '{self.zone}', which isn't running a pattern"
+        return f"{self.time}: zone '{self.zone}' is stopped briefly by '{self.labels[0]}' before '{self.labels[1]}' runs a pattern"
+
+
+class ScheduleTimeline:
+    """
+    An index of scheduled actions (see expand_schedules) that answers which pattern is scheduled on a zone at a given time
+    with a binary search of the zone's actions
+    """
+
+    def __init__(self, actions: List[ScheduledAction]):
+        self.actions = sorted(actions, key=_action_order)
+        self.__timestamps = [action.time.timestamp() for action in self.actions]
+        self.__zones: Dict[str, Tuple[List[float], List[ScheduledAction]]] = {}
+        for action in self.actions:
+            for zone in action.zones:
+                timestamps, zone_actions = self.__zones.setdefault(zone, ([], []))
+                timestamps.append(action.time.timestamp())
+                zone_actions.append(action)
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"actions": len(self.actions), "zones": self.zones})
+
+    @property
+    def zones(self) -> List[str]:
+        """The zones that have scheduled actions"""
+        return list(self.__zones)
+
+    def last_action(self, zone: str, when: datetime) -> Optional[ScheduledAction]:
+        """Returns the last action on a zone at or before a time (an aware datetime), or None if there isn't one"""
+        timestamps, actions = self.__zones.get(zone, ([], []))
+        i = bisect_right(timestamps, when.timestamp())
+        return actions[i - 1] if i else None
+
+    def active_pattern(self, zone: str, when: datetime) -> Optional[str]:
+        """Returns the pattern that the schedule runs on a zone at a time (an aware datetime), or None if it is stopped or unknown"""
+        action = self.last_action(zone, when)
+        return action.patternFile if action and action.type == "RUN" else None
+
+    def actions_between(self, start: datetime, end: datetime, zone: Optional[str]=None) -> List[ScheduledAction]:
+        """Returns the actions (on all zones, or only the given zone) from the start time up to but excluding the end time"""
+        timestamps, actions = (self.__timestamps, self.actions) if zone is None else self.__zones.get(zone, ([], []))
+        return actions[bisect_left(timestamps, start.timestamp()):bisect_left(timestamps, end.timestamp())]
+
+    def lint(self, max_gap: timedelta=timedelta(minutes=15)) -> List[ScheduleIssue]:
+        """
+        Finds conflicts, redundant stops, and gaps (zones stopped for less than max_gap between two patterns) with a single pass
+        over each zone's actions. Returns the issues sorted by time
+        """
+        issues = []
+        for zone, (_, actions) in self.__zones.items():
+            running: Optional[ScheduledAction] = None # The RUN action of the pattern running on the zone
+            stopped: Optional[ScheduledAction] = None # The STOP action that stopped the zone's last pattern
+            for action in actions:
+                if action.type == "STOP":
+                    if running is None:
+                        issues.append(ScheduleIssue(REDUNDANT_STOP, zone, action.time, [action.label]))
+                    else:
+                        running, stopped = None, action
+                    continue
+                # Labels aren't unique, so events are compared by identity (an event can run a pattern on a zone it is already running)
+                if running is not None and running.event is not action.event:
+                    issues.append(ScheduleIssue(CONFLICT, zone, action.time, [running.label, action.label]))
+                elif running is None and stopped is not None and timedelta(0) < action.time - stopped.time < max_gap:
+                    issues.append(ScheduleIssue(GAP, zone, stopped.time, [stopped.label, action.label]))
+                running = action
+        issues.sort(key=lambda issue: issue.time)
+        return issues
+
+def lint_schedules(daily_events: List[ScheduleEvent], calendar_events: List[ScheduleEvent], start: date, end: date, lat: float, lon: float, tz: tzinfo, max_gap: timedelta=timedelta(minutes=15)) -> List[ScheduleIssue]:
+    """Expands schedules from the start date through the end date and returns their issues (see ScheduleTimeline.lint)"""
+    return ScheduleTimeline(expand_schedules(daily_events, calendar_events, start, end, lat, lon, tz)).lint(max_gap)
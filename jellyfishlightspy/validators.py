@@ -1,4 +1,9 @@
-from typing import Tuple, List
+import functools
+from array import array
+from collections import OrderedDict
+from itertools import chain
+from threading import Lock
+from typing import Any, Tuple, List, Dict, Collection, Iterable, Optional, Callable, Hashable
 from datetime import datetime
 from .helpers import JellyFishException
 from .const import (
@@ -9,6 +14,7 @@ from .const import (
     VALID_ACTION_TYPES,
     VALID_START_FROMS,
     VALID_DAYS,
+    DEFAULT_VALIDATION_MEMO_SIZE,
 )
 from .model import (
     RunConfig,
@@ -18,9 +24,48 @@ from .model import (
     ZoneConfig,
     ScheduleEvent,
     ScheduleEventAction,
+    count_pixels,
 )
+from .pixelmap import find_overlaps
 
 
+# Color arrays are validated in bulk using builtins that loop in C instead of evaluating a Python expression per value.
+# Arrays (e.g. compact cached colors, see PatternConfig.compact) and NumPy arrays are checked by type code or dtype instead.
+# NumPy is optional and never imported here; its arrays are recognized by their type's module.
+
+_INT_TYPECODES = "bBhHiIlLqQ"
+
+def _is_ndarray(values: Any) -> bool:
+    return type(values).__module__ == "numpy" and hasattr(values, "dtype")
+
+def _all_ints(values: Any) -> bool:
+    """Returns True if values is a list, tuple, array, or NumPy array of integers (bools are not integers here)"""
+    if isinstance(values, array):
+        return values.typecode in _INT_TYPECODES
+    if _is_ndarray(values):
+        return values.dtype.kind in "iu"
+    # list.count compares identity first, so counting the int type is much faster than checking each value's type
+    return type(values) in (list, tuple) and list(map(type, values)).count(int) == len(values)
+
+def _all_bytes(values: Any) -> bool:
+    """Returns True if values is a list, tuple, array, or NumPy array of integers between 0 and 255"""
+    if not _all_ints(values):
+        return False
+    if isinstance(values, array):
+        return values.typecode == "B" or len(values) == 0 or (min(values) >= 0 and max(values) <= 255)
+    if _is_ndarray(values):
+        return values.size == 0 or bool(values.min() >= 0 and values.max() <= 255)
+    try:
+        bytes(values) # Raises a ValueError if any value is out of range
+        return True
+    except ValueError:
+        return False
+
+def _raise_errors(subject: str, errors: List[str]) -> None:
+    """Raises a single exception that lists all validation errors, if there are any"""
+    if errors:
+        raise JellyFishException(f"{subject} is invalid ({len(errors)} error{'s' if len(errors) > 1 else ''}):\n  " + "\n  ".join(errors))
+
 def validate_rgb(rgb: Tuple[int, int, int]) -> Tuple[int, int, int]:
     """Validates an RGB tuple (contains 3 valid intensity values)"""
     if rgb is not None and type(rgb) is tuple and len(rgb) == 3:
@@ -28,21 +73,39 @@ def validate_rgb(rgb: Tuple[int, int, int]) -> Tuple[int, int, int]:
             return rgb
     raise JellyFishException(f"RGB value {rgb} is invalid (must be a tuple containing three integers between 0 and 255)")
 
+def validate_light_string(light_string: Any) -> List[Tuple[int, int, int]]:
+    """
+    Validates a light string (a list of RGB tuples, or a NumPy array with a row of 3 values per pixel) in bulk.
+    Returns the light string as a list of RGB tuples
+    """
+    if _is_ndarray(light_string):
+        if light_string.ndim == 2 and light_string.shape[1] == 3 and _all_bytes(light_string):
+            return list(map(tuple, light_string.tolist()))
+        raise JellyFishException("Light string array is invalid (must have a shape of (pixels, 3) and contain integers between 0 and 255)")
+    pixels = len(light_string)
+    if list(map(type, light_string)).count(tuple) == pixels and list(map(len, light_string)).count(3) == pixels:
+        if _all_bytes(list(chain.from_iterable(light_string))):
+            return light_string
+    # Find the first invalid value for the error message
+    for rgb in light_string:
+        validate_rgb(rgb)
+    return light_string
+
 def validate_brightness(brightness: int) -> int:
     """Validates a brightness value (between 0 and 100)"""
     if brightness is not None and type(brightness) is int and 0 <= brightness <= 100:
         return brightness
     raise JellyFishException(f"Brightness value {brightness} is invalid (but be an integer between 0 and 100)")
 
-def validate_zones(zones: List[str], valid_zones: List[str]) -> List[str]:
-    """Validates a list of zone values (must be in the list of values recieved from the controller)"""
+def validate_zones(zones: List[str], valid_zones: Collection[str]) -> List[str]:
+    """Validates a list of zone values (must be in the collection of values recieved from the controller - pass a set for fast lookups)"""
     invalid_zones = [zone for zone in zones if zone not in valid_zones]
     if len(invalid_zones) == 0:
         return zones
-    raise JellyFishException(f"Zone name(s) {invalid_zones} are invalid (valid values are {valid_zones})")
+    raise JellyFishException(f"Zone name(s) {invalid_zones} are invalid (valid values are {sorted(valid_zones)})")
 
-def validate_patterns(patterns: List[str], valid_patterns: List[str]) -> List[str]:
-    """Validates pattern values (must be in the list of values recieved from the controller)"""
+def validate_patterns(patterns: List[str], valid_patterns: Collection[str]) -> List[str]:
+    """Validates pattern values (must be in the collection of values recieved from the controller - pass a set for fast lookups)"""
     invalid_patterns = [pattern for pattern in patterns if pattern not in valid_patterns]
     if len(invalid_patterns) == 0:
         return patterns
@@ -54,10 +117,13 @@ def validate_zone_config(config: ZoneConfig) -> ZoneConfig:
         raise JellyFishException("ZoneConfig.portMap value is invalid (must be a list of PortMapping objects)")
     for mapping in config.portMap:
         validate_port_mapping(mapping)
-    pixel_ct = sum([abs(pm.phyEndIdx - pm.phyStartIdx) + 1 for pm in config.portMap])
+    pixel_ct = count_pixels(config.portMap)
     if config.numPixels != pixel_ct:
         raise JellyFishException(f"ZoneConfig.numPixels value {config.numPixels} is invalid (must equal the number of active pixels in the port mapping list: {pixel_ct})")
-    #TODO: add check to see if pixel ranges overlap?
+    overlaps = find_overlaps(("", mapping) for mapping in config.portMap)
+    if overlaps:
+        ranges = [f"port {o.port[1]} pixels {o.first}-{o.last} on controller '{o.port[0]}'" for o in overlaps]
+        raise JellyFishException(f"ZoneConfig.portMap value is invalid (port mappings overlap: {ranges})")
     return config
 
 def validate_port_mapping(mapping: PortMapping) -> PortMapping:
@@ -74,13 +140,13 @@ def validate_port_mapping(mapping: PortMapping) -> PortMapping:
         raise JellyFishException(f"PortMapping.zoneRGBStartIdx value {mapping.zoneRGBStartIdx} is invalid (must be 0 or equal the phyStartIdx ({mapping.phyStartIdx}) or phyEndIdx ({mapping.phyEndIdx}) value)")
     return mapping
 
-def validate_pattern_config(config: PatternConfig, valid_zones: List[str]) -> PatternConfig:
+def validate_pattern_config(config: PatternConfig, valid_zones: Collection[str]) -> PatternConfig:
     """Validates pattern configuration values"""
-    if type(config.colors) is not list or not all((i is not None and type(i) is int and 0 <= i <= 255) for i in config.colors):
+    if not isinstance(config.colors, (list, array)) or not _all_bytes(config.colors):
         raise JellyFishException(f"PatternConfig.colors value {config.colors} is invalid (must be a list of integers between 0 and 255)")
     if len(config.colors) % 3 != 0:
         raise JellyFishException(f"PatternConfig.colors value {config.colors} is invalid (length must be a multiple of 3)")
-    if type(config.colorPos) is not list or not all(type(i) is int for i in config.colorPos):
+    if not isinstance(config.colorPos, (list, array)) or not _all_ints(config.colorPos):
         raise JellyFishException(f"PatternConfig.colorPos value {config.colors} is invalid (must be a list of integers)")
     if config.type not in VALID_TYPES:
         raise JellyFishException(f"PatternConfig.type value '{config.type}' is invalid (valid values are {VALID_TYPES})")
@@ -98,7 +164,7 @@ def validate_pattern_config(config: PatternConfig, valid_zones: List[str]) -> Pa
         raise JellyFishException(f"PatternConfig.cursor value '{config.cursor}' is invalid (must be an integer)")
     #TODO: config.ledOnPos?
     if config.soffitZone and config.soffitZone not in valid_zones:
-        raise JellyFishException(f"PatternConfig.soffitZone value '{config.soffitZone}' is invalid (valid values are {valid_zones}")
+        raise JellyFishException(f"PatternConfig.soffitZone value '{config.soffitZone}' is invalid (valid values are {sorted(valid_zones)})")
     if config.runData:
         validate_run_config(config.runData)
     return config
@@ -117,18 +183,20 @@ def validate_run_config(config: RunConfig) -> RunConfig:
         raise JellyFishException(f"RunConfig.rgbAdj value {config.rgbAdj} is invalid (must be a list of three integers between 0 and 255)")
     return config
 
+@functools.lru_cache(maxsize=1024)
 def _date_str_is_valid(date_str: str) -> bool:
+    # Cached since the same dates recur across events and parsing them is comparatively slow
     try:
         datetime.strptime(date_str, '%Y%m%d')
         return True
     except ValueError:
         return False
 
-def validate_schedule_event(event: ScheduleEvent, is_calendar_event:bool, valid_patterns: List[str], valid_zones: List[str]) -> ScheduleEvent:
+def validate_schedule_event(event: ScheduleEvent, is_calendar_event:bool, valid_patterns: Collection[str], valid_zones: Collection[str]) -> ScheduleEvent:
     if type(event.label) is not str:
         raise JellyFishException(f"ScheduleEvent.event value '{event.label}' is invalid (must be a string)")
     if is_calendar_event:
-        if not all(len(date_str) == 8 and _date_str_is_valid(date_str) for date_str in event.days):
+        if not all(type(date_str) is str and len(date_str) == 8 and _date_str_is_valid(date_str) for date_str in event.days):
             raise JellyFishException(f"ScheduleEvent.days value {event.days} is invalid (must be a list of date strings in YYYYMMDD format)")
     elif not all(day in VALID_DAYS for day in event.days):
         raise JellyFishException(f"ScheduleEvent.days value {event.days} is invalid (must be a list containing one or more day values: {VALID_DAYS})")
@@ -141,7 +209,7 @@ def validate_schedule_event(event: ScheduleEvent, is_calendar_event:bool, valid_
         raise JellyFishException("ScheduleEvent.actions zones are invalid (all zone lists must be equal)")
     return event
 
-def validate_schedule_event_action(action: ScheduleEventAction, valid_patterns: List[str], valid_zones: List[str]) -> ScheduleEventAction:
+def validate_schedule_event_action(action: ScheduleEventAction, valid_patterns: Collection[str], valid_zones: Collection[str]) -> ScheduleEventAction:
     if action.type not in VALID_ACTION_TYPES:
         raise JellyFishException(f"ScheduleEventAction.type value '{action.type}' is invalid (valid values are: {VALID_ACTION_TYPES})")
     if action.startFrom not in VALID_START_FROMS:
@@ -157,5 +225,137 @@ def validate_schedule_event_action(action: ScheduleEventAction, valid_patterns:
         if type(action.patternFile) is not str or action.patternFile not in valid_patterns:
             raise JellyFishException(f"ScheduleEventAction.patternFile value '{action.patternFile}' is invalid")
     if type(action.zones) is not list or not all(zone in valid_zones for zone in action.zones):
-        raise JellyFishException(f"ScheduleEventAction.zones value(s) {action.zones} are invalid (valid zones are: {valid_zones})")
-    return action
\ No newline at end of file
+        raise JellyFishException(f"ScheduleEventAction.zones value(s) {action.zones} are invalid (valid zones are: {sorted(valid_zones)})")
+    return action
+
+def validate_schedule(events: List[ScheduleEvent], is_calendar_event: bool, valid_patterns: Collection[str], valid_zones: Collection[str], memo: Optional["ValidationMemo"]=None) -> List[ScheduleEvent]:
+    """
+    Validates every event in a schedule, raising a single exception that lists the errors of all invalid events.
+    Events that are in the memo are not validated again (see ValidationMemo)
+    """
+    keys = [_schedule_event_key(event, is_calendar_event) for event in events] if memo is not None else [None] * len(events)
+    errors = []
+    validated = []
+    for i in memo.unvalidated(keys) if memo is not None else range(len(events)):
+        try:
+            validate_schedule_event(events[i], is_calendar_event, valid_patterns, valid_zones)
+            validated.append(keys[i])
+        except JellyFishException as e:
+            errors.append(f"Event {i} ('{getattr(events[i], 'label', '')}'): {e}")
+    if memo is not None:
+        memo.add(validated)
+    _raise_errors(f"{'Calendar' if is_calendar_event else 'Daily'} schedule", errors)
+    return events
+
+def validate_pattern_library(entries: Iterable[Tuple[Pattern, PatternConfig]], valid_zones: Collection[str]) -> List[Tuple[Pattern, PatternConfig]]:
+    """Validates the configuration of every (pattern, configuration) entry, raising a single exception that lists the errors of all invalid patterns"""
+    entries = list(entries)
+    errors = []
+    for pattern, config in entries:
+        try:
+            validate_pattern_config(config, valid_zones)
+        except JellyFishException as e:
+            errors.append(f"Pattern '{pattern}': {e}")
+    _raise_errors("Pattern library", errors)
+    return entries
+
+def validate_zone_configs(zone_configs: Collection[ZoneConfig], memo: Optional["ValidationMemo"]=None) -> Collection[ZoneConfig]:
+    """
+    Validates zone configurations. Configurations that are in the memo are not validated again (see ValidationMemo).
+    Pass a dict of zone names to configurations to also check that zones don't overlap (this is never memoized)
+    """
+    configs = list(zone_configs.values() if isinstance(zone_configs, dict) else zone_configs)
+    keys = [_zone_config_key(config) for config in configs] if memo is not None else [None] * len(configs)
+    for i in memo.unvalidated(keys) if memo is not None else range(len(configs)):
+        validate_zone_config(configs[i])
+        if memo is not None:
+            memo.add([keys[i]])
+    if isinstance(zone_configs, dict):
+        validate_zone_overlaps(zone_configs)
+    return zone_configs
+
+def validate_zone_overlaps(zone_configs: Dict[str, ZoneConfig]) -> Dict[str, ZoneConfig]:
+    """Validates that no physical pixel is mapped to more than one zone (reports all overlaps at once)"""
+    overlaps = find_overlaps((zone, mapping) for zone, config in zone_configs.items() for mapping in config.portMap)
+    _raise_errors("Zone layout", [str(overlap) for overlap in overlaps])
+    return zone_configs
+
+# Memo keys are tuples of the values that are validated, which are much faster to build and hash than serializing objects to
+# compute content hashes (serializing a schedule event takes longer than validating it). Types are included where values of
+# different types compare equal (e.g. 1, 1.0, and True). Objects without a key (e.g. with unhashable values) are always validated.
+
+def _schedule_event_key(event: ScheduleEvent, is_calendar_event: bool) -> Optional[Tuple]:
+    try:
+        actions = tuple([(
+            type(a), a.type, a.startFrom, a.hour, type(a.hour), a.minute, type(a.minute), a.patternFile, type(a.zones), tuple(a.zones)
+        ) for a in event.actions])
+        key = (is_calendar_event, type(event), event.label, type(event.days), tuple(event.days), type(event.actions), actions)
+        hash(key)
+        return key
+    except (AttributeError, TypeError):
+        return None
+
+def _zone_config_key(config: ZoneConfig) -> Optional[Tuple]:
+    try:
+        port_map = tuple([(
+            type(pm), pm.ctlrName, pm.phyPort, type(pm.phyPort), pm.phyStartIdx, type(pm.phyStartIdx),
+            pm.phyEndIdx, type(pm.phyEndIdx), pm.zoneRGBStartIdx, type(pm.zoneRGBStartIdx)
+        ) for pm in config.portMap])
+        key = (type(config), config.numPixels, type(config.numPixels), type(config.portMap), port_map)
+        hash(key)
+        return key
+    except (AttributeError, TypeError):
+        return None
+
+
+class ValidationMemo:
+    """
+    A bounded LRU memo of the objects that passed validation, keyed on their content. Validation also depends on the zone
+    and pattern names, so the memo is cleared whenever the versions returned by the versions function change (e.g. the
+    versions of the cache's name indexes). A memo must only be used with the names that its versions describe
+    """
+
+    def __init__(self, versions: Callable[[], Any]=lambda: None, maxsize: int=DEFAULT_VALIDATION_MEMO_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__versions = versions
+        self.__validated_versions = versions()
+        self.__keys: "OrderedDict[Hashable, None]" = OrderedDict()
+        self.__lock = Lock()
+
+    def __repr__(self):
+        return self.__class__.__name__ + str({"size": len(self), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses})
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def unvalidated(self, keys: List[Optional[Hashable]]) -> List[int]:
+        """Returns the indexes of the keys of objects that haven't passed validation (None keys are never in the memo)"""
+        versions = self.__versions()
+        with self.__lock:
+            if versions != self.__validated_versions:
+                self.__keys.clear()
+                self.__validated_versions = versions
+            unvalidated = []
+            for i, key in enumerate(keys):
+                if key is not None and key in self.__keys:
+                    self.__keys.move_to_end(key)
+                else:
+                    unvalidated.append(i)
+            self.hits += len(keys) - len(unvalidated)
+            self.misses += len(unvalidated)
+            return unvalidated
+
+    def add(self, keys: Iterable[Optional[Hashable]]) -> None:
+        """Adds the keys of objects that passed validation, evicting the least recently used keys when full"""
+        with self.__lock:
+            for key in keys:
+                if key is not None:
+                    self.__keys[key] = None
+            while len(self.__keys) > self.maxsize:
+                self.__keys.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__keys.clear()
@@ -18,6 +18,12 @@ setup(
     install_requires=[
           'websocket-client',
       ],
+    extras_require={
+          'numpy': ['numpy'],
+      },
+    entry_points={
+          'console_scripts': ['jellyfish=jellyfishlightspy.cli:main'],
+      },
     long_description=long_description,
     long_description_content_type='text/markdown',
     description='Python library for controlling Jellyfish Lights via the local network.',
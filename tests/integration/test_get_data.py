@@ -60,4 +60,11 @@ def test_validate_pattern_configs(controller):
     configs = controller.pattern_configs.values()
     zones = controller.zone_names
     for config in configs:
-        validate_pattern_config(config, zones)
\ No newline at end of file
+        validate_pattern_config(config, zones)
+
+def test_iter_pattern_configs(controller):
+    patterns = controller.pattern_names
+    received = dict(controller.iter_pattern_configs(batch_size=3))
+    assert set(patterns) == set(received.keys())
+    for config in received.values():
+        assert isinstance(config, PatternConfig)
@@ -0,0 +1,73 @@
+import pytest
+import time
+from jellyfishlightspy.animation import Animation, Timeline
+from jellyfishlightspy.helpers import JellyFishException
+
+np = pytest.importorskip("numpy")
+
+def test_timeline():
+    timeline = Timeline([(2, [(200, 0, 0), (0, 0, 100)]), (0, [(0, 0, 0), (0, 0, 0)])])
+    assert timeline.duration == 2 and timeline.num_pixels == 2
+    assert timeline.frame_at(1).tolist() == [[100, 0, 0], [0, 0, 50]]
+    frames = timeline.frames_at([-1, 0, 0.5, 2, 3])
+    assert frames.shape == (5, 2, 3) and frames.dtype == np.uint8
+    assert frames[:, 0, 0].tolist() == [0, 0, 50, 200, 200]
+    looped = Timeline([(0, [(0, 0, 0)]), (1, [(100, 100, 100)])], loop=True)
+    assert looped.frames_at([0.5, 1.5, 2.25])[:, 0, 0].tolist() == [50, 50, 25]
+    assert Timeline([(0, [(1, 2, 3)])]).frames_at([0, 10])[:, 0].tolist() == [[1, 2, 3]] * 2
+
+def test_timeline_invalid():
+    with pytest.raises(JellyFishException):
+        Timeline([])
+    with pytest.raises(JellyFishException):
+        Timeline([(-1, [(0, 0, 0)])])
+    with pytest.raises(JellyFishException):
+        Timeline([(0, [(0, 0, 0)]), (1, [(0, 0, 0), (0, 0, 0)])])
+    with pytest.raises(JellyFishException):
+        Timeline([(0, [0, 0, 0])])
+
+def test_animation():
+    sent = []
+    animation = Animation(lambda t: t, sent.append, fps=100, duration=0.1)
+    stats = animation.play()
+    # The final frame shows the end of the animation, and frames that fell behind were skipped
+    assert sent[0] == 0 and sent[-1] == 0.1
+    assert stats.frames == len(sent) and stats.frames + stats.skipped >= 11
+    assert stats.elapsed >= 0.09 and stats.fps > 0
+    assert all(b > a for a, b in zip(sent, sent[1:]))
+
+def test_animation_drift():
+    # Frames are due at fixed times from the start, so slow sends don't accumulate delays
+    sent = []
+    def send(t):
+        sent.append(t)
+        time.sleep(0.03)
+    stats = Animation(lambda t: t, send, fps=50, duration=0.2).play()
+    assert stats.skipped > 0
+    assert stats.elapsed < 0.3
+
+def test_animation_coalesce():
+    # Frames are skipped while the receiver isn't ready, but the final frame is always sent
+    sent = []
+    stats = Animation(lambda t: t, sent.append, fps=100, duration=0.1, ready=lambda: len(sent) % 3 == 0).play()
+    assert stats.coalesced > 0 and stats.frames == len(sent)
+    assert sent[-1] == 0.1
+    stats = Animation(lambda t: t, sent.append, fps=100, duration=0.05, ready=lambda: False).play()
+    assert stats.frames == 1 and stats.coalesced > 0
+
+def test_animation_thread():
+    animation = Animation(lambda t: t, lambda frame: None, fps=100).start()
+    assert animation.running
+    with pytest.raises(JellyFishException):
+        animation.start()
+    animation.stop(1)
+    assert not animation.running and animation.stats.frames > 0
+
+def test_animation_error():
+    def send(frame):
+        raise JellyFishException("Not connected to controller")
+    animation = Animation(lambda t: t, send).start()
+    assert animation.wait(1)
+    assert isinstance(animation.error, JellyFishException) and animation.stats.frames == 0
+    with pytest.raises(JellyFishException):
+        Animation(lambda t: t, send, fps=0)
@@ -1,6 +1,7 @@
 import time
 from threading import Thread
-from jellyfishlightspy.cache import DataCache
+from jellyfishlightspy.cache import DataCache, NameIndex, PatternTree, JellyFishCache
+from jellyfishlightspy.model import Pattern, PatternConfig, ZoneState
 
 def test_data_cache():
     c = DataCache()
@@ -34,4 +35,136 @@ def test_data_cache():
     assert len(c.get_all_entries()) == 0
     assert not c.get_entry(e1[0])
     assert not c.get_entry(e2[0])
-    t.join()
\ No newline at end of file
+    t.join()
+
+def test_data_cache_await_after_ts():
+    c = DataCache()
+    # Updates and deletions that occur before waiting begins are not missed
+    ts = time.perf_counter()
+    c.update_entry("e1", "1")
+    assert c.await_update(.1, ["1"], ts)
+    ts = time.perf_counter()
+    c.delete_entry("1")
+    assert c.await_update(.1, ["1"], ts)
+    ts = time.perf_counter()
+    c.update_entries({"2": "e2"})
+    assert c.await_finalization(.1, ts)
+    assert not c.await_update(.1, ["2"], time.perf_counter())
+
+
+def test_name_index():
+    index = NameIndex(lambda p: not p.is_folder)
+    c = DataCache([index])
+    folder = Pattern("test-folder", "")
+    patterns = {str(p): p for p in [folder, Pattern("test-folder", "test-name-1"), Pattern("test-folder", "test-name-2")]}
+    c.update_entries(patterns)
+    assert index.names == frozenset(["test-folder/test-name-1", "test-folder/test-name-2"])
+    assert list(index) == ["test-folder/test-name-1", "test-folder/test-name-2"]
+    assert str(folder) not in index
+    assert str(index.get(str(folder))) == str(folder)
+    # get returns copies so the indexed data can't be modified
+    index.get("test-folder/test-name-1").name = "changed"
+    assert index.get("test-folder/test-name-1").name == "test-name-1"
+    c.delete_entry("test-folder/test-name-1")
+    assert index.names == frozenset(["test-folder/test-name-2"])
+    assert index.get("test-folder/test-name-1") is None
+    version = index.version
+    c.update_entry(Pattern("test-folder", "test-name-3"), "test-folder/test-name-3")
+    assert "test-folder/test-name-3" in index.names
+    assert index.version > version
+    # Updating an entry that is already indexed doesn't change the version
+    version = index.version
+    c.update_entry(Pattern("test-folder", "test-name-3"), "test-folder/test-name-3")
+    assert index.version == version
+    c.clear()
+    assert len(index) == 0
+    assert index.names == frozenset()
+
+
+def test_pattern_tree():
+    tree = PatternTree()
+    c = DataCache([tree])
+    patterns = [Pattern("Christmas", ""), Pattern("Christmas", "Red"), Pattern("Christmas", "Green"), Pattern("Colors", "Blue"), Pattern("Christmas/Trees", "Pine"), Pattern("Empty", "")]
+    c.update_entries({str(p): p for p in patterns})
+    assert tree.list_folder() == ["Christmas/", "Colors/", "Empty/"]
+    assert tree.list_folder("Christmas") == ["Christmas/Trees/", "Christmas/Red", "Christmas/Green"]
+    assert tree.list_folder("Christmas/") == tree.list_folder("Christmas")
+    assert tree.list_folder("Nope") == []
+    assert list(tree.walk("Christmas")) == [("Christmas", ["Trees"], ["Christmas/Red", "Christmas/Green"]), ("Christmas/Trees", [], ["Christmas/Trees/Pine"])]
+    assert [folder for folder, _, _ in tree.walk()] == ["", "Christmas", "Christmas/Trees", "Colors", "Empty"]
+    assert tree.search("Christmas/") == ["Christmas/Red", "Christmas/Green", "Christmas/Trees/Pine"]
+    assert tree.search("Christmas/Gr") == ["Christmas/Green"]
+    assert tree.search("C") == ["Christmas/Red", "Christmas/Green", "Christmas/Trees/Pine", "Colors/Blue"]
+    assert tree.search("X") == []
+    # Implicit folders are pruned when their last pattern is deleted, explicit folders remain until deleted
+    c.delete_entry("Christmas/Trees/Pine")
+    assert tree.list_folder("Christmas") == ["Christmas/Red", "Christmas/Green"]
+    c.delete_entry("Christmas/Red")
+    c.delete_entry("Christmas/Green")
+    assert tree.list_folder() == ["Christmas/", "Colors/", "Empty/"]
+    c.delete_entry("Christmas/")
+    assert tree.list_folder() == ["Colors/", "Empty/"]
+    c.clear()
+    assert tree.list_folder() == []
+
+
+def test_data_cache_listener():
+    c = DataCache()
+    updates = []
+    listener = lambda key, data: updates.append((key, data))
+    c.add_listener(listener)
+    c.update_entry("e1", "1")
+    c.update_entries({"2": "e2", "3": "e3"})
+    assert updates == [("1", "e1"), ("2", "e2"), ("3", "e3")]
+    c.remove_listener(listener)
+    c.update_entry("e4", "4")
+    assert len(updates) == 3
+
+
+def test_data_cache_matches():
+    c = DataCache()
+    assert not c.matches_entry(None)
+    c.update_entry(Pattern("a", "b"))
+    assert c.matches_entry(Pattern("a", "b"))
+    assert not c.matches_entry(Pattern("a", "c"))
+    c.update_entries({"1": "e1", "2": "e2"})
+    assert not c.matches_all_entries({"1": "e1", "2": "e2"})
+    c.clear()
+    c.update_entries({"1": "e1", "2": "e2"})
+    assert c.matches_all_entries({"1": "e1", "2": "e2"})
+    assert not c.matches_all_entries({"1": "e1"})
+    assert not c.matches_all_entries({"1": "e1", "2": "e3"})
+
+
+def test_zone_fingerprints():
+    cache = JellyFishCache()
+    fingerprints = cache.zone_fingerprints
+    config = PatternConfig(type="Color", colors=[255, 0, 0])
+    key = fingerprints.state_key(1, "", config)
+    assert not fingerprints.matches_input(["A"], "red")
+    fingerprints.update(["A", "B"], "red", key)
+    assert fingerprints.matches_input(["A", "B"], "red")
+    assert not fingerprints.matches_input(["A", "C"], "red")
+    assert fingerprints.matches_state(["A"], fingerprints.state_key(1, None, PatternConfig(type="Color", colors=[255, 0, 0])))
+    # Pushed zone states that match keep the fingerprint, others replace it
+    cache.zone_state_data.update_entry(ZoneState(state=1, zoneName=["A"], data=config), "A")
+    assert fingerprints.matches_input(["A"], "red")
+    cache.zone_state_data.update_entry(ZoneState(state=0, zoneName=["A"], data=config), "A")
+    assert not fingerprints.matches_input(["A"], "red")
+    assert fingerprints.matches_state(["A"], fingerprints.state_key(0, "", config))
+    fingerprints.invalidate(["B"])
+    assert not fingerprints.matches_state(["B"], key)
+    fingerprints.invalidate()
+    assert not fingerprints.matches_state(["A"], fingerprints.state_key(0, "", config))
+
+
+def test_data_cache_version():
+    c = DataCache()
+    c.update_entry("e1", "1")
+    c.update_entries({"2": "e2", "3": "e3"})
+    assert c.version == 2
+    c.delete_entry("1")
+    c.delete_entry("missing")
+    assert c.version == 3
+    c.clear()
+    assert c.version == 4
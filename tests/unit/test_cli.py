@@ -0,0 +1,103 @@
+import os
+import pytest
+from threading import Thread
+from jellyfishlightspy import cli, daemon
+
+class FakeController:
+    instances = []
+
+    def __init__(self, address):
+        self.address = address
+        self.connected = False
+        self.calls = []
+        FakeController.instances.append(self)
+
+    def connect(self, timeout=None):
+        self.connected = True
+
+    def disconnect(self, timeout=None):
+        self.connected = False
+
+    @property
+    def zone_names(self):
+        return ["Front", "Back"]
+
+    @property
+    def pattern_names(self):
+        return ["Colors/Blue"]
+
+    def turn_on(self, zones, timeout=None):
+        self.calls.append(("turn_on", zones))
+
+    def apply_pattern(self, pattern, zones, timeout=None):
+        self.calls.append(("apply_pattern", pattern, zones))
+
+@pytest.fixture
+def fake_controller(monkeypatch):
+    FakeController.instances = []
+    monkeypatch.setattr(daemon, "JellyFishController", FakeController)
+    monkeypatch.setattr("jellyfishlightspy.controller.JellyFishController", FakeController)
+    return FakeController
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / "jf.sock")
+    jfd = daemon.JellyFishDaemon(path)
+    t = Thread(target=jfd.serve_forever, daemon=True)
+    t.start()
+    while not os.path.exists(path):
+        pass
+    yield path
+    jfd.shutdown()
+    t.join(timeout=1)
+
+def test_daemon(fake_controller, socket_path, capsys):
+    assert cli.main(["--host", "test-host", "--socket", socket_path, "on", "Front"]) == 0
+    assert cli.main(["--host", "test-host", "--socket", socket_path, "pattern", "Colors/Blue"]) == 0
+    assert cli.main(["--host", "test-host", "--socket", socket_path, "zones"]) == 0
+    # A single connection is reused across invocations
+    assert len(fake_controller.instances) == 1
+    assert fake_controller.instances[0].calls == [("turn_on", ["Front"]), ("apply_pattern", "Colors/Blue", None)]
+    assert capsys.readouterr().out == "Front\nBack\n"
+
+def test_daemon_error(fake_controller, socket_path, capsys):
+    assert cli.main(["--host", "test-host", "--socket", socket_path, "color", "1", "2", "3"]) == 1
+    assert "jellyfish:" in capsys.readouterr().err
+
+def test_no_daemon(fake_controller, tmp_path):
+    assert cli.main(["--host", "test-host", "--socket", str(tmp_path / "none.sock"), "--no-daemon", "on"]) == 0
+    assert fake_controller.instances[0].calls == [("turn_on", None)]
+    assert not fake_controller.instances[0].connected
+
+def test_daemon_socket_permissions(fake_controller, socket_path):
+    assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+def test_default_socket_path(fake_controller, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    path = cli.default_socket_path()
+    assert path == str(tmp_path / "jellyfish" / "daemon.sock")
+    jfd = daemon.JellyFishDaemon()
+    t = Thread(target=jfd.serve_forever, daemon=True)
+    t.start()
+    while not os.path.exists(path):
+        pass
+    # The socket's directory is created private to the current user
+    assert os.stat(tmp_path / "jellyfish").st_mode & 0o777 == 0o700
+    assert cli.main(["--host", "test-host", "on"]) == 0
+    jfd.shutdown()
+    t.join(timeout=1)
+
+def test_socket_owned_by_another_user(fake_controller, socket_path, monkeypatch, capsys):
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(socket_path).st_uid + 1)
+    assert cli.main(["--host", "test-host", "--socket", socket_path, "on"]) == 1
+    assert "owned by another user" in capsys.readouterr().err
+    assert fake_controller.instances == []
+
+def test_daemon_unsupported(fake_controller, monkeypatch, capsys):
+    monkeypatch.delattr(cli.socket, "AF_UNIX")
+    assert cli.default_socket_path() is None
+    # Commands connect directly instead
+    assert cli.main(["--host", "test-host", "on"]) == 0
+    assert fake_controller.instances[0].calls == [("turn_on", None)]
+    assert cli.main(["daemon"]) == 1
+    assert "isn't supported" in capsys.readouterr().err
@@ -0,0 +1,52 @@
+import pytest
+from jellyfishlightspy.compositor import FrameCompositor
+from jellyfishlightspy.helpers import JellyFishException
+from jellyfishlightspy.model import ZoneConfig, PortMapping
+from jellyfishlightspy.pixelmap import PixelMap
+
+@pytest.fixture
+def pixel_map() -> PixelMap:
+    # A roofline on port 1: "Front" runs backward from pixel 3 to 0, then "Garage" runs from 4 to 6 and continues on port 2
+    return PixelMap({
+        "Front": ZoneConfig([PortMapping(1, 0, 3, 3, "ctlr")]),
+        "Garage": ZoneConfig([PortMapping(2, 0, 1, 0, "ctlr"), PortMapping(1, 4, 6, 4, "ctlr")]),
+        "Side": ZoneConfig([PortMapping(3, 0, 1, 0, "ctlr")]),
+    })
+
+def test_frame_compositor(pixel_map: PixelMap):
+    compositor = FrameCompositor(pixel_map, ["Garage", "Front"])
+    assert compositor.num_pixels == 9
+    assert compositor.ports == [("ctlr", 1), ("ctlr", 2)]
+    frame = [(i, i, i) for i in range(9)]
+    assert compositor.split(frame) == {
+        "Garage": [(7, 7, 7), (8, 8, 8), (4, 4, 4), (5, 5, 5), (6, 6, 6)],
+        "Front": [(3, 3, 3), (2, 2, 2), (1, 1, 1), (0, 0, 0)],
+    }
+    with pytest.raises(JellyFishException):
+        compositor.split(frame[1:])
+
+def test_frame_compositor_array(pixel_map: PixelMap):
+    np = pytest.importorskip("numpy")
+    compositor = FrameCompositor(pixel_map, ["Front", "Garage", "Side"])
+    frame = np.arange(11 * 3, dtype=np.uint8).reshape(11, 3)
+    light_strings = compositor.split(frame)
+    expected = compositor.split([tuple(rgb) for rgb in frame.tolist()])
+    assert {zone: [tuple(rgb) for rgb in ls.tolist()] for zone, ls in light_strings.items()} == expected
+    assert light_strings["Side"].shape == (2, 3)
+
+def test_frame_compositor_join(pixel_map: PixelMap):
+    np = pytest.importorskip("numpy")
+    compositor = FrameCompositor(pixel_map, ["Front", "Garage"])
+    frame = np.arange(9 * 3, dtype=np.uint8).reshape(9, 3)
+    assert (compositor.join(compositor.split(frame)) == frame).all()
+    assert (compositor.join(compositor.split(frame.tolist())) == frame).all()
+    with pytest.raises(JellyFishException):
+        compositor.join({"Front": [(0, 0, 0)] * 4})
+    with pytest.raises(JellyFishException):
+        compositor.join({"Front": [(0, 0, 0)] * 3, "Garage": [(0, 0, 0)] * 5})
+
+def test_frame_compositor_overlap():
+    pixel_map = PixelMap({"a": ZoneConfig([PortMapping(1, 0, 3, 0, "ctlr")]), "b": ZoneConfig([PortMapping(1, 2, 5, 2, "ctlr")])})
+    compositor = FrameCompositor(pixel_map, ["a", "b"])
+    assert compositor.num_pixels == 6
+    assert compositor.split(list(range(6))) == {"a": [0, 1, 2, 3], "b": [2, 3, 4, 5]}
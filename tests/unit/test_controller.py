@@ -0,0 +1,381 @@
+import os
+import json
+import pytest
+from threading import Event
+from jellyfishlightspy.controller import JellyFishController, PreparedCommand
+from jellyfishlightspy.helpers import JellyFishException, from_json
+from jellyfishlightspy.library import write_pattern_library, write_pattern_directory, read_patterns
+from jellyfishlightspy.model import Pattern, PatternConfig, RunConfig
+
+def pattern_data(rgb):
+    return {"type": "Color", "colors": list(rgb), "runData": {"speed": 0, "brightness": 100, "effect": "No Effect", "effectValue": 0, "rgbAdj": [100, 100, 100]}, "direction": "Center", "spaceBetweenPixels": 2, "numOfLeds": 1, "skip": 2, "effectBetweenPixels": "No Color Transform", "colorPos": [-1], "cursor": -1, "ledOnPos": {}, "soffitZone": ""}
+
+class FakeWebSocket:
+    """
+    Stands in for the websocket module, with a fake controller that answers each message as soon as it is sent. Requests
+    for, saving, or deleting the data of patterns in drop, and zone state requests whose first zone is in drop, are left
+    unanswered (once per occurrence)
+    """
+
+    def __init__(self):
+        self.zones = {
+            "Front": {"numPixels": 10, "portMap": [{"ctlrName": "fake.local", "phyPort": 1, "phyStartIdx": 0, "phyEndIdx": 9, "zoneRGBStartIdx": 0}]},
+            "Back": {"numPixels": 5, "portMap": [{"ctlrName": "fake.local", "phyPort": 2, "phyStartIdx": 0, "phyEndIdx": 4, "zoneRGBStartIdx": 0}]},
+        }
+        self.patterns = {("Colors", ""): None, ("Christmas", ""): None}
+        self.patterns.update({("Colors", f"Gray {i}"): pattern_data((i, i, i)) for i in range(5)})
+        self.patterns[("Christmas", "Red")] = pattern_data((255, 0, 0))
+        self.read_only = set()
+        self.states = {zone: {"state": 0, "zoneName": [zone], "file": "", "id": "", "data": ""} for zone in self.zones}
+        self.drop = []
+        self.sent = []
+
+    def setdefaulttimeout(self, timeout):
+        pass
+
+    def WebSocketApp(self, url, on_open, on_close, on_message, on_error):
+        self.__on_open, self.__on_close, self.__on_message = on_open, on_close, on_message
+        self.__closed = Event()
+        return self
+
+    def run_forever(self):
+        self.__on_open(self)
+        self.__closed.wait()
+        self.__on_close(self, None, None)
+
+    def close(self):
+        self.__closed.set()
+
+    def push(self, **data):
+        """Sends a message from the controller"""
+        self.__on_message(self, json.dumps({"cmd": "fromCtlr", **data}))
+
+    def send(self, message):
+        request = json.loads(message)
+        self.sent.append(request)
+        if request["cmd"] == "toCtlrGet":
+            for data_type, *args in request["get"]:
+                if data_type == "zones":
+                    self.push(zones=self.zones)
+                elif data_type == "patternFileList":
+                    self.push(patternFileList=[{"folders": f, "name": n, "readOnly": (f, n) in self.read_only} for f, n in self.patterns])
+                elif data_type == "patternFileData":
+                    for pattern in zip(args[::2], args[1::2]):
+                        if "/".join(pattern) in self.drop:
+                            self.drop.remove("/".join(pattern))
+                        elif pattern in self.patterns:
+                            self.push(patternFileData={"folders": pattern[0], "name": pattern[1], "jsonData": json.dumps(self.patterns[pattern])})
+                elif data_type == "runPattern":
+                    for zone in args:
+                        self.push(runPattern=self.states[zone])
+        elif "runPattern" in request:
+            if request["runPattern"]["zoneName"][0] in self.drop:
+                self.drop.remove(request["runPattern"]["zoneName"][0])
+                return
+            for zone in request["runPattern"]["zoneName"]:
+                self.states[zone] = dict(request["runPattern"], zoneName=[zone])
+            self.push(runPattern=request["runPattern"])
+        elif "patternFileData" in request:
+            data = request["patternFileData"]
+            if f"{data['folders']}/{data['name']}" in self.drop:
+                self.drop.remove(f"{data['folders']}/{data['name']}")
+                return
+            self.patterns[(data["folders"], data["name"])] = json.loads(data["jsonData"])
+            self.push(patternFileData=data)
+        elif "patternFileDelete" in request:
+            data = request["patternFileDelete"]
+            if f"{data['folders']}/{data['name']}" in self.drop:
+                self.drop.remove(f"{data['folders']}/{data['name']}")
+                return
+            self.patterns.pop((data["folders"], data["name"]), None)
+            self.push(patternFileDelete=data)
+
+    def applied(self):
+        """Returns the zone states of the zone state requests sent so far"""
+        return [request["runPattern"] for request in self.sent if request["cmd"] == "toCtlrSet" and "runPattern" in request]
+
+    def requested(self, data_type):
+        """Returns the arguments of each data request of a type, e.g. the pattern names of each patternFileData request"""
+        return [args for request in self.sent if request["cmd"] == "toCtlrGet" for t, *args in request["get"] if t == data_type]
+
+@pytest.fixture
+def ws(monkeypatch) -> FakeWebSocket:
+    ws = FakeWebSocket()
+    monkeypatch.setattr("jellyfishlightspy.controller.import_websocket", lambda: ws)
+    return ws
+
+@pytest.fixture
+def controller(ws) -> JellyFishController:
+    jfc = JellyFishController("fake.local")
+    jfc.connect(1)
+    yield jfc
+    jfc.disconnect(1)
+
+def test_prepared_command():
+    catalog = {"version": 0, "zones": ["a", "b"]}
+    prepared, sent = [], []
+    def prepare():
+        if not catalog["zones"]:
+            raise JellyFishException("no zones")
+        prepared.append(list(catalog["zones"]))
+        return list(catalog["zones"]), str(catalog["zones"]).encode()
+    cmd = PreparedCommand("test", prepare, lambda: catalog["version"], lambda *args: sent.append(args))
+    assert cmd.zones == ["a", "b"]
+    cmd.send()
+    cmd.send(sync=False, timeout=1)
+    # Sending doesn't prepare the command again unless the catalog changes
+    assert len(prepared) == 1
+    assert sent[-1] == ("test", ["a", "b"], b"['a', 'b']", False, 1)
+    catalog.update(version=1, zones=["a", "b", "c"])
+    cmd.send()
+    assert len(prepared) == 2
+    assert sent[-1][1] == ["a", "b", "c"]
+    # Commands that are no longer valid are not sent
+    catalog.update(version=2, zones=[])
+    with pytest.raises(JellyFishException):
+        cmd.send()
+    assert len(sent) == 3
+
+def test_iter_pattern_configs(controller, ws):
+    patterns = [p for p in controller.pattern_names if p.startswith("Colors/")]
+    ws.drop = ["Colors/Gray 1"]
+    received = dict(controller.iter_pattern_configs(patterns, batch_size=2, max_in_flight=1, timeout=0.05))
+    assert list(received) == ["Colors/Gray 0", "Colors/Gray 1", "Colors/Gray 2", "Colors/Gray 3", "Colors/Gray 4"]
+    assert received["Colors/Gray 3"].colors == [3, 3, 3]
+    # Only the missing pattern of the batch that timed out is requested again, ahead of the batches that are still queued
+    assert ws.requested("patternFileData") == [
+        ["Colors", "Gray 0", "Colors", "Gray 1"], ["Colors", "Gray 1"], ["Colors", "Gray 2", "Colors", "Gray 3"], ["Colors", "Gray 4"]
+    ]
+
+def test_iter_pattern_configs_timeout(controller, ws):
+    ws.drop = ["Colors/Gray 1", "Colors/Gray 1"]
+    received = []
+    with pytest.raises(JellyFishException):
+        for pattern, _ in controller.iter_pattern_configs(["Colors/Gray 0", "Colors/Gray 1"], retries=1, timeout=0.05):
+            received.append(pattern)
+    assert received == ["Colors/Gray 0"]
+    assert len(ws.requested("patternFileData")) == 2
+    # Without a timeout, patterns are awaited indefinitely
+    assert [pattern for pattern, _ in controller.iter_pattern_configs(["Colors/Gray 1"], timeout=None)] == ["Colors/Gray 1"]
+
+def test_export_patterns(controller, ws, tmp_path):
+    path = str(tmp_path / "library.ndjson")
+    progress = []
+    assert controller.export_patterns(path, ["Colors/Gray 2", "Christmas/Red"], lambda *args: progress.append(args)) == 2
+    assert [(str(pattern), config.colors) for pattern, config in read_patterns(path)] == [("Christmas/Red", [255, 0, 0]), ("Colors/Gray 2", [2, 2, 2])]
+    assert progress == [(1, 2), (2, 2)]
+    assert controller.export_patterns(str(tmp_path)) == 6
+    assert (tmp_path / "Colors" / "Gray 4.json").exists()
+
+def test_export_patterns_failure(controller, ws, tmp_path):
+    path = tmp_path / "library.ndjson"
+    path.write_text("existing library\n")
+    ws.drop = ["Christmas/Red", "Christmas/Red"]
+    with pytest.raises(JellyFishException):
+        controller.export_patterns(str(path), ["Colors/Gray 2", "Christmas/Red"], timeout=0.05)
+    # The existing library is left intact, without temporary files
+    assert path.read_text() == "existing library\n"
+    assert os.listdir(tmp_path) == ["library.ndjson"]
+
+def library_entries(*entries):
+    return [(Pattern.from_str(name), PatternConfig("Color", list(rgb), RunConfig(0, 100, "No Effect", 0, [100, 100, 100]))) for name, rgb in entries]
+
+def test_import_patterns(controller, ws, tmp_path):
+    path = tmp_path / "library.ndjson"
+    with open(path, "w") as f:
+        write_pattern_library(f, library_entries(("Colors/Gray 0", (9, 9, 9)), ("Colors/New", (1, 2, 3)), ("Blues/Navy", (0, 0, 128))))
+    assert controller.import_patterns(str(path), overwrite=False) == ["Colors/New", "Blues/Navy"]
+    assert ws.patterns[("Colors", "Gray 0")]["colors"] == [0, 0, 0]
+    progress = []
+    assert controller.import_patterns(str(path), window=2, progress=lambda *args: progress.append(args)) == ["Colors/Gray 0", "Colors/New", "Blues/Navy"]
+    assert ws.patterns[("Colors", "Gray 0")]["colors"] == [9, 9, 9]
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert "Blues/Navy" in controller.pattern_names
+
+def test_import_patterns_failure(controller, ws, tmp_path):
+    path = tmp_path / "library.ndjson"
+    with open(path, "w") as f:
+        write_pattern_library(f, library_entries(("Colors/A", (1, 1, 1)), ("Colors/B", (2, 2, 2)), ("Colors/C", (3, 3, 3))))
+    # Saves that aren't confirmed within the timeout fail the import
+    ws.drop = ["Colors/B"]
+    with pytest.raises(JellyFishException, match="timed out"):
+        controller.import_patterns(str(path), window=1, timeout=0.05)
+    # Saves after the one that timed out aren't sent
+    assert ("Colors", "C") not in ws.patterns
+    # Read only patterns can't be overwritten, and nothing is saved if any entry is rejected
+    ws.read_only.add(("Colors", "Gray 0"))
+    controller.get_pattern_list()
+    with open(path, "w") as f:
+        write_pattern_library(f, library_entries(("Colors/D", (4, 4, 4)), ("Colors/Gray 0", (1, 1, 1))))
+    with pytest.raises(JellyFishException, match="read only"):
+        controller.import_patterns(str(path))
+    assert ("Colors", "D") not in ws.patterns
+
+def test_sync_patterns(controller, ws, tmp_path):
+    ws.read_only.update({("Colors", "Gray 3"), ("Colors", "Gray 4")})
+    library = {f"{folders}/{name}": from_json(json.dumps(data)) for (folders, name), data in ws.patterns.items() if data}
+    library["Colors/Gray 1"].colors = [7, 7, 7]
+    library["Colors/Gray 4"].colors = [7, 7, 7] # Read only, so it is skipped
+    library["Blues/Navy"] = from_json(json.dumps(pattern_data((0, 0, 128))))
+    del library["Colors/Gray 2"]
+    del library["Colors/Gray 3"] # Read only, so it isn't deleted
+    write_pattern_directory(str(tmp_path), [(Pattern.from_str(name), config) for name, config in library.items()])
+    controller.get_pattern_config("Colors/Gray 0")
+    sent = len(ws.sent)
+    report = controller.sync_patterns(str(tmp_path), delete=True, dry_run=True)
+    assert report.dry_run and report.created == ["Blues/Navy"] and report.updated == ["Colors/Gray 1"]
+    assert report.deleted == ["Colors/Gray 2"] and report.skipped == ["Colors/Gray 4"]
+    assert report.unchanged == ["Christmas/Red", "Colors/Gray 0"]
+    # Only configurations that aren't cached are requested, and a dry run sends no changes
+    assert ws.requested("patternFileData")[-1] == ["Christmas", "Red", "Colors", "Gray 1", "Colors", "Gray 4"]
+    assert [request for request in ws.sent[sent:] if request["cmd"] != "toCtlrGet"] == []
+    report = controller.sync_patterns(str(tmp_path), delete=True)
+    assert not report.dry_run and report.changed
+    assert ws.patterns[("Colors", "Gray 1")]["colors"] == [7, 7, 7] and ws.patterns[("Blues", "Navy")]["colors"] == [0, 0, 128]
+    assert ws.patterns[("Colors", "Gray 4")]["colors"] == [4, 4, 4]
+    assert ("Colors", "Gray 2") not in ws.patterns and ("Colors", "Gray 3") in ws.patterns
+    # Deletes are confirmed before returning
+    assert "Colors/Gray 2" not in controller.pattern_names
+    sent = len(ws.sent)
+    assert not controller.sync_patterns(str(tmp_path), delete=True).changed
+    assert len(ws.sent) == sent
+
+def test_sync_patterns_delete_timeout(controller, ws, tmp_path):
+    write_pattern_directory(str(tmp_path), [(Pattern("Christmas", "Red"), from_json(json.dumps(ws.patterns[("Christmas", "Red")])))])
+    ws.drop = ["Colors/Gray 0"]
+    with pytest.raises(JellyFishException, match="delete"):
+        controller.sync_patterns(str(tmp_path), delete=True, timeout=0.05)
+    # Patterns that aren't in the library are kept unless delete is set
+    assert not controller.sync_patterns(str(tmp_path)).changed
+
+def test_suppress_duplicate_frames(controller, ws):
+    controller.apply_color((255, 0, 0))
+    controller.apply_color((255, 0, 0))
+    # Nothing is suppressed unless enabled
+    assert len(ws.applied()) == 2 and controller.suppressed_messages["apply_color"] == 0
+    controller.suppress_duplicate_frames = True
+    # The zones' states show they already have the color
+    controller.apply_color((255, 0, 0), zones=["Front"])
+    assert len(ws.applied()) == 2 and controller.suppressed_messages["apply_color"] == 1
+    controller.apply_color((0, 255, 0), zones=["Front"])
+    controller.apply_color((0, 255, 0), zones=["Front"])
+    assert len(ws.applied()) == 3 and controller.suppressed_messages["apply_color"] == 2
+    # Zones that aren't all showing the color are sent it
+    controller.apply_color((0, 255, 0))
+    controller.apply_color((0, 255, 0), zones=["Back"])
+    assert len(ws.applied()) == 4 and controller.suppressed_messages["apply_color"] == 3
+    # Other requests to a zone make it send again
+    controller.turn_off(["Front"])
+    controller.apply_color((0, 255, 0), zones=["Back"])
+    controller.apply_color((0, 255, 0), zones=["Front"])
+    assert len(ws.applied()) == 6 and controller.suppressed_messages["apply_color"] == 4
+
+def test_suppress_duplicate_light_strings(controller, ws):
+    controller.suppress_duplicate_frames = True
+    light_string = [(255, 0, 0), (0, 255, 0)]
+    controller.apply_light_string(light_string, zones=["Back"])
+    controller.apply_light_string(light_string, zones=["Back"])
+    assert len(ws.applied()) == 1 and controller.suppressed_messages["apply_light_string"] == 1
+    # Light strings are sent with one color per pixel by default
+    assert json.loads(ws.applied()[0]["data"])["colorPos"] == [-1, 0, 1]
+    # A different brightness or encoding is a different frame
+    controller.apply_light_string(light_string, 50, zones=["Back"])
+    controller.apply_light_string(light_string, 50, zones=["Back"], encoding="palette")
+    assert len(ws.applied()) == 3
+
+def test_suppress_duplicate_frames_after_push(controller, ws):
+    controller.suppress_duplicate_frames = True
+    controller.apply_color((0, 0, 255), zones=["Front"])
+    # Zone states pushed by the controller that match what was applied (e.g. responses to other clients) don't resume sending
+    ws.push(runPattern=ws.applied()[-1])
+    controller.apply_color((0, 0, 255), zones=["Front"])
+    assert len(ws.applied()) == 1
+    # Zones changed by another client are sent the color again
+    ws.push(runPattern={"state": 1, "zoneName": ["Front"], "file": "Colors/Gray 0", "id": "", "data": ""})
+    controller.apply_color((0, 0, 255), zones=["Front"])
+    assert len(ws.applied()) == 2
+    # Reconnecting forgets what zones are showing
+    controller.disconnect(1)
+    controller.connect(1)
+    controller.apply_color((0, 0, 255), zones=["Front"])
+    assert len(ws.applied()) == 3 and controller.suppressed_messages["apply_color"] == 1
+
+def light_string(state):
+    """Returns the light string of a zone state sent with the pixel layout"""
+    colors = json.loads(state["data"])["colors"][3:]
+    return [tuple(colors[i:i + 3]) for i in range(0, len(colors), 3)]
+
+def test_apply_frame(controller, ws):
+    # Frames are ordered by port, so Front (port 1) comes before Back (port 2)
+    frame = [(i, 0, 0) for i in range(15)]
+    controller.apply_frame(frame)
+    applied = ws.applied()
+    assert [state["zoneName"] for state in applied] == [["Front"], ["Back"]]
+    assert light_string(applied[0]) == frame[:10] and light_string(applied[1]) == frame[10:]
+    # The zone states of both zones are awaited
+    assert controller.zone_states["Front"].data.colors[3:6] == [0, 0, 0]
+    assert controller.zone_states["Back"].data.colors[3:6] == [10, 0, 0]
+    controller.apply_frame(frame[:5], zones=["Back"], brightness=50)
+    assert ws.applied()[-1]["zoneName"] == ["Back"] and json.loads(ws.applied()[-1]["data"])["runData"]["brightness"] == 50
+    with pytest.raises(JellyFishException):
+        controller.apply_frame(frame[:14])
+    assert len(ws.applied()) == 3
+
+def test_apply_frame_suppression(controller, ws):
+    controller.suppress_duplicate_frames = True
+    frame = [(0, 0, 255)] * 15
+    controller.apply_frame(frame)
+    controller.apply_frame(frame)
+    assert len(ws.applied()) == 2 and controller.suppressed_messages["apply_frame"] == 2
+    # Only the zones whose light strings changed are sent
+    frame[12] = (255, 0, 0)
+    controller.apply_frame(frame)
+    assert len(ws.applied()) == 3 and ws.applied()[-1]["zoneName"] == ["Back"]
+    assert controller.suppressed_messages["apply_frame"] == 3
+
+def test_apply_frame_timeout(controller, ws):
+    ws.drop = ["Back"]
+    with pytest.raises(JellyFishException, match="timed out"):
+        controller.apply_frame([(1, 2, 3)] * 15, timeout=0.05)
+    # Every zone was sent its light string before awaiting the responses
+    assert [state["zoneName"] for state in ws.applied()] == [["Front"], ["Back"]]
+    controller.apply_frame([(1, 2, 3)] * 15, sync=False)
+
+def test_transition_to(controller, ws):
+    pytest.importorskip("numpy")
+    controller.apply_color((0, 0, 255))
+    sent = len(ws.applied())
+    stats = controller.transition_to((255, 0, 0), duration=0.1, fps=50)
+    frames = ws.applied()[sent:-1]
+    # Each frame sends one light string per zone, and the frames fade from what the zones are showing to the target
+    assert stats.frames > 1 and len(frames) == stats.frames * 2
+    assert light_string(frames[0]) == [(0, 0, 255)] * 10 and light_string(frames[-1]) == [(255, 0, 0)] * 5
+    # Colors are blended in linear light, which is brighter in between than blending their RGB values
+    assert any(r + b > 300 for r, _, b in (light_string(frame)[0] for frame in frames))
+    # Then the target itself is applied
+    assert ws.applied()[-1]["state"] == 1 and json.loads(ws.applied()[-1]["data"])["colors"] == [255, 0, 0]
+    assert controller.zone_states["Back"].data.colors == [255, 0, 0]
+
+def test_transition_from_pattern(controller, ws):
+    pytest.importorskip("numpy")
+    controller.apply_pattern("Christmas/Red", ["Front"])
+    controller.transition_to("Colors/Gray 4", duration=0.05, zones=["Front", "Back"])
+    # The configuration of the pattern a zone is showing is retrieved to render it, and zones that are off start from black
+    assert ["Christmas", "Red"] in ws.requested("patternFileData")
+    first = ws.applied()[1:3]
+    assert light_string(first[0]) == [(255, 0, 0)] * 10 and light_string(first[1]) == [(0, 0, 0)] * 5
+    assert ws.applied()[-1]["file"] == "Colors/Gray 4"
+
+def test_transition_to_without_fade(controller, ws):
+    pytest.importorskip("numpy")
+    stats = controller.transition_to([(1, 2, 3)] * 5, duration=0, zones=["Back"])
+    assert stats.frames == 0 and len(ws.applied()) == 1
+    assert light_string(ws.applied()[0]) == [(1, 2, 3)] * 5
+    # Nothing is faded if the zones already show the target
+    controller.transition_to([(1, 2, 3)] * 5, duration=1, zones=["Back"])
+    assert len(ws.applied()) == 2
+    with pytest.raises(JellyFishException):
+        controller.transition_to((1, 2, 3), duration=-1)
+    with pytest.raises(JellyFishException):
+        controller.transition_to((1, 2, 3), zones=["Side"])
+    assert len(ws.applied()) == 2
@@ -0,0 +1,79 @@
+import pytest
+from jellyfishlightspy.effects import Effect, Rainbow, Comet, Breathing, Twinkle, Gradient, Crossfade
+from jellyfishlightspy.helpers import JellyFishException
+from jellyfishlightspy.lightstring import encode_light_string
+
+np = pytest.importorskip("numpy")
+
+def test_rainbow():
+    frame = Rainbow(6, speed=0.5)(0)
+    assert frame.shape == (6, 3) and frame.dtype == np.uint8
+    assert frame.tolist() == [[255, 0, 0], [255, 255, 0], [0, 255, 0], [0, 255, 255], [0, 0, 255], [255, 0, 255]]
+    # Hues move toward the end of the light string
+    assert (Rainbow(6, speed=0.5)(1 / 3) == np.roll(frame, 1, axis=0)).all()
+    assert Rainbow(6, brightness=0.5)(0)[0].tolist() == [128, 0, 0]
+
+def test_comet():
+    comet = Comet(10, (200, 100, 0), speed=1, tail=4)
+    assert comet(3)[:, 0].tolist() == [50, 100, 150, 200, 0, 0, 0, 0, 0, 0]
+    # The tail wraps around to the end of the light string
+    assert comet(1)[:, 0].tolist() == [150, 200, 0, 0, 0, 0, 0, 0, 50, 100]
+    bounce = Comet(5, speed=1, tail=2, bounce=True)
+    assert bounce(4)[:, 0].tolist() == [0, 0, 0, 128, 255]
+    assert bounce(5)[:, 0].tolist() == [0, 0, 0, 255, 128]
+
+def test_breathing():
+    breathing = Breathing(3, (100, 200, 50), period=2, minimum=0)
+    assert breathing.frames([0, 0.5, 1]).tolist() == [[[0, 0, 0]] * 3, [[50, 100, 25]] * 3, [[100, 200, 50]] * 3]
+
+def test_twinkle():
+    twinkle = Twinkle(500, (255, 255, 255), density=0.2, seed=7)
+    frames = twinkle.frames([0, 0.7, 1.3])
+    assert (frames == Twinkle(500, (255, 255, 255), density=0.2, seed=7).frames([0, 0.7, 1.3])).all()
+    assert not (frames == Twinkle(500, (255, 255, 255), density=0.2, seed=8).frames([0, 0.7, 1.3])).all()
+    lit = (frames[:, :, 0] > 0).mean()
+    assert 0.1 < lit < 0.3
+    with pytest.raises(JellyFishException):
+        Twinkle(10, density=0)
+
+def test_gradient():
+    gradient = Gradient(4, [(0, 0, 0), (200, 100, 0)], speed=0.25)
+    assert gradient(0).tolist() == [[0, 0, 0], [100, 50, 0], [200, 100, 0], [100, 50, 0]]
+    assert gradient(1).tolist() == [[100, 50, 0], [0, 0, 0], [100, 50, 0], [200, 100, 0]]
+    assert (Gradient(3, [(1, 2, 3)])(5) == 1 + np.arange(3)).all(axis=1).all()
+
+def test_crossfade():
+    fade = Crossfade([(0, 0, 0), (255, 0, 100)], [(255, 255, 255), (255, 0, 100)], duration=2)
+    assert fade(0).tolist() == [[0, 0, 0], [255, 0, 100]]
+    assert fade(2).tolist() == fade(3).tolist() == [[255, 255, 255], [255, 0, 100]]
+    # Halfway is half the light, which is brighter than half the RGB value
+    assert fade(1)[0].tolist() == [186, 186, 186]
+    assert fade(1)[1].tolist() == [255, 0, 100]
+    assert Crossfade([(0, 0, 0)], [(255, 255, 255)], 2, gamma=1)(1).tolist() == [[128, 128, 128]]
+
+def test_effect_frames():
+    effect = Rainbow(20)
+    frames = effect.frames([0, 0.5, 1])
+    assert frames.shape == (3, 20, 3)
+    assert (frames[1] == effect(0.5)).all()
+    assert encode_light_string(effect(0)).type == "Soffit"
+
+def test_effect_invalid():
+    with pytest.raises(JellyFishException):
+        Rainbow(0)
+    with pytest.raises(JellyFishException):
+        Comet(10, (256, 0, 0))
+    with pytest.raises(JellyFishException):
+        Gradient(10, [])
+    with pytest.raises(JellyFishException):
+        Breathing(10, period=0)
+    with pytest.raises(JellyFishException):
+        Twinkle(10, period=-1)
+    # Effects must implement _render
+    with pytest.raises(TypeError):
+        Effect(10)
+    with pytest.raises(JellyFishException):
+        Crossfade([(0, 0, 0)], [(0, 0, 0), (0, 0, 0)], 1)
+    for duration, gamma in [(0, 2.2), (1, 0)]:
+        with pytest.raises(JellyFishException):
+            Crossfade([(0, 0, 0)], [(255, 255, 255)], duration, gamma)
@@ -1,7 +1,10 @@
 import pytest
 import time
 from threading import Thread
-from jellyfishlightspy.helpers import TimelyEvent
+import json
+from jellyfishlightspy.helpers import TimelyEvent, content_hash, diff, to_json, _default
+from jellyfishlightspy.model import PatternConfig, RunConfig, ZoneConfig, PortMapping, ZoneState, Pattern
+from jellyfishlightspy.requests import SetZoneStateRequest, SetPatternConfigRequest, SetZoneConfigRequest
 
 # Note: tests in model.py sufficiently cover from_json, to_json, _default, and _object_hook
 
@@ -26,3 +29,52 @@ def test_timely_event():
     thread.start()
     thread.join(timeout=.1)
     assert not thread.is_alive()
+
+def test_content_hash():
+    config = PatternConfig("Color", [0, 0, 255], RunConfig(0, 100, "No Effect", 0, [100, 100, 100]))
+    same = PatternConfig("Color", [0, 0, 255], RunConfig(0, 100, "No Effect", 0, [100, 100, 100]))
+    # Attribute order doesn't affect the hash
+    reordered = PatternConfig("Color", [0, 0, 255])
+    del reordered.type
+    reordered.runData = RunConfig(0, 100, "No Effect", 0, [100, 100, 100])
+    reordered.type = "Color"
+    assert content_hash(config) == content_hash(same) == content_hash(reordered)
+    same.runData.brightness = 50
+    assert content_hash(config) != content_hash(same)
+
+def test_diff():
+    old = PatternConfig("Color", [0, 0, 255], RunConfig(0, 100, "No Effect", 0, [100, 100, 100]))
+    new = PatternConfig("Color", [0, 0, 255], RunConfig(0, 100, "No Effect", 0, [100, 100, 100])).compact()
+    assert diff(old, new) == {}
+    new.colors[2] = 128
+    new.runData.speed = 5
+    assert diff(old, new) == {"colors[2]": (255, 128), "runData.speed": (0, 5)}
+    new.colorPos = [1, 2]
+    assert diff(old, new)["colorPos"] == ([-1], [1, 2])
+    old_zones = {"Front": ZoneConfig([PortMapping(1, 0, 9)]), "Back": ZoneConfig([PortMapping(2, 0, 9)])}
+    new_zones = {"Front": ZoneConfig([PortMapping(1, 0, 19)]), "Side": ZoneConfig([PortMapping(3, 0, 9)])}
+    changes = diff(old_zones, new_zones)
+    assert changes["Front.portMap[0].phyEndIdx"] == (9, 19)
+    assert changes["Front.numPixels"] == (10, 20)
+    assert changes["Back"] == (old_zones["Back"], None)
+    assert changes["Side"] == (None, new_zones["Side"])
+
+def test_to_json_matches_json_dumps():
+    # to_json uses generated encoders, but must produce exactly what json.dumps with _default does
+    config = PatternConfig("Chase", [1, 2, 3], RunConfig(1, 50, "Twinkle", 0, [100, 100, 100]), ledOnPos={"0": [1, 2], "data": {"x": 1}})
+    partial = PatternConfig("Color", [1])
+    del partial.cursor
+    objs = [
+        config,
+        PatternConfig("Color", [1, 2, 3]).compact(),
+        partial,
+        ZoneState(1, ["a", "\u00e9"], "f", "i", config),
+        ZoneState(0, [], data=None),
+        SetZoneStateRequest(1, ["a"], data=config),
+        SetPatternConfigRequest(Pattern("a", "b"), config),
+        SetZoneConfigRequest({"Front": ZoneConfig([PortMapping(1, 0, 9)])}),
+        [Pattern("a", "b"), {"data": config}, 1.5, float("nan"), None, True, "x\n\""],
+        {"k": config, "data": config},
+    ]
+    for obj in objs:
+        assert to_json(obj) == json.dumps(obj, default=_default, separators=(',', ':'))
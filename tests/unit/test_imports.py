@@ -0,0 +1,23 @@
+import sys
+import subprocess
+
+def imported_modules(statement: str) -> str:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True)
+    return [line.split("|")[-1].strip() for line in result.stderr.splitlines()]
+
+def test_package_import_is_lazy():
+    modules = imported_modules("import jellyfishlightspy")
+    assert "jellyfishlightspy" in modules
+    assert not [m for m in modules if m.startswith("jellyfishlightspy.")]
+
+def test_model_import_does_not_load_websocket():
+    for statement in ["from jellyfishlightspy import PatternConfig, to_json", "import jellyfishlightspy.cli", "from jellyfishlightspy import JellyFishController"]:
+        modules = imported_modules(statement)
+        assert "websocket" not in modules, statement
+        assert "jellyfishlightspy.proxy" not in modules, statement
+
+def test_lazy_attributes():
+    import jellyfishlightspy
+    from jellyfishlightspy.model import PatternConfig
+    assert jellyfishlightspy.PatternConfig is PatternConfig
+    assert "JellyFishController" in dir(jellyfishlightspy)
@@ -0,0 +1,53 @@
+import io
+import pytest
+from jellyfishlightspy.helpers import JellyFishException
+from jellyfishlightspy.library import write_pattern_library, read_pattern_library, write_pattern_directory, read_pattern_directory, read_patterns, PatternSyncReport
+from jellyfishlightspy.model import Pattern, PatternConfig, RunConfig
+
+def test_pattern_library_round_trip(helpers):
+    entries = [
+        (Pattern("Colors", "Blue"), PatternConfig("Color", [0, 0, 255], RunConfig(0, 100, "No Effect", 0, [100, 100, 100]))),
+        (Pattern("Special Effects", "Red Waves"), PatternConfig("Chase", [255, 0, 0, 0, 0, 0], RunConfig(1, 50, "Twinkle", 0, [100, 100, 100]))),
+    ]
+    f = io.StringIO()
+    assert write_pattern_library(f, iter(entries)) == 2
+    lines = f.getvalue().splitlines()
+    assert len(lines) == 2
+    # Each line uses the controller's patternFileData format
+    assert lines[0].startswith('{"folders":"Colors","name":"Blue","jsonData":"{')
+    f.seek(0)
+    read = list(read_pattern_library(f))
+    assert [str(p) for p, _ in read] == ["Colors/Blue", "Special Effects/Red Waves"]
+    for (_, expected), (_, config) in zip(entries, read):
+        assert helpers.recursive_vars(config) == helpers.recursive_vars(expected)
+
+def test_pattern_library_invalid_entries():
+    for contents in ['{"folders":"Colors","name":"Blue"}\n', 'not json\n', '{"folders":"Colors","name":"","jsonData":""}\n']:
+        with pytest.raises(JellyFishException):
+            list(read_pattern_library(io.StringIO(contents)))
+    # Blank lines are ignored
+    assert list(read_pattern_library(io.StringIO("\n\n"))) == []
+
+def test_pattern_directory_round_trip(helpers, tmp_path):
+    entries = [
+        (Pattern("Colors", "Blue"), PatternConfig("Color", [0, 0, 255], RunConfig(0, 100, "No Effect", 0, [100, 100, 100]))),
+        (Pattern("Special Effects", "Red Waves"), PatternConfig("Chase", [255, 0, 0, 0, 0, 0], RunConfig(1, 50, "Twinkle", 0, [100, 100, 100]))),
+    ]
+    assert write_pattern_directory(str(tmp_path), entries) == 2
+    assert (tmp_path / "Special Effects" / "Red Waves.json").read_text().startswith('{\n  "colorPos"')
+    read = list(read_pattern_directory(str(tmp_path)))
+    assert [str(p) for p, _ in read] == ["Colors/Blue", "Special Effects/Red Waves"]
+    for (_, expected), (_, config) in zip(entries, read):
+        assert helpers.recursive_vars(config) == helpers.recursive_vars(expected)
+    assert [str(p) for p, _ in read_patterns(str(tmp_path))] == ["Colors/Blue", "Special Effects/Red Waves"]
+    with pytest.raises(JellyFishException):
+        list(read_pattern_directory(str(tmp_path / "missing")))
+
+def test_pattern_sync_report():
+    report = PatternSyncReport(dry_run=True)
+    assert not report.changed
+    report.created.append("Colors/Blue")
+    report.skipped.append("Colors/Red")
+    report.unchanged.append("Colors/Green")
+    assert report.changed
+    assert str(report) == "+ Colors/Blue\n! Colors/Red (read only)\n1 created, 0 updated, 0 deleted, 1 unchanged, 1 skipped (dry run)"
@@ -0,0 +1,43 @@
+import pytest
+from jellyfishlightspy.helpers import JellyFishException
+from jellyfishlightspy.lightstring import encode_light_string, payload_size
+
+RED, GREEN = (255, 0, 0), (0, 255, 0)
+
+def test_pixel_encoding():
+    config = encode_light_string([RED, GREEN, RED], 50, "pixel")
+    assert config.type == "Soffit"
+    assert config.colors == [0, 0, 0, 255, 0, 0, 0, 255, 0, 255, 0, 0]
+    assert config.colorPos == [-1, 0, 1, 2]
+    assert config.ledOnPos == {}
+    assert config.runData.brightness == 50
+
+def test_palette_encoding():
+    config = encode_light_string([RED, GREEN, RED, (0, 0, 0)], 100, "palette")
+    assert config.colors == [0, 0, 0, 255, 0, 0, 0, 255, 0]
+    assert config.colorPos == [-1]
+    assert config.ledOnPos == {"1": [0, 2], "2": [1], "0": [3]}
+
+def test_default_encoding():
+    assert encode_light_string([RED, GREEN, RED], 50) == encode_light_string([RED, GREEN, RED], 50, "pixel")
+
+def test_auto_encoding():
+    repeated = [RED, GREEN] * 50
+    assert encode_light_string(repeated, encoding="auto").ledOnPos
+    assert payload_size(encode_light_string(repeated, encoding="auto")) < payload_size(encode_light_string(repeated))
+    distinct = [(i, 255 - i, i) for i in range(100)]
+    assert encode_light_string(distinct, encoding="auto").colorPos == [-1] + list(range(100))
+
+def test_invalid_light_strings():
+    with pytest.raises(JellyFishException):
+        encode_light_string([RED], encoding="other")
+    with pytest.raises(JellyFishException):
+        encode_light_string([(256, 0, 0)])
+    with pytest.raises(JellyFishException):
+        encode_light_string([RED], brightness=101)
+
+
+def test_light_string_array():
+    np = pytest.importorskip("numpy")
+    frame = np.array([RED, GREEN, RED], dtype=np.uint8)
+    assert encode_light_string(frame, 50, "pixel") == encode_light_string([RED, GREEN, RED], 50, "pixel")
@@ -1,4 +1,5 @@
 import json
+import pytest
 from jellyfishlightspy.model import (
     RunConfig,
     PatternConfig,
@@ -70,4 +71,32 @@ def test_schedule_event(helpers, se_obj, se_json):
     o = helpers.assert_marshalling_works(se_obj, se_json)
     assert isinstance(o, ScheduleEvent)
     for action in o.actions:
-        assert isinstance(action, ScheduleEventAction)
\ No newline at end of file
+        assert isinstance(action, ScheduleEventAction)
+
+def test_slots(pc_obj):
+    # Model objects have no instance dict, but vars() still returns their attributes in serialization order
+    assert list(vars(pc_obj)) == list(PatternConfig.__slots__)
+    with pytest.raises(AttributeError):
+        pc_obj.unknownAttribute = 1
+
+def test_pattern_config_compact(pc_obj, pc_json):
+    pc_obj.compact()
+    assert pc_obj.colors.typecode == "B"
+    assert json.loads(to_json(pc_obj)) == json.loads(pc_json)
+    # Colors outside of the byte range are left as lists
+    config = PatternConfig("Color", [0, 256, 0]).compact()
+    assert config.colors == [0, 256, 0]
+
+def test_equality(pc_obj, pc_json, zc_obj, zc_json):
+    assert pc_obj == from_json(pc_json)
+    assert zc_obj == from_json(zc_json)
+    assert pc_obj != zc_obj
+    assert pc_obj == from_json(pc_json).compact()
+    other = from_json(pc_json)
+    other.runData.speed += 1
+    assert pc_obj != other
+    assert pc_obj.content_hash() != other.content_hash()
+    assert pc_obj.content_hash() == from_json(pc_json).content_hash()
+    # Mutable model objects are not hashable
+    with pytest.raises(TypeError):
+        hash(pc_obj)
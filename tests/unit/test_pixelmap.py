@@ -0,0 +1,70 @@
+import pytest
+from jellyfishlightspy.helpers import JellyFishException
+from jellyfishlightspy.model import ZoneConfig, PortMapping, count_pixels
+from jellyfishlightspy.pixelmap import PixelMap, mapping_indexes, find_overlaps
+
+@pytest.fixture
+def pixel_map() -> PixelMap:
+    return PixelMap({
+        "front": ZoneConfig([PortMapping(1, 0, 4, 0, "ctlr"), PortMapping(2, 9, 5, 9, "ctlr")]),
+        "back": ZoneConfig([PortMapping(1, 10, 19, 19, "ctlr")]),
+        "porch": ZoneConfig([PortMapping(1, 0, 2, 0, "other-ctlr")]),
+    })
+
+def test_mapping_indexes():
+    assert list(mapping_indexes(PortMapping(1, 0, 3))) == [0, 1, 2, 3]
+    assert list(mapping_indexes(PortMapping(1, 0, 3, 3))) == [3, 2, 1, 0]
+    assert list(mapping_indexes(PortMapping(1, 3, 0))) == [3, 2, 1, 0]
+    assert list(mapping_indexes(PortMapping(1, 3, 0, 0))) == [0, 1, 2, 3]
+    assert list(mapping_indexes(PortMapping(1, 5, 5, 5))) == [5]
+    assert count_pixels([PortMapping(1, 0, 3), PortMapping(1, 9, 5)]) == 9
+
+def test_pixel_map_locate(pixel_map: PixelMap):
+    assert pixel_map.zones == ["front", "back", "porch"]
+    assert pixel_map.ports == [("ctlr", 1), ("ctlr", 2), ("other-ctlr", 1)]
+    assert pixel_map.num_pixels("front") == 10
+    assert pixel_map.locate("front", 4) == ("ctlr", 1, 4)
+    assert pixel_map.locate("front", 5) == ("ctlr", 2, 9)
+    assert pixel_map.locate("back", 0) == ("ctlr", 1, 19)
+    assert pixel_map.locate("back", -1) == ("ctlr", 1, 10)
+    ports, port_ids, indexes = pixel_map.indexes("front")
+    assert [ports[p] for p in port_ids] == [("ctlr", 1)] * 5 + [("ctlr", 2)] * 5
+    assert list(indexes) == [0, 1, 2, 3, 4, 9, 8, 7, 6, 5]
+    with pytest.raises(JellyFishException):
+        pixel_map.locate("front", 10)
+    with pytest.raises(JellyFishException):
+        pixel_map.num_pixels("side")
+
+def test_pixel_map_zone_at(pixel_map: PixelMap):
+    assert pixel_map.zone_at("ctlr", 1, 3) == ("front", 3)
+    assert pixel_map.zone_at("ctlr", 2, 6) == ("front", 8)
+    assert pixel_map.zone_at("ctlr", 1, 12) == ("back", 7)
+    assert pixel_map.zone_at("ctlr", 1, 7) is None
+    assert pixel_map.zone_at("ctlr", 3, 0) is None
+    assert pixel_map.zones_overlapping("ctlr", 1, 0, 30) == ["front", "back"]
+    assert pixel_map.zones_overlapping("ctlr", 1, 11, 4) == ["front", "back"]
+    assert pixel_map.zones_overlapping("ctlr", 1, 5, 9) == []
+    assert pixel_map.zones_overlapping("other-ctlr", 1, 2, 2) == ["porch"]
+    assert pixel_map.overlaps == []
+
+def test_pixel_map_overlaps():
+    pixel_map = PixelMap({
+        "a": ZoneConfig([PortMapping(1, 0, 100, 0, "ctlr")]),
+        "b": ZoneConfig([PortMapping(1, 10, 20, 10, "ctlr")]),
+        "c": ZoneConfig([PortMapping(1, 50, 40, 50, "ctlr")]),
+    })
+    assert [(o.first, o.last, o.zones) for o in pixel_map.overlaps] == [(10, 20, ("a", "b")), (40, 50, ("a", "c"))]
+    assert pixel_map.zones_overlapping("ctlr", 1, 15, 45) == ["a", "b", "c"]
+    overlaps = find_overlaps([("a", PortMapping(1, 0, 5, 0, "ctlr")), ("a", PortMapping(1, 5, 9, 5, "ctlr"))])
+    assert [(o.port, o.first, o.last) for o in overlaps] == [(("ctlr", 1), 5, 5)]
+
+def test_pixel_map_light_strings(pixel_map: PixelMap):
+    ports = {("ctlr", 1): list(range(20)), ("ctlr", 2): list(range(100, 110))}
+    assert pixel_map.to_zone("front", ports) == [0, 1, 2, 3, 4, 109, 108, 107, 106, 105]
+    assert pixel_map.to_zone("porch", ports, default=None) == [None] * 3
+    pixel_map.to_ports("back", list(range(10)), ports)
+    assert ports[("ctlr", 1)][10:] == list(range(9, -1, -1))
+    with pytest.raises(JellyFishException):
+        pixel_map.to_ports("back", [0], ports)
+    with pytest.raises(JellyFishException):
+        pixel_map.to_ports("porch", [0, 0, 0], ports)
@@ -0,0 +1,106 @@
+import io
+import json
+import time
+import struct
+import pytest
+import websocket
+from threading import Thread
+from jellyfishlightspy.proxy import JellyFishProxy, _WebSocketServer, _ProtocolError, _encode_frame, _read_frame, _OP_TEXT, _OP_CLOSE
+
+@pytest.fixture
+def fake_controller():
+    requests = []
+    def on_message(client, message):
+        requests.append(json.loads(message))
+        data = json.loads(message)
+        if data["cmd"] == "toCtlrGet":
+            for item in data["get"]:
+                if item[0] == "ctlrName":
+                    client.send('{"cmd":"fromCtlr","ctlrName":"test-name"}')
+    server = _WebSocketServer(("127.0.0.1", 0), on_message)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server, requests
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def proxy(fake_controller):
+    server, _ = fake_controller
+    proxy = JellyFishProxy("127.0.0.1", port=0, controller_port=server.server_address[1], max_message_size=1000)
+    proxy.start(timeout=2)
+    yield proxy
+    proxy.stop(timeout=2)
+
+def test_frame_encoding():
+    for payload in [b"", b"x" * 125, b"y" * 126, b"z" * 70000]:
+        for mask in [True, False]:
+            fin, opcode, decoded = _read_frame(io.BytesIO(_encode_frame(_OP_TEXT, payload, mask)))
+            assert fin
+            assert opcode == _OP_TEXT
+            assert decoded == payload
+
+def test_invalid_frames():
+    with pytest.raises(_ProtocolError) as e:
+        _read_frame(io.BytesIO(_encode_frame(_OP_TEXT, b"x" * 100, True)), max_size=10)
+    assert e.value.code == 1009
+    # Oversized frames are rejected before their payload is read
+    with pytest.raises(_ProtocolError) as e:
+        _read_frame(io.BytesIO(bytes([0x81, 0xFF]) + struct.pack("!Q", 1 << 63)), max_size=10)
+    assert e.value.code == 1009
+    with pytest.raises(_ProtocolError) as e:
+        _read_frame(io.BytesIO(_encode_frame(_OP_TEXT, b"x")), require_mask=True)
+    assert e.value.code == 1002
+
+def test_proxy(fake_controller, proxy):
+    _, requests = fake_controller
+    url = f"ws://127.0.0.1:{proxy.port}"
+    client1 = websocket.create_connection(url, timeout=2)
+    client2 = websocket.create_connection(url, timeout=2)
+    # Push messages are rebroadcast to all clients
+    client1.send('{"cmd":"toCtlrGet","get":[["ctlrName"]]}')
+    assert json.loads(client1.recv())["ctlrName"] == "test-name"
+    assert json.loads(client2.recv())["ctlrName"] == "test-name"
+    assert len(requests) == 1
+    # Fresh data is served from the cache without contacting the controller
+    client2.send('{"cmd":"toCtlrGet","get":[["ctlrName"]]}')
+    assert json.loads(client2.recv()) == {"cmd": "fromCtlr", "ctlrName": "test-name"}
+    assert len(requests) == 1
+    # Everything else is forwarded as-is
+    client1.send('{"cmd":"toCtlrSet","ctlrName":"new-name"}')
+    time.sleep(.2)
+    assert requests[-1] == {"cmd": "toCtlrSet", "ctlrName": "new-name"}
+    client1.close()
+    client2.close()
+
+def test_proxy_collapses_duplicate_requests(fake_controller, proxy):
+    _, requests = fake_controller
+    url = f"ws://127.0.0.1:{proxy.port}"
+    client1 = websocket.create_connection(url, timeout=2)
+    client2 = websocket.create_connection(url, timeout=2)
+    # The fake controller never answers zone config requests, so the second request is still in flight
+    client1.send('{"cmd":"toCtlrGet","get":[["zones"]]}')
+    client2.send('{"cmd":"toCtlrGet","get":[["zones"]]}')
+    time.sleep(.2)
+    assert requests == [{"cmd": "toCtlrGet", "get": [["zones"]]}]
+    client1.close()
+    client2.close()
+
+def test_proxy_limits_message_size(fake_controller, proxy):
+    _, requests = fake_controller
+    client = websocket.create_connection(f"ws://127.0.0.1:{proxy.port}", timeout=2)
+    client.send('{"cmd":"toCtlrSet","ctlrName":"' + "x" * 1000 + '"}')
+    opcode, data = client.recv_data(control_frame=True)
+    assert opcode == _OP_CLOSE and struct.unpack("!H", data[:2])[0] == 1009
+    assert requests == []
+    client.close()
+
+def test_proxy_stop_closes_clients(fake_controller):
+    server, _ = fake_controller
+    proxy = JellyFishProxy("127.0.0.1", port=0, controller_port=server.server_address[1])
+    proxy.start(timeout=2)
+    client = websocket.create_connection(f"ws://127.0.0.1:{proxy.port}", timeout=2)
+    time.sleep(.1)
+    proxy.stop(timeout=2)
+    opcode, data = client.recv_data(control_frame=True)
+    assert opcode == _OP_CLOSE and struct.unpack("!H", data[:2])[0] == 1001
+    client.close()
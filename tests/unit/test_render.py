@@ -0,0 +1,84 @@
+import pytest
+from jellyfishlightspy.helpers import JellyFishException
+from jellyfishlightspy.lightstring import encode_light_string
+from jellyfishlightspy.model import PatternConfig, RunConfig, ZoneConfig, PortMapping
+from jellyfishlightspy.render import render_pattern, PatternRenderer
+
+np = pytest.importorskip("numpy")
+
+RED, GREEN, BLACK = [255, 0, 0], [0, 255, 0], [0, 0, 0]
+
+def pattern(type: str, **attrs) -> PatternConfig:
+    return PatternConfig(type=type, **{"colors": RED + GREEN, "spaceBetweenPixels": 1, "skip": 0, **attrs})
+
+def test_render_static():
+    frames = render_pattern(pattern("Color", direction="Right"), ZoneConfig([PortMapping(1, 0, 3)]), 2)
+    assert frames.shape == (2, 4, 3) and frames.dtype == np.uint8
+    assert frames[0].tolist() == [RED, GREEN, RED, GREEN]
+    assert (frames[1] == frames[0]).all()
+    assert render_pattern(pattern("Paint", spaceBetweenPixels=2, direction="Right"), 4)[0].tolist() == [RED, RED, GREEN, GREEN]
+    assert render_pattern(pattern("Paint", spaceBetweenPixels=2, direction="Left"), 4)[0].tolist() == [GREEN, GREEN, RED, RED]
+
+def test_render_effect_between_pixels():
+    fade = render_pattern(pattern("Paint", spaceBetweenPixels=2, direction="Right", effectBetweenPixels="Fade"), 4)[0]
+    assert fade.tolist() == [RED, [128, 128, 0], GREEN, [128, 128, 0]]
+    fill = render_pattern(pattern("Paint", spaceBetweenPixels=2, direction="Right", effectBetweenPixels="Fill with Black"), 4)[0]
+    assert fill.tolist() == [RED, BLACK, GREEN, BLACK]
+
+def test_render_chase():
+    frames = render_pattern(pattern("Chase", skip=1, direction="Right"), 4, 3)
+    assert frames[0].tolist() == [RED, BLACK, GREEN, BLACK]
+    assert frames[1].tolist() == [BLACK, RED, BLACK, GREEN]
+    assert frames[2].tolist() == [GREEN, BLACK, RED, BLACK]
+    assert render_pattern(pattern("Chase", skip=1, direction="Left"), 4, 2)[1].tolist() == [GREEN, BLACK, RED, BLACK]
+    # Center chases are mirrored around the middle of the zone
+    center = render_pattern(pattern("Chase", direction="Center"), 6, 2)
+    assert (center == center[:, ::-1]).all()
+
+def test_render_stacker():
+    frames = render_pattern(pattern("Stacker", numOfLeds=2, direction="Right"), 4, 4)
+    assert frames[0].tolist() == [BLACK] * 4
+    assert frames[1].tolist() == [BLACK, BLACK, RED, GREEN]
+    assert frames[2].tolist() == [RED, GREEN, RED, GREEN]
+    assert frames[3].tolist() == [BLACK] * 4
+
+def test_render_sequence():
+    frames = render_pattern(pattern("Sequence", spaceBetweenPixels=2, effectBetweenPixels="Progression"), 3, 4)
+    assert frames[:, 0].tolist() == [RED, [128, 128, 0], GREEN, [128, 128, 0]]
+    assert (frames == frames[:, :1]).all()
+
+def test_render_soffit():
+    light_string = [(1, 2, 3), (0, 0, 0), (4, 5, 6), (1, 2, 3)]
+    for encoding in ["pixel", "palette"]:
+        assert render_pattern(encode_light_string(light_string, encoding=encoding), 5)[0].tolist() == [list(rgb) for rgb in light_string] + [BLACK]
+
+def test_render_run_data():
+    config = pattern("Color", runData=RunConfig(brightness=50, rgbAdj=[100, 100, 0]), colors=[200, 100, 50])
+    assert render_pattern(config, 1)[0].tolist() == [[100, 50, 0]]
+
+def test_render_invalid():
+    with pytest.raises(JellyFishException):
+        render_pattern(pattern("Color"), 4, 0)
+    with pytest.raises(JellyFishException):
+        render_pattern(pattern("Color"), -1)
+    with pytest.raises(JellyFishException):
+        render_pattern(PatternConfig("Color", colors=[1, 2]), 4)
+
+def test_render_without_numpy(monkeypatch):
+    monkeypatch.setattr("jellyfishlightspy.helpers.import_numpy", lambda: None)
+    with pytest.raises(JellyFishException):
+        render_pattern(pattern("Color"), 4)
+
+def test_pattern_renderer():
+    renderer = PatternRenderer(maxsize=2)
+    first = renderer.render(pattern("Chase"), 10, 5)
+    assert not first.flags.writeable
+    assert renderer.render(pattern("Chase"), 10, 5) is first
+    assert renderer.hits == 1 and renderer.misses == 1
+    # Previews are cached per number of pixels and frames, and the least recently used one is evicted
+    renderer.render(pattern("Chase"), 20, 5)
+    renderer.render(pattern("Paint"), 10, 5)
+    assert len(renderer) == 2
+    assert renderer.render(pattern("Chase"), 10, 5) is not first
+    renderer.clear()
+    assert len(renderer) == 0
@@ -0,0 +1,47 @@
+import pytest
+from jellyfishlightspy.helpers import JellyFishException
+from jellyfishlightspy.model import ScheduleEvent, ScheduleEventAction
+from jellyfishlightspy.schedule import ScheduleTransaction
+
+def make_event(label: str) -> ScheduleEvent:
+    return ScheduleEvent(label=label, days=["M"], actions=[
+        ScheduleEventAction("RUN", "sunset", 0, 0, "Colors/Blue", ["Zone1"]),
+        ScheduleEventAction("STOP", "time", 23, 0, "", ["Zone1"]),
+    ])
+
+def test_schedule_transaction():
+    commits = []
+    original = [make_event("a"), make_event("b")]
+    with ScheduleTransaction(original, lambda t: commits.append(t.events)) as schedule:
+        schedule.add(make_event("c"), make_event("c"))
+        assert schedule.remove("a") == 1
+        assert schedule.update(lambda e: e.label == "c", days=["T"]) == 2
+        assert [e.days for e in schedule.find("c")] == [["T"], ["T"]]
+        assert len(schedule) == 3
+    assert schedule.committed
+    assert [e.label for e in commits[0]] == ["b", "c", "c"]
+    # The original events are not modified
+    assert [e.label for e in original] == ["a", "b"]
+    with pytest.raises(JellyFishException):
+        schedule.add(make_event("d"))
+
+def test_schedule_transaction_no_changes():
+    commits = []
+    with ScheduleTransaction([make_event("a")], commits.append) as schedule:
+        schedule.update("a", days=["T"])
+        schedule.update("a", days=["M"])
+    assert not schedule.committed and not commits
+
+def test_schedule_transaction_rollback():
+    commits = []
+    with pytest.raises(ValueError):
+        with ScheduleTransaction([make_event("a")], commits.append) as schedule:
+            schedule.remove("a")
+            raise ValueError()
+    assert not commits
+    schedule = ScheduleTransaction([], commits.append)
+    with pytest.raises(JellyFishException):
+        schedule.update("a", label2="b")
+    schedule.rollback()
+    with pytest.raises(JellyFishException):
+        schedule.commit()
@@ -0,0 +1,106 @@
+import pytest
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from jellyfishlightspy.helpers import JellyFishException, import_numpy
+from jellyfishlightspy.model import ScheduleEvent, ScheduleEventAction, TimeConfig
+from jellyfishlightspy.timeline import sun_times, expand_schedules, resolve_timezone, lint_schedules, ScheduleTimeline, CONFLICT, GAP, REDUNDANT_STOP
+
+DENVER = ZoneInfo("America/Denver")
+
+def close_to(actual: datetime, expected: datetime) -> bool:
+    return abs(actual - expected) <= timedelta(minutes=3)
+
+def test_sun_times():
+    # Published times for Denver, CO
+    (summer_rise, summer_set), (winter_rise, winter_set) = sun_times(39.74, -104.99, [date(2024, 6, 21), date(2024, 12, 21)], DENVER)
+    assert close_to(summer_rise, datetime(2024, 6, 21, 5, 32, tzinfo=DENVER))
+    assert close_to(summer_set, datetime(2024, 6, 21, 20, 31, tzinfo=DENVER))
+    assert close_to(winter_rise, datetime(2024, 12, 21, 7, 18, tzinfo=DENVER))
+    assert close_to(winter_set, datetime(2024, 12, 21, 16, 39, tzinfo=DENVER))
+
+def test_sun_times_without_numpy(monkeypatch):
+    monkeypatch.setattr("jellyfishlightspy.timeline.import_numpy", lambda: None)
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(0, 366, 30)]
+    without_numpy = sun_times(39.74, -104.99, days, DENVER)
+    monkeypatch.undo()
+    if import_numpy() is not None:
+        assert all(close_to(a[0], b[0]) and close_to(a[1], b[1]) for a, b in zip(without_numpy, sun_times(39.74, -104.99, days, DENVER)))
+
+def test_resolve_timezone():
+    assert resolve_timezone(TimeConfig("America/Denver", "Mountain Standard Time", "Denver", 40, -105)) == DENVER
+    assert resolve_timezone(TimeConfig("-7", "America/Denver", "Denver", 40, -105)) == DENVER
+    with pytest.raises(JellyFishException):
+        resolve_timezone(TimeConfig("-7", "Mountain Standard Time", "Denver", 40, -105))
+
+def test_schedule_timeline():
+    daily = [ScheduleEvent(label="Evenings", days=["M", "T", "W", "TH", "F", "SA", "S"], actions=[
+        ScheduleEventAction("RUN", "sunset", 0, 15, "Colors/Warm", ["Front", "Back"]),
+        ScheduleEventAction("STOP", "time", 23, 0, "", ["Front", "Back"]),
+    ])]
+    calendar = [ScheduleEvent(label="Christmas", days=["20201225"], actions=[
+        ScheduleEventAction("RUN", "time", 17, 0, "Christmas/Tree", ["Front"]),
+        ScheduleEventAction("STOP", "time", 23, 30, "", ["Front"]),
+    ])]
+    actions = expand_schedules(daily, calendar, date(2024, 12, 24), date(2024, 12, 25), 39.74, -104.99, DENVER)
+    assert [(a.time.day, a.type, a.label) for a in actions] == [(24, "RUN", "Evenings"), (24, "STOP", "Evenings"), (25, "RUN", "Christmas"), (25, "STOP", "Christmas")]
+    assert close_to(actions[0].time, datetime(2024, 12, 24, 16, 54, tzinfo=DENVER))
+    timeline = ScheduleTimeline(actions)
+    assert timeline.active_pattern("Front", datetime(2024, 12, 24, 12, 0, tzinfo=DENVER)) is None
+    assert timeline.active_pattern("Front", datetime(2024, 12, 24, 18, 0, tzinfo=DENVER)) == "Colors/Warm"
+    assert timeline.active_pattern("Back", datetime(2024, 12, 24, 23, 0, tzinfo=DENVER)) is None
+    assert timeline.active_pattern("Front", datetime(2024, 12, 25, 23, 0, tzinfo=DENVER)) == "Christmas/Tree"
+    # Calendar events take precedence over daily events
+    assert timeline.active_pattern("Back", datetime(2024, 12, 25, 20, 0, tzinfo=DENVER)) is None
+    assert timeline.last_action("Back", datetime(2024, 12, 25, 20, 0, tzinfo=DENVER)).label == "Evenings"
+    assert len(timeline.actions_between(datetime(2024, 12, 25, tzinfo=DENVER), datetime(2024, 12, 25, 23, 30, tzinfo=DENVER))) == 1
+    assert len(timeline.actions_between(datetime(2024, 12, 24, tzinfo=DENVER), datetime(2024, 12, 26, tzinfo=DENVER), "Back")) == 2
+    with pytest.raises(JellyFishException):
+        expand_schedules(daily, calendar, date(2024, 12, 25), date(2024, 12, 24), 39.74, -104.99, DENVER)
+
+def test_lint_schedules():
+    daily = [
+        ScheduleEvent(label="Evenings", days=["M", "T", "W", "TH", "F", "SA", "S"], actions=[
+            ScheduleEventAction("RUN", "time", 18, 0, "Colors/Warm", ["Front", "Back"]),
+            ScheduleEventAction("STOP", "time", 22, 0, "", ["Front", "Back"]),
+        ]),
+        ScheduleEvent(label="Late", days=["F"], actions=[
+            ScheduleEventAction("RUN", "time", 22, 5, "Colors/Blue", ["Front"]),
+            ScheduleEventAction("STOP", "time", 23, 0, "", ["Front", "Back"]),
+        ]),
+    ]
+    calendar = [ScheduleEvent(label="Party", days=["20231227"], actions=[
+        ScheduleEventAction("RUN", "time", 17, 0, "Party", ["Back"]),
+        ScheduleEventAction("STOP", "time", 23, 0, "", ["Back"]),
+    ]), ScheduleEvent(label="Party Front", days=["20231227"], actions=[
+        ScheduleEventAction("RUN", "time", 20, 0, "Party", ["Front", "Back"]),
+    ])]
+    # Friday December 29th and Wednesday December 27th (calendar events only)
+    issues = lint_schedules(daily, calendar, date(2023, 12, 27), date(2023, 12, 29), 39.74, -104.99, DENVER)
+    assert [(i.kind, i.zone, i.time.day, i.time.hour, i.labels) for i in issues] == [
+        (CONFLICT, "Back", 27, 20, ["Party", "Party Front"]),
+        # Party Front never stops the Front zone
+        (CONFLICT, "Front", 28, 18, ["Party Front", "Evenings"]),
+        (GAP, "Front", 29, 22, ["Evenings", "Late"]),
+        (REDUNDANT_STOP, "Back", 29, 23, ["Late"]),
+    ]
+    assert "while 'Party' is running" in str(issues[0])
+    assert lint_schedules(daily, calendar, date(2023, 12, 29), date(2023, 12, 29), 39.74, -104.99, DENVER, max_gap=timedelta(minutes=5))[0].kind == REDUNDANT_STOP
+
+def test_lint_schedules_unlabeled():
+    # Events are told apart by identity rather than by label
+    calendar = [ScheduleEvent(days=["20231227"], actions=[
+        ScheduleEventAction("RUN", "time", 17, 0, "A", ["Z"]),
+        ScheduleEventAction("STOP", "time", 23, 0, "", ["Z"]),
+    ]), ScheduleEvent(days=["20231227"], actions=[
+        ScheduleEventAction("RUN", "time", 18, 0, "B", ["Z"]),
+        ScheduleEventAction("STOP", "time", 22, 0, "", ["Z"]),
+    ])]
+    issues = lint_schedules([], calendar, date(2023, 12, 27), date(2023, 12, 27), 39.74, -104.99, DENVER)
+    assert [(i.kind, i.zone, i.time.hour, i.labels) for i in issues] == [(CONFLICT, "Z", 18, ["", ""]), (REDUNDANT_STOP, "Z", 23, [""])]
+    # An event that runs a pattern on a zone it is already running doesn't conflict with itself
+    daily = [ScheduleEvent(label="Evenings", days=["M", "T", "W", "TH", "F", "SA", "S"], actions=[
+        ScheduleEventAction("RUN", "time", 18, 0, "Colors/Warm", ["Z"]),
+        ScheduleEventAction("RUN", "time", 20, 0, "Colors/Blue", ["Z"]),
+        ScheduleEventAction("STOP", "time", 22, 0, "", ["Z"]),
+    ])]
+    assert lint_schedules(daily, [], date(2023, 12, 27), date(2023, 12, 29), 39.74, -104.99, DENVER) == []
@@ -1,6 +1,7 @@
 import pytest
+from array import array
 from jellyfishlightspy.model import Pattern, PatternConfig, RunConfig, ZoneConfig, PortMapping
-from jellyfishlightspy.helpers import JellyFishException
+from jellyfishlightspy.helpers import JellyFishException, copy
 from jellyfishlightspy.validators import (
     validate_brightness,
     validate_rgb,
@@ -11,6 +12,11 @@ from jellyfishlightspy.validators import (
     validate_schedule_event_action,
     validate_port_mapping,
     validate_zone_config,
+    validate_light_string,
+    validate_schedule,
+    validate_pattern_library,
+    validate_zone_configs,
+    ValidationMemo,
 )
 
 def test_validate_brightness():
@@ -53,6 +59,24 @@ def test_validate_rgb():
         validate_rgb(100)
 
 
+def test_validate_light_string():
+    light_string = [(0, 0, 0), (255, 255, 255)]
+    assert validate_light_string(light_string) is light_string
+    assert validate_light_string([]) == []
+    for invalid in [[(0, 0, 256)], [(0, 0, -1)], [(0, 0)], [[0, 0, 0]], [(0, 0, 0.5)], [(0, 0, True)], [None]]:
+        with pytest.raises(JellyFishException):
+            validate_light_string(invalid)
+
+
+def test_validate_light_string_array():
+    np = pytest.importorskip("numpy")
+    assert validate_light_string(np.array([[0, 0, 0], [255, 128, 1]], dtype=np.uint8)) == [(0, 0, 0), (255, 128, 1)]
+    assert validate_light_string(np.zeros((0, 3), dtype=int)) == []
+    for invalid in [np.array([[0, 0, 256]]), np.array([[0, 0, -1]]), np.array([[0, 0]]), np.array([0, 0, 0]), np.array([[0.0, 0.0, 0.0]])]:
+        with pytest.raises(JellyFishException):
+            validate_light_string(invalid)
+
+
 def test_validate_zone_config():
     config = ZoneConfig([PortMapping(1, 0, 10, 0, "test-ctlr"),PortMapping(1, 11, 20, 20, "test-ctlr")], 21)
     validate_zone_config(config)
@@ -73,6 +97,27 @@ def test_validate_zone_config():
     config.numPixels = 21
     validate_zone_config(config)
 
+    config.portMap.append(PortMapping(1, 25, 20, 25, "test-ctlr"))
+    config.numPixels = 27
+    with pytest.raises(JellyFishException, match="overlap"):
+        validate_zone_config(config)
+    config.portMap[-1].ctlrName = "other-ctlr"
+    validate_zone_config(config)
+
+def test_validate_zone_overlaps():
+    configs = {
+        "a": ZoneConfig([PortMapping(1, 0, 10, 0, "test-ctlr"), PortMapping(2, 0, 10, 0, "test-ctlr")]),
+        "b": ZoneConfig([PortMapping(1, 11, 20, 11, "test-ctlr")]),
+    }
+    validate_zone_configs(configs)
+    configs["c"] = ZoneConfig([PortMapping(1, 15, 5, 15, "test-ctlr"), PortMapping(2, 10, 12, 10, "test-ctlr")])
+    with pytest.raises(JellyFishException, match="3 errors") as e:
+        validate_zone_configs(configs)
+    assert "Pixels 5-10 of port 1 on controller 'test-ctlr' are mapped by zones 'a' and 'c'" in str(e.value)
+    assert "Pixel 10 of port 2 on controller 'test-ctlr' is mapped by zones 'a' and 'c'" in str(e.value)
+    # Overlaps are only checked when zone names are known
+    validate_zone_configs(configs.values())
+
 
 def test_validate_port_mapping():
     pm = PortMapping(1, 0, 10, 0, "test-ctlr")
@@ -268,6 +313,26 @@ def test_validate_pattern_config():
         assert validate_pattern_config(config, ["test-zone-1"])
 
 
+def test_validate_pattern_config_arrays():
+    config = PatternConfig(type="Soffit", colors=[0, 0, 0, 255, 255, 255], colorPos=[-1, 0])
+    validate_pattern_config(config.compact(), [])
+    config.colors = array("i", [0, 0, 256])
+    with pytest.raises(JellyFishException):
+        validate_pattern_config(config, [])
+    config.colors = array("d", [0, 0, 0])
+    with pytest.raises(JellyFishException):
+        validate_pattern_config(config, [])
+
+
+def test_validate_pattern_library():
+    valid = PatternConfig(type="Color", colors=[255, 0, 0])
+    entries = [(Pattern("a", "1"), valid), (Pattern("a", "2"), PatternConfig(type="Other", colors=[0, 0, 0])), (Pattern("b", "3"), PatternConfig(type="Color", colors=[0, 0, 256]))]
+    assert validate_pattern_library(entries[:1], []) == entries[:1]
+    with pytest.raises(JellyFishException) as e:
+        validate_pattern_library(entries, [])
+    assert "2 errors" in str(e.value) and "Pattern 'a/2'" in str(e.value) and "Pattern 'b/3'" in str(e.value)
+
+
 def test_validate_zones(zc_obj):
     valid_zones = ["zone1", "zone2"]
     validate_zones(valid_zones, valid_zones)
@@ -392,4 +457,52 @@ def test_validate_schedule_event_action(se_obj):
         validate_schedule_event_action(action, valid_patterns, valid_zones)
     action.zones = valid_zones
     with pytest.raises(JellyFishException):
-        validate_schedule_event_action(action, valid_patterns, ["bad-zone"])
\ No newline at end of file
+        validate_schedule_event_action(action, valid_patterns, ["bad-zone"])
+
+def test_validate_schedule(se_obj):
+    patterns, zones = ["test-pattern"], ["test-zone-1", "test-zone-2"]
+    assert validate_schedule([se_obj, se_obj], False, patterns, zones) == [se_obj, se_obj]
+    invalid = copy(se_obj)
+    invalid.days = ["XX"]
+    with pytest.raises(JellyFishException) as e:
+        validate_schedule([invalid, se_obj, invalid], False, patterns, zones)
+    assert "2 errors" in str(e.value) and "Event 0" in str(e.value) and "Event 2" in str(e.value)
+    se_obj.days = ["20231231", "20230101"]
+    validate_schedule([se_obj], True, patterns, zones)
+    se_obj.days = ["20231301"]
+    with pytest.raises(JellyFishException):
+        validate_schedule([se_obj], True, patterns, zones)
+
+
+def test_validation_memo(se_obj):
+    versions = [0]
+    memo = ValidationMemo(lambda: versions[0], maxsize=2)
+    patterns, zones = ["test-pattern"], ["test-zone-1", "test-zone-2"]
+    validate_schedule([se_obj, copy(se_obj)], False, patterns, zones, memo)
+    assert (memo.hits, memo.misses, len(memo)) == (0, 2, 1)
+    validate_schedule([copy(se_obj)], False, patterns, zones, memo)
+    assert (memo.hits, memo.misses, len(memo)) == (1, 2, 1)
+    # Calendar and daily events are validated differently
+    with pytest.raises(JellyFishException):
+        validate_schedule([se_obj], True, patterns, zones, memo)
+    # Values that compare equal but have different types are validated again
+    se_obj.actions[0].minute = 50.0
+    with pytest.raises(JellyFishException):
+        validate_schedule([se_obj], False, patterns, zones, memo)
+    se_obj.actions[0].minute = 50
+    # Changed catalogs clear the memo
+    versions[0] = 1
+    with pytest.raises(JellyFishException):
+        validate_schedule([se_obj], False, patterns, ["test-zone-1"], memo)
+    assert len(memo) == 0
+    config = ZoneConfig([PortMapping(1, 0, 10, 0, "test-ctlr")], 11)
+    validate_zone_configs([config], memo)
+    validate_zone_configs([copy(config)], memo)
+    assert len(memo) == 1 and memo.hits == 2
+    config.numPixels = 12
+    with pytest.raises(JellyFishException):
+        validate_zone_configs([config], memo)
+    # Unhashable values are always validated
+    se_obj.days = [["M"]]
+    with pytest.raises(JellyFishException):
+        validate_schedule([se_obj], False, patterns, zones, memo)